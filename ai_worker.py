@@ -0,0 +1,102 @@
+import multiprocessing
+import threading
+import time
+
+# Worker keputusan AI di luar loop utama. planner: callable(state) -> keputusan.
+# publish() tidak pernah menunggu worker, latest() mengembalikan hasil terbaru
+# (request_id, keputusan, detik komputasi) atau None.
+
+class ThreadPlanner:
+    # Slot request dan result masing-masing satu referensi yang ditimpa,
+    # assignment atribut atomik di CPython jadi tidak perlu lock
+    def __init__(self, planner):
+        self.planner = planner
+        self.request = None
+        self.request_id = 0  # Id terakhir yang dipublikasikan
+        self.result = None
+        self.done_id = 0
+        self.wake = threading.Event()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="ai-planner", daemon=True)
+        self.thread.start()
+
+    def publish(self, request_id, state):
+        self.request_id = request_id
+        self.request = (request_id, state)
+        self.wake.set()
+
+    def latest(self):
+        return self.result
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            if not self.running:
+                return
+            request = self.request
+            # State yang sudah lewat dilompati, hanya yang terbaru dihitung
+            if request is None or request[0] <= self.done_id:
+                continue
+            request_id, state = request
+            start = time.perf_counter()
+            decision = self.planner(state)
+            self.done_id = request_id
+            self.result = (request_id, decision, time.perf_counter() - start)
+
+    def close(self):
+        self.running = False
+        self.wake.set()
+        self.thread.join(1.0)
+
+def process_main(conn, planner_factory):
+    # Isi proses worker: ambil request terbaru dari pipe, buang yang sudah basi
+    planner = planner_factory()
+    while True:
+        request = conn.recv()
+        while request is not None and conn.poll():
+            request = conn.recv()
+        if request is None:
+            return
+        request_id, state = request
+        start = time.perf_counter()
+        decision = planner(state)
+        conn.send((request_id, decision, time.perf_counter() - start))
+
+class ProcessPlanner:
+    # Worker proses terpisah supaya pencarian tidak berebut GIL dengan loop utama.
+    # planner_factory harus bisa di-pickle, planner dibuat di dalam proses worker.
+    def __init__(self, planner_factory):
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.request_id = 0
+        self.result = None
+        self.process = context.Process(target=process_main, args=(child_conn, planner_factory),
+                                       name="ai-planner", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def publish(self, request_id, state):
+        # Worker yang mati tidak menghentikan game, AI tetap memakai aksi terakhir
+        self.request_id = request_id
+        try:
+            self.conn.send((request_id, state))
+        except (BrokenPipeError, OSError):
+            pass
+
+    def latest(self):
+        try:
+            while self.conn.poll():
+                self.result = self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        return self.result
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
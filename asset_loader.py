@@ -0,0 +1,35 @@
+import threading
+import time
+
+class AssetLoader:
+    # Menjalankan job load asset berurutan di thread latar. Hasil dan waktu selesai
+    # tiap job dicatat, wait() hanya menunggu job yang belum selesai. Job hanya boleh
+    # membuat data miliknya sendiri; hasilnya dipasang oleh thread utama.
+    def __init__(self, jobs):
+        self.jobs = list(jobs)  # (nama, callable yang menerima dict hasil job sebelumnya)
+        self.results = {}
+        self.times = {}  # nama -> detik sejak loader dimulai
+        self.error = None
+        self.start = time.perf_counter()
+        self.finished = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            for name, job in self.jobs:
+                self.results[name] = job(self.results)
+                self.times[name] = time.perf_counter() - self.start
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def done(self):
+        return self.finished.is_set()
+
+    def wait(self):
+        self.finished.wait()
+        if self.error is not None:
+            raise self.error
+        return self.results
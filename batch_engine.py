@@ -0,0 +1,636 @@
+import os
+import sys
+import time
+import argparse
+from functools import partial
+
+import numpy as np
+
+# Engine ini tidak pernah membuka jendela
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import main
+from main import (FPS, SCREEN_WIDTH, SCREEN_HEIGHT, ROUND_PREP, FIGHTING, ROUND_OVER,
+                  MATCH_RESULT, IDLE, RUN, JUMP, FALL, ATTACK1, ATTACK2, ATTACK3, TAKE_HIT, DEATH)
+
+# Animasi dan aksi AI disimpan sebagai index integer
+ANIMATIONS = [IDLE, RUN, JUMP, FALL, ATTACK1, ATTACK2, ATTACK3, TAKE_HIT, DEATH]
+ANIM_INDEX = {name: i for i, name in enumerate(ANIMATIONS)}
+A_IDLE, A_RUN, A_JUMP, A_FALL, A_ATTACK1 = (ANIM_INDEX[name] for name in (IDLE, RUN, JUMP, FALL, ATTACK1))
+A_TAKE_HIT, A_DEATH = ANIM_INDEX[TAKE_HIT], ANIM_INDEX[DEATH]
+
+ACTIONS = [None, "chase", "attack", "skill1", "skill2", "ultimate"]
+NO_ACTION, CHASE, ATTACK, SKILL1, SKILL2, ULTIMATE = range(len(ACTIONS))
+
+DT = 1 / FPS
+ROUND_TIME = 7200
+PREP_TIME = 180
+ROUND_END_TIME = 600
+PROJECTILE_SLOTS = 4  # Sihir ditembak paling cepat sekali per animasi serangan, umurnya lebih pendek
+
+def pg_round(values):
+    # Rect pygame membulatkan float menjauhi nol
+    return np.where(values >= 0, np.floor(values + 0.5), np.ceil(values - 0.5)).astype(np.int64)
+
+class BatchEngine:
+    # N pertandingan bot vs bot sekaligus dalam array NumPy (struct of arrays),
+    # sisi 0 = player 1 (Huntress), sisi 1 = player 2 (Evil Wizard).
+    # Aturan mengikuti Game.update, Fighter, Weapon dan AIController di main.py.
+    def __init__(self, n, difficulty=(0.5, 0.5), seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.difficulty = np.empty((n, 2))
+        self.difficulty[:] = difficulty
+
+        # Konstanta per karakter diambil dari fighter headless supaya tetap sinkron
+        templates = [main.Fighter(0, 0, side + 1, load_sprites=False) for side in range(2)]
+        self.width = np.array([f.rect.width for f in templates])
+        self.height = np.array([f.rect.height for f in templates])
+        self.weapon_width = np.array([f.weapon.rect.width for f in templates])
+        self.weapon_height = np.array([f.weapon.rect.height for f in templates])
+        self.hit_width = np.array([f.hit_box.width for f in templates])
+        self.hit_height = np.array([f.hit_box.height for f in templates])
+        self.hit_bottom = np.array([f.hit_box_bottom for f in templates])
+        self.is_spear = np.array([True, False])
+        self.frame_counts = np.array([[f.sprites.frame_counts.get(name, 1) for name in ANIMATIONS]
+                                      for f in templates])
+        fighter = templates[0]
+        self.max_health = fighter.max_health
+        self.max_energy = fighter.max_energy
+        self.max_ultimate = fighter.max_ultimate
+        self.energy_regen_rate = fighter.energy_regen_rate
+        self.ultimate_gain_rate = fighter.ultimate_gain_rate
+        self.invincible_duration = fighter.invincible_duration
+        self.attack_cooldown = fighter.attack_cooldown
+        self.max_skill_cooldown = [fighter.max_skill_cooldown[k] for k in (1, 2, 3)]
+        self.skill_energy_cost = [fighter.skill_energy_cost[k] for k in (1, 2, 3)]
+        self.attack_duration = fighter.weapon.attack_duration
+        self.weapon_damage = fighter.weapon.damage
+        self.projectile_speed = fighter.weapon.projectile_speed
+        self.projectile_lifetime = fighter.weapon.projectile_lifetime
+        self.is_ranged = np.array([f.weapon.ranged for f in templates])
+        # Weapon.reach dengan pool proyektil (fighter di Game selalu punya)
+        self.reach = np.where(self.is_spear, self.weapon_width - 10, self.weapon_width) + \
+            np.where(self.is_ranged, self.projectile_speed * self.projectile_lifetime, 0)
+        self.animation_speed = fighter.sprites.animation_speed
+        self.floor_height = SCREEN_HEIGHT - 100
+        self.sides = np.arange(2)[None, :]
+        # List [pertandingan][sisi] untuk mencatat angka acak tiap keputusan AI, None = tidak dicatat
+        self.roll_log = None
+
+        self.reset()
+
+    def reset(self):
+        n = self.n
+        # State pertandingan, mulai dari ROUND_PREP seperti Game.auto_advance
+        self.state = np.full(n, ROUND_PREP)
+        self.round_timer = np.full(n, PREP_TIME)
+        self.round_end_timer = np.full(n, ROUND_END_TIME)
+        self.round_number = np.ones(n, dtype=np.int64)
+        self.wins = np.zeros((n, 2), dtype=np.int64)
+        self.is_draw = np.zeros(n, dtype=bool)
+        self.done = np.zeros(n, dtype=bool)
+        self.finish_tick = np.zeros(n, dtype=np.int64)  # Jumlah tick sampai MATCH_RESULT
+        self.ticks = 0
+
+        # State fighter, shape (n, 2)
+        shape = (n, 2)
+        self.x = np.full(shape, 200, dtype=np.int64)
+        self.y = np.full(shape, self.floor_height + 110, dtype=np.int64)
+        self.ground_y = self.y + 10
+        self.vx = np.zeros(shape)
+        self.vy = np.zeros(shape)
+        self.jumping = np.zeros(shape, dtype=bool)
+        self.health = np.full(shape, self.max_health, dtype=np.int64)
+        self.energy = np.full(shape, float(self.max_energy))
+        self.ultimate = np.zeros(shape)
+        self.attacking = np.zeros(shape, dtype=bool)
+        self.attack_type = np.zeros(shape, dtype=np.int64)
+        self.attack_timer = np.zeros(shape, dtype=np.int64)
+        self.skill_cooldowns = np.zeros((n, 2, 3), dtype=np.int64)
+        self.facing_right = np.zeros(shape, dtype=bool)
+        self.facing_right[:, 1] = True
+        self.is_dead = np.zeros(shape, dtype=bool)
+        self.invincible = np.zeros(shape, dtype=bool)
+        self.invincible_timer = np.zeros(shape, dtype=np.int64)
+        self.anim = np.full(shape, A_IDLE)
+        self.frame = np.zeros(shape, dtype=np.int64)
+        self.anim_timer = np.zeros(shape)
+
+        # Senjata
+        self.weapon_active = np.zeros(shape, dtype=bool)
+        self.weapon_timer = np.zeros(shape, dtype=np.int64)
+        self.wx = np.zeros(shape, dtype=np.int64)
+        self.wy = np.zeros(shape, dtype=np.int64)
+
+        # Proyektil (ProjectilePool), slot tetap per sisi, urutan tembak di p_seq
+        slots = (n, 2, PROJECTILE_SLOTS)
+        self.p_active = np.zeros(slots, dtype=bool)
+        self.p_x = np.zeros(slots, dtype=np.int64)
+        self.p_y = np.zeros(slots, dtype=np.int64)
+        self.p_vx = np.zeros(slots, dtype=np.int64)
+        self.p_age = np.zeros(slots, dtype=np.int64)
+        self.p_seq = np.zeros(slots, dtype=np.int64)
+        self.p_next = np.zeros(shape, dtype=np.int64)
+
+        # AI
+        self.decision_timer = np.zeros(shape, dtype=np.int64)
+        self.action = np.full(shape, NO_ACTION)
+        self.action_duration = np.zeros(shape, dtype=np.int64)
+        self.ai_attack_cooldown = np.zeros(shape, dtype=np.int64)
+        self.ai_skill_cooldown = np.zeros(shape, dtype=np.int64)
+        self.last_rolls = None
+        self.last_choice = None
+
+    def centerx(self):
+        return self.x + self.width // 2
+
+    def centery(self):
+        return self.y + self.height // 2
+
+    def hit_box(self):
+        # Fighter.update_hit_box: hurtbox di tengah bawah badan, di atas ruang kosong frame
+        return (self.centerx() - self.hit_width // 2,
+                self.y + self.height - self.hit_bottom - self.hit_height)
+
+    def step(self):
+        live = ~self.done
+        prep = live & (self.state == ROUND_PREP)
+        fight = live & (self.state == FIGHTING)
+        over = live & (self.state == ROUND_OVER)
+
+        # ROUND_PREP
+        self.round_timer[prep] -= 1
+        start = prep & (self.round_timer <= 0)
+        self.state[start] = FIGHTING
+        self.round_timer[start] = ROUND_TIME
+
+        # FIGHTING
+        if fight.any():
+            self.step_fighting(fight)
+
+        # ROUND_OVER
+        self.round_end_timer[over] -= 1
+        finished = over & ((self.wins[:, 0] >= 2) | (self.wins[:, 1] >= 2))
+        self.state[finished] = MATCH_RESULT
+
+        # Pengganti tombol SPACE, sama dengan Game.auto_advance
+        next_round = (live & (self.state == ROUND_OVER) & (self.round_end_timer <= 0)
+                      & (self.wins[:, 0] < 2) & (self.wins[:, 1] < 2))
+        if next_round.any():
+            self.start_new_round(next_round)
+        finished = live & (self.state == MATCH_RESULT)
+        self.done |= finished
+        self.ticks += 1
+        self.finish_tick[finished] = self.ticks
+
+    def step_fighting(self, fight):
+        self.round_timer[fight] -= 1
+        timeout = fight & (self.round_timer <= 0)
+        if timeout.any():
+            # Waktu habis: yang darahnya lebih banyak menang
+            p1_ahead = timeout & (self.health[:, 0] > self.health[:, 1])
+            p2_ahead = timeout & (self.health[:, 1] > self.health[:, 0])
+            self.die(np.stack([p2_ahead, p1_ahead], axis=1))
+            self.wins[p1_ahead, 0] += 1
+            self.wins[p2_ahead, 1] += 1
+            self.is_draw[timeout] = ~(p1_ahead | p2_ahead)[timeout]
+            self.state[timeout] = ROUND_OVER
+            self.round_end_timer[timeout] = ROUND_END_TIME
+
+        mask = np.broadcast_to(fight[:, None], (self.n, 2))
+        self.update_fighters(mask)
+        self.update_weapons(mask)  # Game juga memanggil weapons.update() sekali lagi
+        self.update_projectiles(fight)
+        self.update_ai(mask)
+        self.check_collisions(mask)
+
+        # Cek kondisi menang
+        p1_dead = fight & self.is_dead[:, 0]
+        p2_dead = fight & ~self.is_dead[:, 0] & self.is_dead[:, 1]
+        self.wins[p1_dead, 1] += 1
+        self.wins[p2_dead, 0] += 1
+        ended = p1_dead | p2_dead
+        self.is_draw[ended] = False
+        self.state[ended] = ROUND_OVER
+        self.round_end_timer[ended] = ROUND_END_TIME
+
+    def start_new_round(self, mask):
+        self.round_number[mask] += 1
+        self.state[mask] = ROUND_PREP
+        self.round_timer[mask] = PREP_TIME
+        self.x[mask] = 200
+        self.y[mask] = self.floor_height + 110
+        self.ground_y[mask] = self.floor_height + 112
+        self.health[mask] = self.max_health
+        self.is_dead[mask] = False
+        self.invincible[mask] = False
+        self.attack_timer[mask] = 0
+        self.p_active[mask] = False
+
+    def update_fighters(self, mask):
+        # Fighter.update
+        self.attack_timer = np.where(mask & (self.attack_timer > 0), self.attack_timer - 1, self.attack_timer)
+        self.move(mask)
+        self.update_animation_state(mask)
+        self.regenerate(mask)
+        self.update_weapons(mask)
+
+    def move(self, mask):
+        # Fighter.move
+        m = mask & ~self.is_dead
+        self.x = np.where(m, pg_round(self.x + self.vx), self.x)
+        self.x = np.where(m & (self.x < 0), 0, self.x)
+        self.x = np.where(m & (self.x + self.width > SCREEN_WIDTH), SCREEN_WIDTH - self.width, self.x)
+
+        self.vy = np.where(m, self.vy + 0.5, self.vy)
+        self.y = np.where(m, pg_round(self.y + self.vy), self.y)
+        landed = m & (self.y + self.height > self.ground_y)
+        self.y = np.where(landed, self.ground_y - self.height, self.y)
+        self.vy = np.where(landed, 0.0, self.vy)
+        self.jumping &= ~landed
+
+        self.facing_right = np.where(m & (self.vx > 0), True, self.facing_right)
+        self.facing_right = np.where(m & (self.vx < 0), False, self.facing_right)
+
+        cooling = m[:, :, None] & (self.skill_cooldowns > 0)
+        self.skill_cooldowns = np.where(cooling, self.skill_cooldowns - 1, self.skill_cooldowns)
+        self.regenerate(m)
+
+        blinking = m & self.invincible
+        self.invincible_timer = np.where(blinking, self.invincible_timer + 1, self.invincible_timer)
+        expired = blinking & (self.invincible_timer >= self.invincible_duration)
+        self.invincible &= ~expired
+        self.invincible_timer = np.where(expired, 0, self.invincible_timer)
+
+    def regenerate(self, mask):
+        low = mask & (self.energy < self.max_energy)
+        self.energy = np.where(low, np.minimum(self.max_energy, self.energy + self.energy_regen_rate), self.energy)
+        low = mask & (self.ultimate < self.max_ultimate) & ~self.is_dead
+        self.ultimate = np.where(low, np.minimum(self.max_ultimate, self.ultimate + self.ultimate_gain_rate),
+                                 self.ultimate)
+
+    def update_animation_state(self, mask):
+        new_state = np.where(self.is_dead, A_DEATH,
+                    np.where(self.attacking, A_ATTACK1,
+                    np.where(self.vy < 0, A_JUMP,
+                    np.where(self.vy > 1, A_FALL,
+                    np.where(self.vx != 0, A_RUN, A_IDLE)))))
+        self.update_animation(mask, new_state)
+        finished = mask & (new_state == A_ATTACK1) & (self.frame >= self.frame_counts[self.sides, self.anim] - 1)
+        self.attacking &= ~finished
+
+    def update_animation(self, mask, animation):
+        # CharacterSprites.update_animation
+        changed = mask & (animation != self.anim)
+        same = mask & ~changed
+        self.anim = np.where(changed, animation, self.anim)
+        self.frame = np.where(changed, 0, self.frame)
+        self.anim_timer = np.where(changed, 0.0, self.anim_timer)
+
+        self.anim_timer = np.where(same, self.anim_timer + DT, self.anim_timer)
+        advance = same & (self.anim_timer >= self.animation_speed)
+        self.anim_timer = np.where(advance, 0.0, self.anim_timer)
+        counts = self.frame_counts[self.sides, self.anim]
+        self.frame = np.where(advance, (self.frame + 1) % counts, self.frame)
+
+    def update_weapons(self, mask):
+        # Weapon.update
+        active = mask & self.weapon_active
+        self.weapon_timer = np.where(active, self.weapon_timer + 1, self.weapon_timer)
+        expired = active & (self.weapon_timer >= self.attack_duration)
+        self.weapon_active &= ~expired
+        self.weapon_timer = np.where(expired, 0, self.weapon_timer)
+
+        # Tombak di depan dada Huntress, sihir di depan badan Evil Wizard
+        hit_x, hit_y = self.hit_box()
+        spear_x = np.where(self.facing_right, hit_x + self.hit_width - 10, hit_x + 10 - self.weapon_width)
+        spear_y = hit_y + 45 - self.weapon_height // 2
+        magic_x = np.where(self.facing_right, hit_x + self.hit_width, hit_x - self.weapon_width)
+        magic_y = hit_y + self.hit_height // 2 - self.weapon_height // 2
+        self.wx = np.where(mask, np.where(self.is_spear, spear_x, magic_x), self.wx)
+        self.wy = np.where(mask, np.where(self.is_spear, spear_y, magic_y), self.wy)
+
+    def weapon_attack(self, mask):
+        # Weapon.attack: tombak aktif di tempat, sihir jadi proyektil
+        start = mask & ~self.is_ranged & ~self.weapon_active
+        self.weapon_active |= start
+        self.weapon_timer = np.where(start, 0, self.weapon_timer)
+        self.fire(mask & self.is_ranged)
+
+    def fire(self, mask):
+        # ProjectilePool.spawn di tengah rect senjata, slot kosong pertama
+        free = ~self.p_active
+        mask = mask & free.any(axis=2)
+        if not mask.any():
+            return
+        ii, ss = np.nonzero(mask)
+        kk = free.argmax(axis=2)[ii, ss]
+        self.p_active[ii, ss, kk] = True
+        self.p_x[ii, ss, kk] = self.wx[ii, ss]
+        self.p_y[ii, ss, kk] = self.wy[ii, ss]
+        self.p_vx[ii, ss, kk] = np.where(self.facing_right[ii, ss], self.projectile_speed, -self.projectile_speed)
+        self.p_age[ii, ss, kk] = 0
+        self.p_seq[ii, ss, kk] = self.p_next[ii, ss]
+        self.p_next[ii, ss] += 1
+
+    def update_projectiles(self, fight):
+        # ProjectilePool.update: gerak, lalu lepas yang habis umur atau keluar layar
+        m = self.p_active & fight[:, None, None]
+        self.p_x = np.where(m, self.p_x + self.p_vx, self.p_x)
+        self.p_age = np.where(m, self.p_age + 1, self.p_age)
+        width = self.weapon_width[None, :, None]
+        height = self.weapon_height[None, :, None]
+        outside = ((self.p_x + width <= 0) | (self.p_x >= SCREEN_WIDTH)
+                   | (self.p_y + height <= 0) | (self.p_y >= SCREEN_HEIGHT))
+        self.p_active &= ~(m & ((self.p_age >= self.projectile_lifetime) | outside))
+
+    def update_ai(self, mask):
+        # AIController.update untuk kedua sisi
+        ai = mask & ~self.is_dead
+        self.decision_timer = np.where(ai, self.decision_timer + 1, self.decision_timer)
+        decide = ai & (self.decision_timer >= 20)
+        if decide.any():
+            self.make_decision(decide)
+        self.decision_timer = np.where(decide, 0, self.decision_timer)
+
+        self.ai_attack_cooldown = np.where(ai & (self.ai_attack_cooldown > 0),
+                                           self.ai_attack_cooldown - 1, self.ai_attack_cooldown)
+        self.ai_skill_cooldown = np.where(ai & (self.ai_skill_cooldown > 0),
+                                          self.ai_skill_cooldown - 1, self.ai_skill_cooldown)
+        self.execute_action(ai)
+
+    def make_decision(self, decide):
+        target_dead = self.is_dead[:, ::-1]
+        self.action = np.where(decide & target_dead, NO_ACTION, self.action)
+        d = decide & ~target_dead
+
+        # Urutan angka acak sama dengan AIController.roll
+        rolls = self.rng.random((self.n, 2, 3))
+        choice = self.rng.integers(1, 4, (self.n, 2))
+        self.last_rolls = rolls
+        self.last_choice = choice
+        if self.roll_log is not None:
+            for k, side in zip(*np.nonzero(d)):
+                attack_roll, skill_roll, jump_roll = rolls[k, side]
+                self.roll_log[k][side].append((attack_roll, skill_roll, int(choice[k, side]), jump_roll))
+        attack_roll, skill_roll, jump_roll = rolls[:, :, 0], rolls[:, :, 1], rolls[:, :, 2]
+
+        # Celah antar hurtbox dibanding jangkauan senjata
+        centerx = self.centerx()
+        gap = np.abs(centerx[:, ::-1] - centerx) - (self.hit_width + self.hit_width[::-1]) // 2
+        far = d & (gap > self.reach + 50)
+        near = d & (gap <= self.reach)
+        self.action = np.where(far, CHASE, self.action)
+        self.action_duration = np.where(far, 30, self.action_duration)
+
+        attack = near & (self.ai_attack_cooldown <= 0) & (attack_roll < self.difficulty)
+        self.action = np.where(attack, ATTACK, self.action)
+        self.ai_attack_cooldown = np.where(attack, 30, self.ai_attack_cooldown)
+        self.action_duration = np.where(attack, 20, self.action_duration)
+
+        skill = near & (self.ai_skill_cooldown <= 0) & (skill_roll < self.difficulty)
+        self.action = np.where(skill & (choice == 1) & (self.energy >= 20), SKILL1, self.action)
+        self.action = np.where(skill & (choice == 2) & (self.energy >= 30), SKILL2, self.action)
+        self.action = np.where(skill & (choice == 3) & (self.ultimate >= 100), ULTIMATE, self.action)
+        self.ai_skill_cooldown = np.where(skill, 60, self.ai_skill_cooldown)
+
+        middle = d & ~far & ~near
+        self.action = np.where(middle, CHASE, self.action)
+        self.action_duration = np.where(middle, 10, self.action_duration)
+        self.jump(d & (jump_roll < self.difficulty * 0.3))
+
+    def execute_action(self, ai):
+        centerx = self.centerx()
+        chase = ai & (self.action == CHASE)
+        speed = np.where(self.difficulty > 0.6, 6, 5)
+        self.vx = np.where(chase, np.where(centerx[:, ::-1] > centerx, speed, -speed), self.vx)
+        # Aksi serangan: hadapkan ke lawan dulu
+        face = ai & (self.action != CHASE) & (self.action != NO_ACTION) & (centerx[:, ::-1] != centerx)
+        self.facing_right = np.where(face, centerx[:, ::-1] > centerx, self.facing_right)
+        self.attack(ai & (self.action == ATTACK))
+        self.use_skill(ai & (self.action == SKILL1), 1)
+        self.use_skill(ai & (self.action == SKILL2), 2)
+        self.use_skill(ai & (self.action == ULTIMATE), 3)
+
+        self.action_duration = np.where(ai, self.action_duration - 1, self.action_duration)
+        ended = ai & (self.action_duration <= 0)
+        self.action = np.where(ended, NO_ACTION, self.action)
+        self.vx = np.where(ended, 0.0, self.vx)
+
+    def jump(self, mask):
+        j = mask & ~self.jumping & ~self.is_dead
+        self.jumping |= j
+        self.vy = np.where(j, -12.0, self.vy)
+
+    def attack(self, mask):
+        a = mask & ~self.is_dead & ~self.attacking & (self.attack_timer <= 0)
+        self.attacking |= a
+        self.attack_timer = np.where(a, self.attack_cooldown, self.attack_timer)
+        self.weapon_attack(a)
+
+    def use_skill(self, mask, skill_num):
+        k = skill_num - 1
+        cost = self.skill_energy_cost[k]
+        u = (mask & ~self.is_dead & ~self.attacking & (self.skill_cooldowns[:, :, k] <= 0)
+             & (self.energy >= cost))
+        if skill_num == 3:
+            u &= self.ultimate >= self.max_ultimate
+        if not u.any():
+            return
+
+        self.attacking |= u
+        self.attack_type = np.where(u, skill_num, self.attack_type)
+        self.attack_timer = np.where(u, self.attack_cooldown, self.attack_timer)
+        self.skill_cooldowns[:, :, k] = np.where(u, self.max_skill_cooldown[k], self.skill_cooldowns[:, :, k])
+        self.energy = np.where(u, self.energy - cost, self.energy)
+        self.weapon_attack(u)
+
+        if skill_num == 3:
+            self.ultimate = np.where(u, 0.0, self.ultimate)
+            self.vy = np.where(u, -10.0, self.vy)
+            self.invincible |= u
+            self.invincible_timer = np.where(u, 0, self.invincible_timer)
+        elif skill_num == 1:
+            self.vx = np.where(u, np.where(self.facing_right, 15.0, -15.0), self.vx)
+        else:
+            self.vy = np.where(u, -8.0, self.vy)
+
+    def check_collisions(self, mask):
+        # Game.check_collisions: senjata aktif vs hurtbox fighter lawan (Fighter.update_hit_box)
+        hit_x, hit_y = self.hit_box()
+        target_x, target_y = hit_x[:, ::-1], hit_y[:, ::-1]
+        target_w, target_h = self.hit_width[::-1], self.hit_height[::-1]
+        overlap = ((self.wx < target_x + target_w) & (self.wy < target_y + target_h)
+                   & (self.wx + self.weapon_width > target_x) & (self.wy + self.weapon_height > target_y))
+        hit = mask & self.weapon_active & overlap & ~self.is_dead[:, ::-1]
+        self.take_damage(hit[:, ::-1], self.weapon_damage)
+        self.weapon_active &= ~hit
+
+        # Proyektil satu per satu sesuai urutan tembak, seperti daftar aktif ProjectilePool
+        if not self.p_active.any():
+            return
+        order = np.argsort(np.where(self.p_active, self.p_seq, np.iinfo(np.int64).max), axis=2)
+        for rank in range(PROJECTILE_SLOTS):
+            slot = order[:, :, rank:rank + 1]
+            active = np.take_along_axis(self.p_active, slot, 2)[:, :, 0]
+            px = np.take_along_axis(self.p_x, slot, 2)[:, :, 0]
+            py = np.take_along_axis(self.p_y, slot, 2)[:, :, 0]
+            overlap = ((px < target_x + target_w) & (py < target_y + target_h)
+                       & (px + self.weapon_width > target_x) & (py + self.weapon_height > target_y))
+            hit = mask & active & overlap & ~self.is_dead[:, ::-1]
+            if hit.any():
+                self.take_damage(hit[:, ::-1], self.weapon_damage)
+                ii, ss = np.nonzero(hit)
+                self.p_active[ii, ss, slot[ii, ss, 0]] = False
+
+    def take_damage(self, mask, amount):
+        d = mask & ~self.is_dead & ~self.invincible
+        self.health = np.where(d, self.health - amount, self.health)
+        self.invincible |= d
+        killed = d & (self.health <= 0)
+        self.health = np.where(killed, 0, self.health)
+        self.die(killed)
+        self.update_animation(d & ~killed, A_TAKE_HIT)
+
+    def die(self, mask):
+        d = mask & ~self.is_dead
+        self.is_dead |= d
+        self.vx = np.where(d, 0.0, self.vx)
+        self.vy = np.where(d, 0.0, self.vy)
+
+    def run(self, max_ticks=None):
+        # Jalankan sampai semua pertandingan selesai
+        start = time.perf_counter()
+        while not self.done.all() and (max_ticks is None or self.ticks < max_ticks):
+            self.step()
+        return time.perf_counter() - start
+
+def fighter_mismatches(engine, k, game):
+    # Bandingkan state pertandingan k dengan Game berbasis objek
+    fields = [("state", engine.state[k], game.game_state),
+              ("round_timer", engine.round_timer[k], game.round_timer),
+              ("wins", tuple(engine.wins[k]), (game.player1_wins, game.player2_wins))]
+    for side, fighter in enumerate((game.player1, game.player2)):
+        controller = game.player1_ai if side == 0 else game.ai_controller
+        fields += [
+            (f"p{side + 1}.rect", (engine.x[k, side], engine.y[k, side]), fighter.rect.topleft),
+            (f"p{side + 1}.velocity", (engine.vx[k, side], engine.vy[k, side]), (fighter.velocity_x, fighter.velocity_y)),
+            (f"p{side + 1}.health", engine.health[k, side], fighter.health),
+            (f"p{side + 1}.energy", engine.energy[k, side], fighter.energy),
+            (f"p{side + 1}.ultimate_gauge", engine.ultimate[k, side], fighter.ultimate_gauge),
+            (f"p{side + 1}.skill_cooldowns", tuple(engine.skill_cooldowns[k, side]),
+             tuple(fighter.skill_cooldowns[i] for i in (1, 2, 3))),
+            (f"p{side + 1}.attacking", engine.attacking[k, side], fighter.attacking),
+            (f"p{side + 1}.invincible", (engine.invincible[k, side], engine.invincible_timer[k, side]),
+             (fighter.invincible, fighter.invincible_timer)),
+            (f"p{side + 1}.animation", (ANIMATIONS[engine.anim[k, side]], engine.frame[k, side]),
+             (fighter.sprites.current_animation, fighter.sprites.current_frame)),
+            (f"p{side + 1}.weapon", (engine.weapon_active[k, side], engine.wx[k, side], engine.wy[k, side]),
+             (fighter.weapon.active, fighter.weapon.rect.x, fighter.weapon.rect.y)),
+            (f"p{side + 1}.action", ACTIONS[engine.action[k, side]], controller.current_action),
+            (f"p{side + 1}.projectiles",
+             [(engine.p_x[k, side, i], engine.p_y[k, side, i], engine.p_age[k, side, i])
+              for i in np.argsort(engine.p_seq[k, side]) if engine.p_active[k, side, i]],
+             [(p.rect.x, p.rect.y, p.age) for p in game.projectiles.active if p.owner is fighter]),
+        ]
+    return [(name, a, b) for name, a, b in fields if a != b]
+
+def difficulty_pairs(matches, levels=(0.3, 0.6, 0.9)):
+    # Difficulty (player 1, player 2) bergiliran atas semua pasangan level
+    return np.array([[levels[k % len(levels)], levels[(k // len(levels)) % len(levels)]]
+                     for k in range(matches)])
+
+def headless_game(difficulty):
+    game = main.Game(headless=True)
+    game.search_budget_ms = None  # Engine hanya meniru AI aturan biasa
+    game.player1_ai_difficulty = difficulty[0]
+    game.ai_difficulty = difficulty[1]
+    game.reset_fighters()
+    return game
+
+def cross_check(matches=16, seed=0, max_ticks=60000, levels=(0.3, 0.6, 0.9)):
+    # Jalankan engine dan Game headless berdampingan dengan angka acak yang sama
+    difficulty = difficulty_pairs(matches, levels)
+    engine = BatchEngine(matches, difficulty, seed)
+
+    games = []
+    for k in range(matches):
+        game = headless_game(difficulty[k])
+        game.auto_advance()
+        for side, controller in enumerate((game.player1_ai, game.ai_controller)):
+            controller.roll = engine_roll(engine, k, side)
+        games.append(game)
+
+    for tick in range(max_ticks):
+        if engine.done.all():
+            break
+        active = ~engine.done
+        engine.step()
+        for k in np.nonzero(active)[0]:
+            game = games[k]
+            game.update()
+            if game.game_state != MATCH_RESULT:
+                game.auto_advance()
+            mismatches = fighter_mismatches(engine, k, game)
+            if mismatches:
+                raise AssertionError(f"match {k} diverged at tick {tick}: {mismatches}")
+    return engine.ticks, int(engine.done.sum())
+
+def compare_headless(matches=16, seed=0, max_ticks=60000, levels=(0.3, 0.6, 0.9)):
+    # Jalankan engine sampai selesai, lalu setiap pertandingan diulang lewat
+    # Game.run_headless dengan angka acak yang dicatat engine. Hasilnya (tick selesai
+    # dan skor) harus sama; mengembalikan daftar pertandingan yang berbeda
+    difficulty = difficulty_pairs(matches, levels)
+    engine = BatchEngine(matches, difficulty, seed)
+    engine.roll_log = [([], []) for _ in range(matches)]
+    engine.run(max_ticks)
+
+    mismatches = []
+    for k in range(matches):
+        game = headless_game(difficulty[k])
+        for side, controller in enumerate((game.player1_ai, game.ai_controller)):
+            controller.roll = partial(next, iter(engine.roll_log[k][side]))
+        if engine.done[k]:
+            expected = [(int(engine.finish_tick[k]), *map(int, engine.wins[k]))]
+            ticks = int(engine.finish_tick[k])
+        else:
+            expected = []
+            ticks = engine.ticks
+        try:
+            results = game.run_headless(ticks)["results"]
+        except StopIteration:
+            results = "AI decided more often than in the engine"
+        if results != expected:
+            mismatches.append((k, tuple(map(float, difficulty[k])), expected, results))
+    return mismatches
+
+def engine_roll(engine, k, side):
+    def roll():
+        attack_roll, skill_roll, jump_roll = engine.last_rolls[k, side]
+        return attack_roll, skill_roll, int(engine.last_choice[k, side]), jump_roll
+    return roll
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulasi banyak pertandingan bot vs bot dengan NumPy")
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verify", action="store_true", help="cek hasil engine terhadap Game berbasis objek")
+    args = parser.parse_args()
+
+    if args.verify:
+        ticks, finished = cross_check(seed=args.seed or 0)
+        print(f"OK: {ticks} ticks identical, {finished} matches finished")
+        mismatches = compare_headless(seed=args.seed or 0)
+        if mismatches:
+            print(f"run_headless results differ: {mismatches}")
+            sys.exit(1)
+        print("OK: run_headless results identical")
+        sys.exit(0)
+
+    engine = BatchEngine(args.matches, seed=args.seed)
+    elapsed = engine.run(args.ticks)
+    fighter_ticks = args.matches * engine.ticks
+    print(f"{args.matches} matches x {engine.ticks} ticks in {elapsed:.2f}s "
+          f"({fighter_ticks / elapsed:.0f} match-ticks/sec, {int(engine.done.sum())} finished)")
@@ -0,0 +1,374 @@
+import time
+
+START = time.perf_counter()  # Untuk ukur startup dingin di proses --startup-probe
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+
+# Benchmark selalu tanpa jendela
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from collision import AllPairs, SweepAndPrune
+from presenter import Presenter
+from quality import QUALITY_LEVELS
+from main import (Game, CharacterSprites, CHARACTER_ASSETS, SCREEN_WIDTH, SCREEN_HEIGHT, TITLE_SCREEN, ROUND_PREP,
+                  FIGHTING, ROUND_OVER, MATCH_RESULT, SEARCH_DIFFICULTY, SEARCH_BUDGET_MS, SIM_DT,
+                  sprite_registry)
+
+DEFAULT_OUTPUT = "benchmark.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+# Jumlah entity untuk benchmark skala collision, rapat di sekitar SWEEP_MIN_ENTITIES
+COLLISION_COUNTS = (2, 10, 50, 100, 150, 175, 200, 300, 500)
+PRESENT_SIZES = ((800, 600), (1280, 720), (1600, 1200), (1920, 1080), (2560, 1440), (3840, 2160))
+# Batas p99 (ms) per tick, dicek tanpa baseline supaya collision per piksel tetap murah
+BUDGETS_MS = {"check_collisions": 0.25, "check_collisions.pixel": 0.25,
+              "update.fighting.search": SEARCH_BUDGET_MS + 1.0, "update.fighting.async": 1.0}
+
+def summarize(samples):
+    # Waktu per frame dalam milidetik
+    ms = [sample * 1000 for sample in samples]
+    cuts = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else ms * 99
+    return {
+        "samples": len(ms),
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": cuts[49],
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "max_ms": max(ms)
+    }
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def fighting_game(seed, pixel_collisions=False, ai_difficulty=0.6, async_ai=None):
+    # Game dengan sprite lengkap, kedua sisi dikendalikan AI, langsung bertarung
+    game = Game(player1_bot=True, seed=seed, pixel_collisions=pixel_collisions)
+    game.async_ai = async_ai
+    game.ai_difficulty = ai_difficulty
+    game.difficulty_selected = True
+    game.reset_fighters()
+    game.game_state = FIGHTING
+    return game
+
+def record_fight(game, frames):
+    # Kumpulkan snapshot tiap tick pertarungan, ulang dari awal bila ronde selesai
+    start_state = game.snapshot()
+    states = []
+    while len(states) < frames:
+        states.append(game.snapshot())
+        game.update(0)
+        if game.game_state != FIGHTING:
+            game.restore(start_state)
+    return states
+
+def bench_startup(runs, mode="sync"):
+    # Tiap run proses Python baru: import, init pygame, load asset, frame pertama.
+    # Mode staged: (frame pertama, semua asset siap) dengan load di latar.
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--startup-probe", mode],
+                                check=True, capture_output=True, text=True).stdout
+        samples.append([float(value) for value in output.split()[-2:]])
+    return [first for first, _ in samples], [ready for _, ready in samples]
+
+def startup_probe(mode):
+    game = Game(load_in_background=mode == "staged")
+    game.draw()
+    first_frame = time.perf_counter() - START
+    game.wait_for_assets()
+    print(first_frame, time.perf_counter() - START)
+
+def bench_character_load(character_type, runs):
+    samples = []
+    for _ in range(runs):
+        sprite_registry.clear()
+        samples.append(timed(CharacterSprites, character_type))
+    return samples
+
+def bench_background(game, frames, scrolling):
+    background = game.background
+    scroll = background.scroll
+    samples = []
+    for _ in range(frames):
+        if scrolling:
+            background.scroll += 5 * 0.1
+        samples.append(timed(background.draw, game.screen))
+    background.scroll = scroll
+    return samples
+
+def bench_update(game, frames):
+    start_state = game.snapshot()
+    samples = []
+    while len(samples) < frames:
+        samples.append(timed(game.update, 0))
+        if game.game_state != FIGHTING:
+            game.restore(start_state)
+    game.restore(start_state)
+    return samples
+
+def bench_async_update(game, frames):
+    # Seperti bench_update tapi diberi jeda SIM_DT supaya worker AI sempat bekerja
+    start_state = game.snapshot()
+    samples = []
+    while len(samples) < frames:
+        sample = timed(game.update, 0)
+        samples.append(sample)
+        time.sleep(max(0.0, SIM_DT - sample))
+        if game.game_state != FIGHTING:
+            game.restore(start_state)
+    game.restore(start_state)
+    return samples
+
+def bench_input_latency(seed, seconds):
+    # Game.run dengan tekanan tombol sintetis dari thread lain pada waktu acak. Event membawa
+    # waktu post, jadi latency termasuk menunggu di antrean SDL sampai present pertama
+    game = Game(seed=seed)
+    game.difficulty_selected = True
+    game.game_state = FIGHTING
+    game.draw()
+    rng = random.Random(seed)
+    
+    def press_keys():
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            time.sleep(rng.uniform(0.05, 0.15))
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_j, timestamp=time.perf_counter()))
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        
+    thread = threading.Thread(target=press_keys)
+    thread.start()
+    game.run()
+    thread.join()
+    buffer = game.input_buffer
+    return list(buffer.latencies[:min(buffer.latency_count, buffer.latency_capacity)])
+
+def bench_present(game, frames, window_size, integer_scale=False):
+    # Scale software surface internal ke window ukuran tertentu; set_mode mengganti
+    # surface display, jadi dijalankan paling akhir
+    presenter = Presenter((SCREEN_WIDTH, SCREEN_HEIGHT), window_size, mode="software",
+                          integer_scale=integer_scale)
+    game.draw_scene(presenter.surface)
+    game.draw_overlay(presenter.surface)
+    return [timed(presenter.present) for _ in range(frames)]
+
+def bench_collisions(game, states):
+    samples = []
+    for state in states:
+        game.restore(state)
+        samples.append(timed(game.check_collisions))
+    return samples
+
+def bench_mask_build(character_type, runs):
+    # Biaya membuat mask semua frame sekali, dibayar saat fighter pertama dibuat
+    samples = []
+    for _ in range(runs):
+        sprite_registry.clear_masks()
+        samples.append(timed(CharacterSprites, character_type, True, True))
+    return samples
+
+def bench_draw(game, states, game_state):
+    # Draw penuh (termasuk flip) untuk satu state game
+    samples = []
+    for state in states:
+        game.restore(state)
+        game.game_state = game_state
+        if game_state == ROUND_OVER:
+            game.round_text = "PLAYER 1 WINS!"
+            game.round_end_timer = 0
+        elif game_state == MATCH_RESULT:
+            game.player1_wins = 2
+        samples.append(timed(game.draw, 0.5))
+    return samples
+
+def bench_draw_busy(game, states):
+    # Draw fighting terberat: background bergeser dan bar HUD berubah tiap frame,
+    # jadi komposit background dan HUD tidak pernah bisa dipakai ulang.
+    # Dibandingkan antar level quality untuk melihat penghematan tiap level
+    samples = []
+    for index, state in enumerate(states):
+        game.restore(state)
+        game.game_state = FIGHTING
+        game.background.scroll += 0.5 * (index + 1)
+        game.player1.energy = game.player1.max_energy * (index % 50) / 50
+        samples.append(timed(game.draw, 0.5))
+    return samples
+
+def collision_scene(count, seed):
+    # Separuh entity hurtbox (ukuran badan), separuh hitbox (ukuran senjata),
+    # arena melebar seiring jumlah entity supaya kepadatan tetap
+    rng = random.Random(seed)
+    width = max(SCREEN_WIDTH, count * 40)
+    hurtboxes = [pygame.Rect(rng.randrange(width - 100), rng.randrange(300, 500), 100, 200)
+                 for _ in range(max(1, count // 2))]
+    hitboxes = [pygame.Rect(rng.randrange(width - 60), rng.randrange(300, 600), 60, 20)
+                for _ in range(max(1, count - count // 2))]
+    return hurtboxes, hitboxes
+
+def bench_collision_scaling(frames, seed, counts=COLLISION_COUNTS):
+    # Per tick: semua hitbox vs semua hurtbox (O(n x m)) dibanding sweep-and-prune
+    # yang diindeks ulang setiap tick
+    results = {}
+    for count in counts:
+        hurtboxes, hitboxes = collision_scene(count, seed)
+
+        all_pairs = AllPairs()
+        def naive():
+            all_pairs.build((hurtbox, hurtbox) for hurtbox in hurtboxes)
+            return all_pairs.pairs((hitbox, hitbox) for hitbox in hitboxes)
+
+        index = SweepAndPrune()
+        def sweep_and_prune():
+            index.build((hurtbox, hurtbox) for hurtbox in hurtboxes)
+            return index.pairs((hitbox, hitbox) for hitbox in hitboxes)
+
+        assert sorted(map(tuple, naive())) == sorted(map(tuple, sweep_and_prune()))
+        results[f"collisions.naive.{count}"] = [timed(naive) for _ in range(frames)]
+        results[f"collisions.sweep_and_prune.{count}"] = [timed(sweep_and_prune) for _ in range(frames)]
+    return results
+
+def run_benchmarks(frames, runs, startup_runs, seed):
+    results = {}
+    if startup_runs:
+        results["startup_first_frame"], _ = bench_startup(startup_runs)
+        (results["startup_first_frame.staged"],
+         results["startup_assets_ready.staged"]) = bench_startup(startup_runs, "staged")
+
+    # Game dibuat dulu supaya mode video sudah ada untuk convert_alpha
+    game = fighting_game(seed)
+    for character_type in CHARACTER_ASSETS:
+        results[f"character_load.{character_type}"] = bench_character_load(character_type, runs)
+
+    results["background_draw.scrolling"] = bench_background(game, frames, True)
+    results["background_draw.static"] = bench_background(game, frames, False)
+    results["update.fighting"] = bench_update(game, frames)
+    search_game = fighting_game(seed, ai_difficulty=SEARCH_DIFFICULTY)
+    results["update.fighting.search"] = bench_update(search_game, frames)
+    search = search_game.ai_controller
+    print(f"AI search: {search.rollouts / max(search.decisions, 1):.1f} rollouts/decision, "
+          f"{search.nodes_per_sec():.0f} nodes/sec")
+    async_game = fighting_game(seed, ai_difficulty=SEARCH_DIFFICULTY, async_ai="thread")
+    results["update.fighting.async"] = bench_async_update(async_game, min(frames, 300))
+    worker = async_game.ai_controller
+    average, worst = worker.latency_ms()
+    print(f"AI async: latency {average:.1f} ms avg, {worst:.1f} ms max, {worker.late} late decisions")
+    async_game.close()
+    results["input_latency"] = bench_input_latency(seed, min(frames, 300) * SIM_DT)
+
+    states = record_fight(game, frames)
+    results["check_collisions"] = bench_collisions(game, states)
+    for character_type in CHARACTER_ASSETS:
+        results[f"mask_build.{character_type}"] = bench_mask_build(character_type, runs)
+    pixel_game = fighting_game(seed, pixel_collisions=True)
+    results["check_collisions.pixel"] = bench_collisions(pixel_game, record_fight(pixel_game, frames))
+    results.update(bench_collision_scaling(min(frames, 200), seed))
+    for name, game_state in (("title", TITLE_SCREEN), ("round_prep", ROUND_PREP), ("fighting", FIGHTING),
+                             ("round_over", ROUND_OVER), ("match_result", MATCH_RESULT)):
+        results[f"draw.{name}"] = bench_draw(game, states, game_state)
+    # Biaya draw fighting (background bergeser, HUD berubah) di tiap level quality governor
+    for level in range(len(QUALITY_LEVELS)):
+        game.set_quality(level)
+        results[f"draw.fighting.quality{level}"] = bench_draw_busy(game, states)
+    game.set_quality(0)
+    for width, height in PRESENT_SIZES:
+        results[f"present.software.{width}x{height}"] = bench_present(game, min(frames, 200), (width, height))
+        results[f"present.integer.{width}x{height}"] = bench_present(game, min(frames, 200), (width, height), True)
+
+    return {name: summarize(samples) for name, samples in results.items()}
+
+def compare(results, baseline, tolerance, min_delta):
+    # Regresi bila p50 atau p95 lebih lambat dari baseline melebihi toleransi,
+    # selisih di bawah min_delta ms dianggap noise timer
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            slower = result[key] - base[key]
+            if slower > min_delta and result[key] > base[key] * (1 + tolerance):
+                regressions.append((name, key, base[key], result[key]))
+    return regressions
+
+def over_budget(results, budgets=BUDGETS_MS):
+    return [(name, results[name]["p99_ms"], budget) for name, budget in budgets.items()
+            if name in results and results[name]["p99_ms"] > budget]
+
+def print_results(results, baseline):
+    print(f"{'benchmark':32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'vs base':>8}")
+    for name, result in results.items():
+        change = ""
+        base = baseline.get(name)
+        if base is not None and base["p50_ms"] > 0:
+            change = f"{(result['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%"
+        print(f"{name:32} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} {result['p99_ms']:9.3f} {change:>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark frame loop, load asset dan startup")
+    parser.add_argument("--frames", type=int, default=600, help="jumlah frame per benchmark frame loop")
+    parser.add_argument("--runs", type=int, default=10, help="jumlah load per karakter")
+    parser.add_argument("--startup-runs", type=int, default=5, help="jumlah proses untuk startup dingin, 0 = lewati")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="file hasil JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="file baseline untuk perbandingan")
+    parser.add_argument("--save-baseline", action="store_true", help="simpan hasil sebagai baseline baru")
+    parser.add_argument("--no-baseline", action="store_true", help="hanya cek BUDGETS_MS, tanpa baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="batas perlambatan sebelum dianggap regresi")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="selisih minimum (ms) untuk regresi")
+    parser.add_argument("--startup-probe", choices=("sync", "staged"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup_probe:
+        startup_probe(args.startup_probe)
+        sys.exit()
+    # Tanpa baseline regresi tidak bisa dideteksi, jadi harus dipilih secara eksplisit
+    compare_baseline = not args.save_baseline and not args.no_baseline
+    if compare_baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline {args.baseline} tidak ada, jalankan sekali dengan --save-baseline "
+                     "atau pakai --no-baseline")
+
+    results = run_benchmarks(args.frames, args.runs, args.startup_runs, args.seed)
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "sprite_bundle": sprite_registry.bundle is not None,
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = {}
+    if compare_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    print(f"Wrote {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline {args.baseline}")
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    for name, key, base, value in regressions:
+        print(f"REGRESSION {name} {key}: {base:.3f} ms -> {value:.3f} ms")
+    if compare_baseline:
+        # Benchmark baru belum punya angka pembanding sampai baseline disimpan ulang
+        for name in results.keys() - baseline.keys():
+            print(f"NOT IN BASELINE {name}")
+    budget_failures = over_budget(results)
+    for name, value, budget in budget_failures:
+        print(f"OVER BUDGET {name} p99: {value:.3f} ms > {budget:.3f} ms")
+    pygame.quit()
+    sys.exit(1 if regressions or budget_failures else 0)
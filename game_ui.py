@@ -1,62 +1,93 @@
 import pygame
+from collections import OrderedDict
+
+class TextCache:
+    # Cache surface teks, key: (font, teks, warna)
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
 
 class GameUI:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, text_cache=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.small_font = pygame.font.Font(None, 36)
-        
+        self.text_cache = text_cache if text_cache is not None else TextCache()
+
+        # Bar dimensions
+        self.bar_height = 20
+        self.health_width = 200
+        self.energy_width = 150
+        self.ultimate_width = 100
+        self.padding = 10
+
+        # Seluruh HUD digambar ke satu surface dan di-blit sekali per frame
+        navbar_height = self.padding + 3 * self.bar_height + 2 * 5
+        self.rect = pygame.Rect(self.padding, self.padding,
+                                screen_width - 2 * self.padding, navbar_height - self.padding)
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self.last_state = None
+
     def draw_navbar(self, screen, player1, player2, round_timer, fps):
-        # Draw navbar background
-        navbar_height = 80
-        pygame.draw.rect(screen, (40, 40, 40), (0, 0, self.screen_width, navbar_height))
-        
+        # HUD hanya digambar ulang bila timer atau lebar bar berubah
+        state = (round_timer // fps, self.bar_widths(player1), self.bar_widths(player2))
+        if state != self.last_state:
+            self.last_state = state
+            self.redraw(player1, player2, round_timer, fps)
+        return screen.blit(self.surface, self.rect)
+
+    def bar_widths(self, player):
+        return (int(self.health_width * player.health / player.max_health),
+                int(self.energy_width * player.energy / player.max_energy),
+                int(self.ultimate_width * player.ultimate_gauge / player.max_ultimate))
+
+    def redraw(self, player1, player2, round_timer, fps):
+        self.surface.fill((0, 0, 0, 0))
+
         # Draw timer
         minutes = round_timer // (60 * fps)
         seconds = (round_timer % (60 * fps)) // fps
         timer_text = f"{minutes:02d}:{seconds:02d}"
-        timer_surface = self.small_font.render(timer_text, True, (255, 255, 255))
-        timer_rect = timer_surface.get_rect(center=(self.screen_width/2, 25))
-        screen.blit(timer_surface, timer_rect)
-        
+        timer_surface = self.text_cache.render(self.small_font, timer_text, (255, 255, 255))
+        timer_rect = timer_surface.get_rect(center=(self.screen_width/2 - self.rect.x, 25 - self.rect.y))
+        self.surface.blit(timer_surface, timer_rect)
+
         # Draw player status bars
-        self.draw_player_status(screen, player1, True)
-        self.draw_player_status(screen, player2, False)
-        
-    def draw_player_status(self, screen, player, is_player_one):
-        # Bar dimensions
-        bar_height = 20
-        health_width = 200
-        energy_width = 150
-        ultimate_width = 100
-        padding = 10
-        
-        # Position based on player
-        if is_player_one:
-            base_x = padding
-        else:
-            base_x = self.screen_width - health_width - padding
-            
-        base_y = padding
-        
+        self.draw_player_status(player1, True)
+        self.draw_player_status(player2, False)
+
+    def draw_player_status(self, player, is_player_one):
+        health, energy, ultimate = self.bar_widths(player)
+
+        # Posisi relatif terhadap surface HUD
+        def bar_x(width):
+            if is_player_one:
+                return 0
+            return self.rect.width - width
+
         # Health bar
-        pygame.draw.rect(screen, (255, 0, 0), (base_x, base_y, health_width, bar_height))
-        health_percent = player.health / player.max_health
-        pygame.draw.rect(screen, (0, 255, 0), (base_x, base_y, health_width * health_percent, bar_height))
-        
+        y = 0
+        pygame.draw.rect(self.surface, (255, 0, 0), (bar_x(self.health_width), y, self.health_width, self.bar_height))
+        pygame.draw.rect(self.surface, (0, 255, 0), (bar_x(self.health_width), y, health, self.bar_height))
+
         # Energy bar
-        energy_x = base_x if is_player_one else self.screen_width - energy_width - padding
-        energy_y = base_y + bar_height + 5
-        pygame.draw.rect(screen, (50, 50, 255), (energy_x, energy_y, energy_width, bar_height))
-        energy_percent = player.energy / player.max_energy
-        pygame.draw.rect(screen, (100, 100, 255), (energy_x, energy_y, energy_width * energy_percent, bar_height))
-        
+        y += self.bar_height + 5
+        pygame.draw.rect(self.surface, (50, 50, 255), (bar_x(self.energy_width), y, self.energy_width, self.bar_height))
+        pygame.draw.rect(self.surface, (100, 100, 255), (bar_x(self.energy_width), y, energy, self.bar_height))
+
         # Ultimate gauge
-        ultimate_x = base_x if is_player_one else self.screen_width - ultimate_width - padding
-        ultimate_y = energy_y + bar_height + 5
-        pygame.draw.rect(screen, (255, 200, 0), (ultimate_x, ultimate_y, ultimate_width, bar_height))
-        ultimate_percent = player.ultimate_gauge / player.max_ultimate
-        pygame.draw.rect(screen, (255, 255, 0), (ultimate_x, ultimate_y, ultimate_width * ultimate_percent, bar_height))
-        
-        # Draw skill cooldown indicators
-        self.draw_skill_cooldowns(screen, player, base_x, ultimate_y + bar_height + 5) 
\ No newline at end of file
+        y += self.bar_height + 5
+        pygame.draw.rect(self.surface, (255, 200, 0), (bar_x(self.ultimate_width), y, self.ultimate_width, self.bar_height))
+        pygame.draw.rect(self.surface, (255, 255, 0), (bar_x(self.ultimate_width), y, ultimate, self.bar_height))
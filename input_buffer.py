@@ -0,0 +1,61 @@
+from array import array
+
+class InputBuffer:
+    # Ring buffer input bertimestamp. Counter head/applied/shown terus naik,
+    # index slot = counter % capacity:
+    #   [shown, applied)  sudah diterapkan ke tick, menunggu present pertama
+    #   [applied, head)   belum diterapkan
+    def __init__(self, capacity=256, latency_capacity=4096):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.inputs = array("H", bytes(2 * capacity))
+        self.head = 0
+        self.applied = 0
+        self.shown = 0
+        self.dropped = 0  # Entry yang tertimpa sebelum tampil, latency-nya tidak tercatat
+
+        # Latency (detik) dari timestamp input ke present yang pertama memperlihatkan efeknya
+        self.latency_capacity = latency_capacity
+        self.latencies = array("d", bytes(8 * latency_capacity))
+        self.latency_count = 0
+
+    def push(self, inputs, timestamp):
+        if self.head - self.shown == self.capacity:
+            # Penuh: entry tertua dibuang (bit-nya tetap ikut tick bila belum diterapkan)
+            if self.applied == self.shown:
+                self.inputs[(self.shown + 1) % self.capacity] |= self.inputs[self.shown % self.capacity]
+                self.applied += 1
+            self.shown += 1
+            self.dropped += 1
+        i = self.head % self.capacity
+        self.times[i] = timestamp
+        self.inputs[i] = inputs
+        self.head += 1
+
+    def take(self):
+        # Gabungan semua input yang belum diterapkan, dipanggil sekali per tick
+        if self.applied == self.head:
+            return 0
+        inputs = 0
+        for n in range(self.applied, self.head):
+            inputs |= self.inputs[n % self.capacity]
+        self.applied = self.head
+        return inputs
+
+    def presented(self, timestamp):
+        # Dipanggil setelah present: input yang sudah diterapkan kini terlihat
+        for n in range(self.shown, self.applied):
+            self.latencies[self.latency_count % self.latency_capacity] = timestamp - self.times[n % self.capacity]
+            self.latency_count += 1
+        self.shown = self.applied
+
+    def clear_latencies(self):
+        self.latency_count = 0
+
+    def percentiles(self, points=(50, 95, 99)):
+        # Nearest rank atas latency terakhir (milidetik), None bila belum ada sampel
+        n = min(self.latency_count, self.latency_capacity)
+        if n == 0:
+            return None
+        ms = sorted(self.latencies[k] * 1000 for k in range(n))
+        return {point: ms[min(n - 1, (point * n + 99) // 100 - 1)] for point in points}
@@ -1,17 +1,57 @@
+import time
+
+STARTUP_TIME = time.perf_counter()  # Untuk ukur waktu sampai frame pertama
+
 import pygame
 import sys
+import argparse
 import os
 import random
 import math
+import weakref
+import zlib
+from collections import OrderedDict, deque
+from functools import partial
+from operator import attrgetter
+
+from ai_worker import ProcessPlanner, ThreadPlanner
+from asset_loader import AssetLoader
+from collision import SWEEP_MIN_ENTITIES, AllPairs, SweepAndPrune
+from presenter import PRESENT_MODES, Presenter
+from game_ui import GameUI, TextCache
+from input_buffer import InputBuffer
+from netplay import DEFAULT_PORT, RollbackSession, connect, open_link, parse_address, simulation_config
+from profiler import FrameProfiler
+from projectiles import ProjectilePool
+from quality import QUALITY_LEVELS, QualityGovernor
+from replay import ReplayRecorder, read_replay
+from spectator import SpectatorServer
+from sprite_bundle import SpriteBundle, hash_sources, native_pixel_format, write_bundle
 
-# Inisialisasi Pygame
-pygame.init()
+# Mode tanpa jendela butuh driver dummy sebelum pygame diinisialisasi
+if any(arg in sys.argv for arg in ("--headless", "--bake", "--compare-startup", "--replay")):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Inisialisasi Pygame: hanya display dan font, subsistem lain (audio, joystick) tidak dipakai
+pygame.display.init()
+pygame.font.init()
 
 # Konstanta
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
 
+# Simulasi berjalan dengan langkah tetap, terlepas dari kecepatan render
+SIM_DT = 1 / FPS
+MAX_SIM_STEPS = 5  # Batas langkah kejar per frame supaya tidak spiral of death
+
+# AI SULIT memakai pencarian lookahead dengan batas waktu per keputusan
+SEARCH_DIFFICULTY = 0.9
+SEARCH_BUDGET_MS = 4.0
+SEARCH_HORIZON = 30  # Tick yang disimulasikan per rollout
+SEARCH_REPLAY_ROLLOUTS = 12  # Jumlah rollout tetap saat merekam replay
+ASYNC_SEARCH_BUDGET_MS = 10.0  # Di worker pencarian tidak memakan waktu frame
+
 # Warna
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -36,32 +76,165 @@ ATTACK2 = "attack2"
 ATTACK3 = "attack3"
 TAKE_HIT = "take_hit"
 DEATH = "death"
+# Kode animasi di stream penonton (spectator.py), urutan tidak boleh berubah
+SPECTATOR_ANIMATIONS = (IDLE, RUN, JUMP, FALL, ATTACK1, ATTACK2, ATTACK3, TAKE_HIT, DEATH)
+SPECTATOR_ANIMATION_CODES = {name: code for code, name in enumerate(SPECTATOR_ANIMATIONS)}
+
+# Input player 1 per tick simulasi sebagai bitmask (juga format replay)
+INPUT_LEFT = 1 << 0
+INPUT_RIGHT = 1 << 1
+INPUT_SPACE = 1 << 2
+INPUT_ATTACK = 1 << 3
+INPUT_SKILL1 = 1 << 4
+INPUT_SKILL2 = 1 << 5
+INPUT_ULTIMATE = 1 << 6
+INPUT_EASY = 1 << 7
+INPUT_MEDIUM = 1 << 8
+INPUT_HARD = 1 << 9
+
+KEY_INPUTS = {
+    pygame.K_SPACE: INPUT_SPACE,
+    pygame.K_j: INPUT_ATTACK,
+    pygame.K_k: INPUT_SKILL1,
+    pygame.K_l: INPUT_SKILL2,
+    pygame.K_i: INPUT_ULTIMATE,
+    pygame.K_1: INPUT_EASY,
+    pygame.K_2: INPUT_MEDIUM,
+    pygame.K_3: INPUT_HARD
+}
+# Tombol gerak dibaca sebagai keadaan ditahan, tekanannya juga masuk InputBuffer
+# supaya tap singkat tetap terasa satu tick dan latency-nya terukur
+HOLD_INPUTS = {
+    pygame.K_a: INPUT_LEFT,
+    pygame.K_d: INPUT_RIGHT
+}
+
+# Background parallax, urutan dari layer paling jauh
+BACKGROUND_PATH = os.path.join("assets", "background", "parallax_demon_woods_pack", "layers")
+BACKGROUND_LAYERS = ["parallax-demon-woods-bg.png",
+                     "parallax-demon-woods-far-trees.png",
+                     "parallax-demon-woods-mid-trees.png",
+                     "parallax-demon-woods-close-trees.png"]
+# Layer yang disembunyikan per quality level: far trees di level 1+, semua pohon di level 3.
+# Backdrop opaque tetap digambar, fill warna lalu blend layer transparan justru lebih
+# lambat daripada blit backdrop. Tiap layer pohon ~0.25 ms per frame saat bergeser
+QUALITY_HIDDEN_LAYERS = {1: (1,), 2: (1,), 3: (1, 2, 3)}
+
+# Bundle piksel hasil bake (python main.py --bake)
+SPRITE_BUNDLE_PATH = os.path.join("assets", "sprites.bundle")
+
+# Data aset karakter: folder sprite, skala, ukuran frame idle asli dan animasi.
+# hit_box: ukuran hurtbox badan dan jarak kaki dari bawah frame (piksel layar)
+CHARACTER_ASSETS = {
+    "huntress": {
+        "path": "assets/Huntress/Sprites",
+        "scale": 2.5,
+        "frame_size": (150, 150),
+        "hit_box": (70, 130),
+        "hit_box_bottom": 132,
+        "animations": {
+            IDLE: ("Idle.png", 8),
+            RUN: ("Run.png", 8),
+            JUMP: ("Jump.png", 2),
+            FALL: ("Fall.png", 2),
+            ATTACK1: ("Attack1.png", 5),
+            ATTACK2: ("Attack2.png", 5),
+            ATTACK3: ("Attack3.png", 7),
+            DEATH: ("Death.png", 8),
+            TAKE_HIT: ("Take hit.png", 3)
+        }
+    },
+    "evil_wizard": {
+        "path": "assets/EVil Wizard 2/Sprites",
+        "scale": 2.0,
+        "frame_size": (250, 250),
+        "hit_box": (100, 200),
+        "hit_box_bottom": 166,
+        "animations": {
+            IDLE: ("Idle.png", 8),
+            RUN: ("Run.png", 8),
+            JUMP: ("Jump.png", 2),
+            FALL: ("Fall.png", 2),
+            ATTACK1: ("Attack1.png", 5),
+            ATTACK2: ("Attack2.png", 5),
+            DEATH: ("Death.png", 8),
+            TAKE_HIT: ("Take hit.png", 3)
+        }
+    }
+}
+
+def background_bundle_key(index):
+    return f"background/{index}"
+
+def scale_background_layer(img):
+    # Scale image to fit screen height while maintaining aspect ratio
+    scale = SCREEN_HEIGHT / img.get_height()
+    new_width = int(img.get_width() * scale)
+    return pygame.transform.scale(img, (new_width, SCREEN_HEIGHT))
+
+def load_background_layer(index, decoded=None):
+    bundle = sprite_registry.bundle
+    if bundle is not None and background_bundle_key(index) in bundle:
+        return bundle.get_surface(background_bundle_key(index))
+    if decoded is not None:
+        # Sudah di-decode dan di-scale thread latar, tinggal konversi ke format display
+        return decoded.convert_alpha()
+    
+    img = pygame.image.load(os.path.join(BACKGROUND_PATH, BACKGROUND_LAYERS[index])).convert_alpha()
+    return scale_background_layer(img)
+
+def decode_background_layers(bundle):
+    # Untuk thread latar: layer PNG di-decode dan di-scale tanpa convert(). None untuk
+    # layer yang ada di bundle atau gagal di-load, dikerjakan thread utama seperti biasa
+    layers = []
+    for i, filename in enumerate(BACKGROUND_LAYERS):
+        img = None
+        if bundle is None or background_bundle_key(i) not in bundle:
+            try:
+                img = scale_background_layer(pygame.image.load(os.path.join(BACKGROUND_PATH, filename)))
+            except (pygame.error, OSError):
+                pass
+        layers.append(img)
+    return layers
 
 class ParallaxBackground:
-    def __init__(self):
+    def __init__(self, load_images=True, decoded=None):
+        # decoded: hasil decode_background_layers dari thread latar
         self.layers = []
         self.scroll = 0
+        self.hidden_layers = ()  # Index layer yang tidak digambar (quality governor)
+        
+        # Komposit background, dibuat saat kamera diam dan dipakai ulang selama
+        # scroll tidak berubah
+        self.composite = None
+        self.composite_valid = False
+        self.last_scroll = None
+        # Salinan layer RLE per surface tujuan blit
+        self.target_images = weakref.WeakKeyDictionary()
+        
+        if not load_images:
+            return
         
         # Load background layers
         try:
-            bg_path = os.path.join("assets", "background", "parallax_demon_woods_pack", "layers")
-            layer_files = ["parallax-demon-woods-bg.png",
-                         "parallax-demon-woods-far-trees.png",
-                         "parallax-demon-woods-mid-trees.png",
-                         "parallax-demon-woods-close-trees.png"]
-            
             self.layers = []
-            for i, file in enumerate(layer_files):
-                img = pygame.image.load(os.path.join(bg_path, file)).convert_alpha()
-                # Scale image to fit screen height while maintaining aspect ratio
-                scale = SCREEN_HEIGHT / img.get_height()
-                new_width = int(img.get_width() * scale)
-                img = pygame.transform.scale(img, (new_width, SCREEN_HEIGHT))
+            for i in range(len(BACKGROUND_LAYERS)):
+                img = load_background_layer(i, decoded[i] if decoded else None)
+                
+                # Layer tanpa transparansi tidak perlu alpha blending,
+                # layer transparan dipercepat dengan RLE
+                opaque = pygame.mask.from_surface(img, 254).count() == img.get_width() * img.get_height()
+                if opaque:
+                    img = img.convert()
+                else:
+                    img.set_alpha(255, pygame.RLEACCEL)
                 
                 # Parallax speed decreases for background layers
                 speed = 0.2 + (i * 0.2)  # 0.2, 0.4, 0.6, 0.8
                 self.layers.append({
                     "image": img,
+                    "width": img.get_width(),
+                    "opaque": opaque,
                     "speed": speed,
                     "pos": 0
                 })
@@ -74,20 +247,60 @@ class ParallaxBackground:
     def update(self, player_velocity):
         self.scroll += player_velocity * 0.1
         
+    def set_hidden_layers(self, indices):
+        if indices != self.hidden_layers:
+            self.hidden_layers = indices
+            self.composite_valid = False
+        
     def draw(self, screen):
         if not self.layers:
             screen.fill((100, 150, 200))  # Fallback sky blue color
             return
+        
+        # Selama kamera bergerak layer langsung digambar ke layar, komposit baru
+        # dibuat sekali begitu scroll berhenti berubah
+        if self.scroll != self.last_scroll:
+            self.last_scroll = self.scroll
+            self.composite_valid = False
+            self.draw_layers(screen)
+            return
+        
+        if self.composite is None:
+            self.composite = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        if not self.composite_valid:
+            self.draw_layers(self.composite)
+            self.composite_valid = True
+        screen.blit(self.composite, (0, 0))
+    
+    def layer_images(self, target):
+        # SDL meng-encode ulang RLE setiap kali tujuan blit surface berganti (~28 ms
+        # untuk semua layer), jadi tiap tujuan punya salinan layer RLE sendiri.
+        # Tujuan pertama memakai surface aslinya
+        images = self.target_images.get(target)
+        if images is None:
+            images = []
+            for layer in self.layers:
+                image = layer["image"]
+                if not layer["opaque"] and self.target_images:
+                    image = image.copy()
+                    image.set_alpha(255, pygame.RLEACCEL)
+                images.append(image)
+            self.target_images[target] = images
+        return images
+    
+    def draw_layers(self, target):
+        images = self.layer_images(target)
+        layers = [(layer, images[i]) for i, layer in enumerate(self.layers) if i not in self.hidden_layers]
+        if not layers or not layers[0][0]["opaque"]:
+            target.fill((100, 150, 200))
             
-        for layer in self.layers:
-            # Calculate how many times we need to tile the image
-            image_width = layer["image"].get_width()
-            tiles = math.ceil(SCREEN_WIDTH / image_width) + 2
-            
-            for i in range(tiles):
-                # Calculate x position with parallax effect
-                x = (i * image_width) - int(self.scroll * layer["speed"]) % image_width
-                screen.blit(layer["image"], (x, 0))
+        for layer, image in layers:
+            # Hanya tile yang terlihat di layar yang di-blit
+            image_width = layer["width"]
+            x = -(int(self.scroll * layer["speed"]) % image_width)
+            while x < SCREEN_WIDTH:
+                target.blit(image, (x, 0))
+                x += image_width
 
 class SpriteSheet:
     def __init__(self, image, sprite_width, sprite_height):
@@ -104,55 +317,295 @@ class SpriteSheet:
             image = pygame.transform.scale(image, (new_width, new_height))
         return image
 
+def cut_frames(sheet, frames, scale):
+    sprite_sheet = SpriteSheet(sheet, sheet.get_width() // frames, sheet.get_height())
+    return [sprite_sheet.get_sprite(i, scale) for i in range(frames)]
+
+def make_facing_frames(frame):
+    # Buat varian hadap kanan/kiri beserta versi transparan (kedip invincible)
+    # sekali saat load, supaya frame bersama tidak pernah diubah
+    facings = []
+    for image in (frame, pygame.transform.flip(frame, True, False)):
+        faded = image.copy()
+        faded.set_alpha(128)
+        facings.append((image, faded))
+    return facings
+
+def facing_sheets(frames):
+    # (frame hadap kanan, frame hadap kiri), masing-masing pasangan (normal, transparan)
+    right, left = [], []
+    for frame in frames:
+        right_frame, left_frame = make_facing_frames(frame)
+        right.append(right_frame)
+        left.append(left_frame)
+    return tuple(right), tuple(left)
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def mask_bytes(mask):
+    # pygame.mask menyimpan satu bit per piksel
+    width, height = mask.get_size()
+    return (width * height + 7) // 8
+
+class SpriteRegistry:
+    # Cache sprite untuk satu proses, key: (karakter, animasi, skala, hadap kiri)
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        # key -> [frames, ukuran byte, mask per frame atau None]. Mask (collision per piksel)
+        # ikut entry frame-nya, jadi dihitung di batas byte dan dibuang bersama frame
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.bundle = None
+        
+    def get(self, character_type, animation, scale, flipped):
+        key = (character_type, animation, scale, flipped)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        
+        self.misses += 1
+        return self.load_sheet(character_type, animation, scale)[flipped]
+    
+    def load_frames(self, character_type, animation, scale):
+        # Frame hasil bake dipakai langsung, kalau tidak decode dan scale PNG
+        data = CHARACTER_ASSETS[character_type]
+        filename, frames = data["animations"][animation]
+        self.loads += 1
+        
+        keys = [frame_bundle_key(character_type, animation, scale, i) for i in range(frames)]
+        if self.bundle is not None and all(key in self.bundle for key in keys):
+            return [self.bundle.get_surface(key) for key in keys]
+        
+        sheet = pygame.image.load(os.path.join(data["path"], filename)).convert_alpha()
+        return cut_frames(sheet, frames, scale)
+    
+    def load_sheet(self, character_type, animation, scale):
+        # Satu kali load sheet mengisi kedua arah hadap
+        sheet = facing_sheets(self.load_frames(character_type, animation, scale))
+        self.add_sheet(character_type, animation, scale, sheet)
+        return sheet
+    
+    def add_sheet(self, character_type, animation, scale, sheet):
+        right, left = sheet
+        self.store((character_type, animation, scale, False), right)
+        self.store((character_type, animation, scale, True), left)
+    
+    def store(self, key, frames):
+        if key in self.entries:
+            self.used_bytes -= self.entries.pop(key)[1]
+        size = sum(surface_bytes(image) for pair in frames for image in pair)
+        self.entries[key] = [frames, size, None]
+        self.used_bytes += size
+        self.evict()
+        
+    def evict(self):
+        # Buang entry yang paling lama tidak dipakai bila melebihi batas
+        while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.used_bytes -= evicted_size
+            self.evictions += 1
+    
+    def get_masks(self, character_type, animation, scale, flipped):
+        # Mask dibuat sekali per frame dan arah hadap dari frame di registry
+        key = (character_type, animation, scale, flipped)
+        frames = self.get(character_type, animation, scale, flipped)  # Juga memindah key ke akhir LRU
+        entry = self.entries.get(key)
+        if entry is None:
+            # Batas byte lebih kecil dari satu animasi: frame sudah terbuang lagi, mask tidak di-cache
+            return tuple(pygame.mask.from_surface(image) for image, _ in frames)
+        if entry[2] is None:
+            entry[2] = tuple(pygame.mask.from_surface(image) for image, _ in frames)
+            size = sum(mask_bytes(mask) for mask in entry[2])
+            entry[1] += size
+            self.used_bytes += size
+            self.evict()
+        return entry[2]
+    
+    def clear_masks(self):
+        # Frame tetap di cache, mask dibuat ulang saat diminta lagi
+        for entry in self.entries.values():
+            if entry[2] is not None:
+                size = sum(mask_bytes(mask) for mask in entry[2])
+                entry[1] -= size
+                self.used_bytes -= size
+                entry[2] = None
+    
+    def clear(self):
+        # Counter ikut di-reset supaya stats() hanya menghitung sejak clear terakhir
+        self.entries.clear()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+    
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "used_bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "evictions": self.evictions
+        }
+
+sprite_registry = SpriteRegistry()
+
+def frame_bundle_key(character_type, animation, scale, index):
+    return f"{character_type}/{animation}/{scale}/{index}"
+
+def sprite_source_files():
+    paths = [os.path.join(BACKGROUND_PATH, filename) for filename in BACKGROUND_LAYERS]
+    for data in CHARACTER_ASSETS.values():
+        for filename, frames in data["animations"].values():
+            paths.append(os.path.join(data["path"], filename))
+    return paths
+
+def sprite_source_hash():
+    # Ikut hash parameter yang mempengaruhi hasil scale
+    settings = repr((SCREEN_HEIGHT, sorted((name, data["scale"], sorted(data["animations"].items()))
+                                           for name, data in CHARACTER_ASSETS.items())))
+    return hash_sources(sprite_source_files(), settings)
+
+def open_sprite_bundle(path=SPRITE_BUNDLE_PATH):
+    # Buka bundle bila ada dan masih cocok dengan file sumber, tanpa memasangnya
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = SpriteBundle(path)
+    except (OSError, ValueError) as e:
+        print(f"Couldn't open sprite bundle {path}: {e}")
+        return None
+    if bundle.source_hash != sprite_source_hash():
+        print(f"Sprite bundle {path} is stale, loading PNG files instead (run main.py --bake)")
+        bundle.close()
+        return None
+    return bundle
+
+def load_sprite_bundle(path=SPRITE_BUNDLE_PATH):
+    # Pasang bundle ke registry bila ada dan masih cocok dengan file sumber
+    bundle = open_sprite_bundle(path)
+    if bundle is not None:
+        sprite_registry.bundle = bundle
+    return bundle
+
+def decode_character_sheets(character_type, bundle, pixel_format):
+    # Untuk thread latar: frame final tiap animasi (facing_sheets) dari bundle atau PNG,
+    # tanpa convert() dan tanpa menyentuh sprite_registry. Animasi yang gagal di-load atau
+    # bundle yang formatnya beda dari display (pixel_format) dikerjakan thread utama
+    data = CHARACTER_ASSETS[character_type]
+    scale = data["scale"]
+    sheets = {}
+    for anim_name, (filename, frames) in data["animations"].items():
+        keys = [frame_bundle_key(character_type, anim_name, scale, i) for i in range(frames)]
+        if bundle is not None and all(key in bundle for key in keys):
+            if bundle.pixel_format != pixel_format:
+                continue
+            sheets[anim_name] = facing_sheets([bundle.raw_surface(key) for key in keys])
+            continue
+        try:
+            sheet = pygame.image.load(os.path.join(data["path"], filename))
+        except (pygame.error, OSError):
+            continue
+        sheets[anim_name] = facing_sheets(cut_frames(sheet, frames, scale))
+    return sheets
+
+def bake_sprite_bundle(path=SPRITE_BUNDLE_PATH):
+    # Tulis semua frame final dan layer background ke satu file
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    previous_bundle = sprite_registry.bundle
+    sprite_registry.bundle = None
+    
+    surfaces = {}
+    for character_type, data in CHARACTER_ASSETS.items():
+        for anim_name in data["animations"]:
+            frames = sprite_registry.load_frames(character_type, anim_name, data["scale"])
+            for i, frame in enumerate(frames):
+                surfaces[frame_bundle_key(character_type, anim_name, data["scale"], i)] = frame
+    for i in range(len(BACKGROUND_LAYERS)):
+        surfaces[background_bundle_key(i)] = load_background_layer(i)
+    
+    if previous_bundle is not None:
+        previous_bundle.close()
+    return write_bundle(path, surfaces, sprite_source_hash())
+
+def measure_asset_startup(use_bundle):
+    # Waktu load background dan kedua karakter dari registry kosong
+    sprite_registry.clear()
+    if use_bundle:
+        if load_sprite_bundle() is None:
+            return None
+    elif sprite_registry.bundle is not None:
+        sprite_registry.bundle.close()
+        sprite_registry.bundle = None
+    
+    start = time.perf_counter()
+    ParallaxBackground()
+    CharacterSprites("huntress")
+    CharacterSprites("evil_wizard")
+    return time.perf_counter() - start
+
 class CharacterSprites:
-    def __init__(self, character_type):
+    animation_speed = 0.2
+    # Tanpa __dict__: current_* ikut snapshot Fighter setiap tick
+    __slots__ = ("character_type", "animations", "masks", "current_frame", "animation_timer",
+                 "frame_size", "frame_counts", "current_animation")
+    
+    def __init__(self, character_type, load_images=True, load_masks=False):
+        self.character_type = character_type
         self.animations = {}
-        self.frame_counts = {}
+        self.masks = {}  # Sama dengan animations, tapi pygame.mask per frame
         self.current_frame = 0
-        self.animation_speed = 0.2
         self.animation_timer = 0
         
-        # Load sprite sheets
-        sprite_path = "assets/Huntress/Sprites" if character_type == "huntress" else "assets/EVil Wizard 2/Sprites"
-        scale = 2.5 if character_type == "huntress" else 2.0
-        
-        # Load dan setup semua animasi
-        animations_data = {
-            IDLE: ("Idle.png", 8),
-            RUN: ("Run.png", 8),
-            JUMP: ("Jump.png", 2),
-            FALL: ("Fall.png", 2),
-            ATTACK1: ("Attack1.png", 5),
-            ATTACK2: ("Attack2.png", 5),
-            DEATH: ("Death.png", 8),
-            TAKE_HIT: ("Take hit.png", 3)
-        }
-        
-        if character_type == "huntress":
-            animations_data[ATTACK3] = ("Attack3.png", 7)
+        data = CHARACTER_ASSETS[character_type]
+        scale = data["scale"]
+        self.frame_size = (int(data["frame_size"][0] * scale), int(data["frame_size"][1] * scale))
+        # Mode headless: cukup jumlah frame, tanpa surface
+        self.frame_counts = {anim_name: frames for anim_name, (_, frames) in data["animations"].items()}
+        if load_images:
+            self.load_images(load_masks)
+        self.current_animation = IDLE
         
-        for anim_name, (filename, frames) in animations_data.items():
-            path = os.path.join(sprite_path, filename)
+    def load_images(self, load_masks=False):
+        # Ambil semua animasi dari registry (hanya di-decode sekali per proses),
+        # bisa dipanggil belakangan saat asset selesai di-load di latar
+        character_type = self.character_type
+        data = CHARACTER_ASSETS[character_type]
+        scale = data["scale"]
+        for anim_name, (filename, frames) in data["animations"].items():
             try:
-                sheet = pygame.image.load(path).convert_alpha()
-                width = sheet.get_width() // frames
-                height = sheet.get_height()
-                sprite_sheet = SpriteSheet(sheet, width, height)
-                
-                self.animations[anim_name] = [
-                    sprite_sheet.get_sprite(i, scale) for i in range(frames)
-                ]
-                self.frame_counts[anim_name] = frames
+                self.animations[anim_name] = (
+                    sprite_registry.get(character_type, anim_name, scale, False),
+                    sprite_registry.get(character_type, anim_name, scale, True)
+                )
+                if load_masks:
+                    self.masks[anim_name] = (
+                        sprite_registry.get_masks(character_type, anim_name, scale, False),
+                        sprite_registry.get_masks(character_type, anim_name, scale, True)
+                    )
             except pygame.error as e:
+                del self.frame_counts[anim_name]
                 print(f"Couldn't load animation {filename}: {e}")
-                
-        self.current_animation = IDLE
         
-    def get_current_frame(self, flipped=False):
-        frame = self.animations[self.current_animation][int(self.current_frame)]
-        if flipped:
-            frame = pygame.transform.flip(frame, True, False)
-        return frame
+    def get_current_frame(self, flipped=False, faded=False):
+        if not self.animations:
+            return None
+        return self.animations[self.current_animation][flipped][int(self.current_frame)][faded]
+    
+    def get_current_mask(self, flipped=False):
+        if not self.masks:
+            return None
+        return self.masks[self.current_animation][flipped][int(self.current_frame)]
     
     def update_animation(self, animation_name, dt):
         if animation_name != self.current_animation:
@@ -168,7 +621,16 @@ class CharacterSprites:
     def is_animation_finished(self):
         return int(self.current_frame) >= self.frame_counts[self.current_animation] - 1
 
-class Weapon(pygame.sprite.Sprite):
+class Weapon(pygame.sprite.DirtySprite):
+    attack_duration = 20
+    damage = 10
+    projectile_speed = 8
+    projectile_lifetime = 45
+    
+    # State simulasi untuk snapshot()/restore(), active dan attack_timer di slot
+    __slots__ = ("active", "attack_timer")
+    state_getter = attrgetter("active", "attack_timer", "rect.x", "rect.y")
+    
     def __init__(self, owner):
         super().__init__()
         self.owner = owner
@@ -182,10 +644,15 @@ class Weapon(pygame.sprite.Sprite):
             self.image = pygame.Surface((40, 40), pygame.SRCALPHA)
             pygame.draw.circle(self.image, (148, 0, 211), (20, 20), 20)  # Purple magic
             
+        # Sihir ditembakkan sebagai proyektil lewat pool milik Game,
+        # tanpa pool (misalnya Fighter di luar Game) tetap menempel seperti tombak
+        self.ranged = not (isinstance(owner, Fighter) and owner.player_num == 1)
+        self.projectiles = None
         self.rect = self.image.get_rect()
+        self.mask = pygame.mask.from_surface(self.image)
+        self.visible = 0
         self.active = False
         self.attack_timer = 0
-        self.attack_duration = 20
         
     def update(self):
         if self.active:
@@ -193,45 +660,105 @@ class Weapon(pygame.sprite.Sprite):
             if self.attack_timer >= self.attack_duration:
                 self.active = False
                 self.attack_timer = 0
-                
-        # Update posisi senjata
+        self.follow_owner()
+        
+    def follow_owner(self):
+        # Update posisi senjata di depan hurtbox badan pemiliknya
         if isinstance(self.owner, Fighter):
-            if self.owner.player_num == 1:  # Huntress
+            body = self.owner.hit_box
+            if self.owner.player_num == 1:  # Huntress: tombak setinggi dada
+                if self.owner.facing_right:
+                    self.rect.left = body.right - 10
+                else:
+                    self.rect.right = body.left + 10
+                self.rect.centery = body.top + 45
+            else:  # Evil Wizard: sihir di depan badan
                 if self.owner.facing_right:
-                    self.rect.left = self.owner.rect.right - 20
+                    self.rect.left = body.right
                 else:
-                    self.rect.right = self.owner.rect.left + 20
-                self.rect.centery = self.owner.rect.centery
-            else:  # Evil Wizard
-                self.rect.centerx = self.owner.rect.centerx
-                self.rect.centery = self.owner.rect.centery - 30
+                    self.rect.right = body.left
+                self.rect.centery = body.centery
+
+    def reach(self):
+        # Jarak dari tepi depan hurtbox pemilik yang masih terkena serangan (untuk AI),
+        # sesuai posisi di follow_owner; sihir ditambah jarak tempuh proyektil
+        reach = self.rect.width - 10 if self.owner.player_num == 1 else self.rect.width
+        if self.ranged and self.projectiles is not None:
+            reach += self.projectile_speed * self.projectile_lifetime
+        return reach
 
     def attack(self):
-        if not self.active:
+        if self.ranged and self.projectiles is not None:
+            speed = self.projectile_speed if self.owner.facing_right else -self.projectile_speed
+            self.projectiles.spawn(self.image, self.rect.center, (speed, 0), self.projectile_lifetime,
+                                   self.owner, self.hit, self.mask)
+        elif not self.active:
             self.active = True
             self.attack_timer = 0
+            
+    def hit(self, projectile, target):
+        target.take_damage(self.damage)
+            
+    def snapshot(self):
+        return self.state_getter(self)
+    
+    def restore(self, state):
+        self.active, self.attack_timer, self.rect.x, self.rect.y = state
 
-class Fighter(pygame.sprite.Sprite):
-    def __init__(self, x, y, player_num):
+class Fighter(pygame.sprite.DirtySprite):
+    # Tabel statis dipakai bersama semua fighter, tidak disalin per instance
+    max_health = 100
+    max_energy = 100
+    max_ultimate = 100
+    attack_cooldown = 30
+    max_skill_cooldown = {
+        1: 120,  # 2 detik
+        2: 180,  # 3 detik
+        3: 300   # 5 detik
+    }
+    skill_energy_cost = {
+        1: 20,  # Skill 1 energy cost
+        2: 30,  # Skill 2 energy cost
+        3: 50   # Ultimate energy cost
+    }
+    energy_regen_rate = 0.2
+    ultimate_gain_rate = 0.1
+    invincible_duration = 30
+    
+    # State simulasi yang berubah tiap tick disimpan di slot berurutan tetap, bukan
+    # di __dict__ sprite; snapshot() membacanya sekaligus, restore() menulis balik
+    state_fields = ("health", "energy", "ultimate_gauge", "velocity_x", "velocity_y", "jumping", "ground_y",
+                    "attacking", "attack_type", "attack_timer", "facing_right",
+                    "is_dead", "death_animation_started", "current_state", "invincible", "invincible_timer")
+    __slots__ = state_fields
+    # Urutannya sama dengan restore()
+    state_getter = attrgetter("rect.x", "rect.y", *state_fields,
+                              "sprites.current_animation", "sprites.current_frame", "sprites.animation_timer")
+    
+    def __init__(self, x, y, player_num, load_sprites=True, load_masks=False):
         super().__init__()
         self.player_num = player_num
-        self.sprites = CharacterSprites("huntress" if player_num == 1 else "evil_wizard")
+        character_type = "huntress" if player_num == 1 else "evil_wizard"
+        self.sprites = CharacterSprites(character_type, load_sprites, load_sprites and load_masks)
         self.image = self.sprites.get_current_frame()
-        self.rect = self.image.get_rect()
+        self.rect = pygame.Rect((0, 0), self.sprites.frame_size)
         self.rect.x = x
         self.rect.y = y
+        self.prev_pos = self.rect.topleft  # Posisi langkah simulasi sebelumnya
+        self.sim_pos = self.rect.topleft
+        self.drawn_image = None
+        self.drawn_pos = None  # Posisi saat frame terakhir ditandai dirty
         
-        # Collision box yang lebih kecil dan sesuai dengan karakter
-        self.hit_box = pygame.Rect(0, 0, 40, 50)  # Kurangi tinggi hit box lagi
+        # Collision box seukuran badan karakter, frame sprite punya banyak ruang kosong
+        data = CHARACTER_ASSETS[character_type]
+        self.hit_box = pygame.Rect((0, 0), data["hit_box"])
+        self.hit_box_bottom = data["hit_box_bottom"]
         self.update_hit_box()
         
         # Status fighter
-        self.health = 100
-        self.max_health = 100
-        self.energy = 100
-        self.max_energy = 100
+        self.health = self.max_health
+        self.energy = self.max_energy
         self.ultimate_gauge = 0
-        self.max_ultimate = 100
         self.velocity_x = 0
         self.velocity_y = 0
         self.jumping = False
@@ -239,24 +766,11 @@ class Fighter(pygame.sprite.Sprite):
         self.attacking = False
         self.attack_type = 0
         self.attack_timer = 0
-        self.attack_cooldown = 30
         self.skill_cooldowns = {
             1: 0,  # Skill 1 cooldown
             2: 0,  # Skill 2 cooldown
             3: 0   # Ultimate cooldown
         }
-        self.max_skill_cooldown = {
-            1: 120,  # 2 detik
-            2: 180,  # 3 detik
-            3: 300   # 5 detik
-        }
-        self.skill_energy_cost = {
-            1: 20,  # Skill 1 energy cost
-            2: 30,  # Skill 2 energy cost
-            3: 50   # Ultimate energy cost
-        }
-        self.energy_regen_rate = 0.2
-        self.ultimate_gain_rate = 0.1
         
         self.facing_right = player_num == 2
         self.is_dead = False
@@ -264,14 +778,63 @@ class Fighter(pygame.sprite.Sprite):
         self.current_state = IDLE
         self.invincible = False
         self.invincible_timer = 0
-        self.invincible_duration = 30
+        self.blink_enabled = True  # Dimatikan quality governor, tidak ikut snapshot
         
         # Senjata
         self.weapon = Weapon(self)
+        
+    def snapshot(self):
+        cooldowns = self.skill_cooldowns
+        return (self.state_getter(self), (cooldowns[1], cooldowns[2], cooldowns[3]), self.weapon.state_getter(self.weapon))
+    
+    def restore(self, state):
+        values, cooldowns, weapon_state = state
+        sprites = self.sprites
+        (self.rect.x, self.rect.y, self.health, self.energy, self.ultimate_gauge,
+         self.velocity_x, self.velocity_y, self.jumping, self.ground_y,
+         self.attacking, self.attack_type, self.attack_timer, self.facing_right,
+         self.is_dead, self.death_animation_started, self.current_state,
+         self.invincible, self.invincible_timer,
+         sprites.current_animation, sprites.current_frame, sprites.animation_timer) = values
+        self.skill_cooldowns[1], self.skill_cooldowns[2], self.skill_cooldowns[3] = cooldowns
+        self.weapon.restore(weapon_state)
+        self.update_hit_box()
+        self.update_image()
+
+    def save_position(self):
+        self.prev_pos = self.rect.topleft
+        
+    def begin_draw(self, alpha):
+        # Posisi render diinterpolasi antara dua langkah simulasi
+        self.sim_pos = self.rect.topleft
+        prev_x, prev_y = self.prev_pos
+        x = round(prev_x + (self.sim_pos[0] - prev_x) * alpha)
+        y = round(prev_y + (self.sim_pos[1] - prev_y) * alpha)
+        self.rect.topleft = (x, y)
+        self.weapon.rect.move_ip(x - self.sim_pos[0], y - self.sim_pos[1])
+        # Frame serangan Evil Wizard lebih lebar dari frame_size; LayeredDirty memotong
+        # sprite ke rect saat repaint, jadi selama draw rect seukuran frame yang tampil
+        if self.image is not None:
+            self.rect.size = self.image.get_size()
+        
+        # Hanya tandai dirty bila frame atau posisi berubah
+        if self.image is not self.drawn_image or self.rect.topleft != self.drawn_pos:
+            self.drawn_image = self.image
+            self.drawn_pos = self.rect.topleft
+            self.dirty = 1
+        if self.weapon.active:
+            self.weapon.dirty = 1
+            
+    def end_draw(self):
+        dx = self.sim_pos[0] - self.rect.x
+        dy = self.sim_pos[1] - self.rect.y
+        self.rect.size = self.sprites.frame_size
+        self.rect.topleft = self.sim_pos
+        self.weapon.rect.move_ip(dx, dy)
 
     def update_hit_box(self):
         self.hit_box.centerx = self.rect.centerx
-        self.hit_box.bottom = self.rect.bottom
+        self.hit_box.bottom = self.rect.bottom - self.hit_box_bottom
         
     def move(self):
         if self.is_dead:
@@ -379,7 +942,6 @@ class Fighter(pygame.sprite.Sprite):
             
         self.move()
         self.update_animation_state()
-        self.image = self.sprites.get_current_frame(not self.facing_right)
         
         # Update resources
         if self.energy < self.max_energy:
@@ -388,47 +950,13 @@ class Fighter(pygame.sprite.Sprite):
         if self.ultimate_gauge < self.max_ultimate and not self.is_dead:
             self.ultimate_gauge = min(self.max_ultimate, self.ultimate_gauge + self.ultimate_gain_rate)
         
-        # Buat karakter berkedip saat invincible
-        if self.invincible and (self.invincible_timer // 3) % 2 == 0:
-            self.image.set_alpha(128)
-        else:
-            self.image.set_alpha(255)
-            
+        self.update_image()
         self.weapon.update()
-
-    def draw_status_bars(self, screen, is_player_one):
-        # Navbar style status bars
-        bar_height = 20
-        health_width = 200
-        energy_width = 150
-        ultimate_width = 100
-        padding = 10
         
-        if is_player_one:
-            base_x = padding
-        else:
-            base_x = SCREEN_WIDTH - health_width - padding
-            
-        base_y = padding
-        
-        # Health bar
-        pygame.draw.rect(screen, RED, (base_x, base_y, health_width, bar_height))
-        health_percent = self.health / self.max_health
-        pygame.draw.rect(screen, GREEN, (base_x, base_y, health_width * health_percent, bar_height))
-        
-        # Energy bar
-        energy_x = base_x if is_player_one else SCREEN_WIDTH - energy_width - padding
-        energy_y = base_y + bar_height + 5
-        pygame.draw.rect(screen, (50, 50, 255), (energy_x, energy_y, energy_width, bar_height))
-        energy_percent = self.energy / self.max_energy
-        pygame.draw.rect(screen, (100, 100, 255), (energy_x, energy_y, energy_width * energy_percent, bar_height))
-        
-        # Ultimate gauge
-        ultimate_x = base_x if is_player_one else SCREEN_WIDTH - ultimate_width - padding
-        ultimate_y = energy_y + bar_height + 5
-        pygame.draw.rect(screen, (255, 200, 0), (ultimate_x, ultimate_y, ultimate_width, bar_height))
-        ultimate_percent = self.ultimate_gauge / self.max_ultimate
-        pygame.draw.rect(screen, (255, 255, 0), (ultimate_x, ultimate_y, ultimate_width * ultimate_percent, bar_height))
+    def update_image(self):
+        # Buat karakter berkedip saat invincible
+        blink = self.invincible and self.blink_enabled and (self.invincible_timer // 3) % 2 == 0
+        self.image = self.sprites.get_current_frame(not self.facing_right, blink)
 
     def use_skill(self, skill_num):
         if not self.is_dead and not self.attacking and self.skill_cooldowns[skill_num] <= 0:
@@ -459,6 +987,9 @@ class Fighter(pygame.sprite.Sprite):
                     self.velocity_y = -8  # Kurangi ketinggian jump attack
 
 class AIController:
+    state_getter = attrgetter("decision_timer", "current_action", "action_duration", "difficulty",
+                           "attack_cooldown", "skill_cooldown")
+    
     def __init__(self, fighter, target):
         self.fighter = fighter
         self.target = target
@@ -468,6 +999,15 @@ class AIController:
         self.difficulty = 0.7  # Tingkat kesulitan (0-1)
         self.attack_cooldown = 0
         self.skill_cooldown = 0
+        self.rng = random  # Sumber angka acak, bisa diganti random.Random(seed)
+        
+    def snapshot(self):
+        # State rng disimpan terpisah oleh Game.snapshot karena bisa dipakai bersama
+        return self.state_getter(self)
+    
+    def restore(self, state):
+        (self.decision_timer, self.current_action, self.action_duration, self.difficulty,
+         self.attack_cooldown, self.skill_cooldown) = state
         
     def update(self):
         if self.fighter.is_dead:
@@ -485,28 +1025,47 @@ class AIController:
             
         self.execute_action()
     
+    def roll(self):
+        # Semua angka acak satu keputusan diambil sekaligus dengan urutan tetap
+        return self.rng.random(), self.rng.random(), self.rng.randint(1, 3), self.rng.random()
+    
+    def start_action(self, action):
+        # Mulai aksi hasil planner (SearchAIController/AsyncAIController)
+        self.action_duration = 20
+        if action == "jump":
+            self.fighter.jump()
+            action = "chase"
+        elif action == "attack":
+            self.attack_cooldown = 30
+        elif action != "chase":
+            self.skill_cooldown = 60
+        self.current_action = action
+    
     def make_decision(self):
         if self.target.is_dead:
             self.current_action = None
             return
             
-        distance = abs(self.target.rect.centerx - self.fighter.rect.centerx)
-        vertical_distance = abs(self.target.rect.centery - self.fighter.rect.centery)
+        attack_roll, skill_roll, skill_choice, jump_roll = self.roll()
+        # Serangan hanya kena bila menyentuh hurtbox, jadi jarak diukur dari celah
+        # antar hurtbox dan dibandingkan dengan jangkauan senjata
+        fighter_box, target_box = self.fighter.hit_box, self.target.hit_box
+        gap = abs(target_box.centerx - fighter_box.centerx) - (fighter_box.width + target_box.width) // 2
+        reach = self.fighter.weapon.reach()
         
         # Bot akan lebih agresif
-        if distance > 200:  # Jika terlalu jauh
+        if gap > reach + 50:  # Jika terlalu jauh
             self.current_action = "chase"
             self.action_duration = 30
-        elif distance < 150:  # Jarak serang
+        elif gap <= reach:  # Jarak serang
             # Peluang menyerang berdasarkan difficulty
-            if self.attack_cooldown <= 0 and random.random() < self.difficulty:
+            if self.attack_cooldown <= 0 and attack_roll < self.difficulty:
                 self.current_action = "attack"
                 self.attack_cooldown = 30
                 self.action_duration = 20
             
             # Gunakan skill berdasarkan difficulty
-            if self.skill_cooldown <= 0 and random.random() < self.difficulty:
-                skill_choice = random.randint(1, 3)
+            if self.skill_cooldown <= 0 and skill_roll < self.difficulty:
                 if skill_choice == 1 and self.fighter.energy >= 20:
                     self.current_action = "skill1"
                 elif skill_choice == 2 and self.fighter.energy >= 30:
@@ -515,10 +1074,12 @@ class AIController:
                     self.current_action = "ultimate"
                 self.skill_cooldown = 60
         else:
+            # Hampir masuk jangkauan: kejar sebentar (durasi lama bisa sudah habis)
             self.current_action = "chase"
+            self.action_duration = 10
             
         # Lompat untuk menghindari serangan atau mengejar
-        if random.random() < self.difficulty * 0.3:
+        if jump_roll < self.difficulty * 0.3:
             self.fighter.jump()
     
     def execute_action(self):
@@ -529,55 +1090,369 @@ class AIController:
                 self.fighter.velocity_x = speed
             else:
                 self.fighter.velocity_x = -speed
-        elif self.current_action == "attack":
-            self.fighter.attack()
-        elif self.current_action == "skill1":
-            self.fighter.use_skill(1)
-        elif self.current_action == "skill2":
-            self.fighter.use_skill(2)
-        elif self.current_action == "ultimate":
-            self.fighter.use_skill(3)
+        elif self.current_action is not None:
+            # Hadapkan ke lawan dulu, fighter diam tidak pernah berbalik sendiri
+            if self.target.hit_box.centerx != self.fighter.hit_box.centerx:
+                self.fighter.facing_right = self.target.hit_box.centerx > self.fighter.hit_box.centerx
+            if self.current_action == "attack":
+                self.fighter.attack()
+            elif self.current_action == "skill1":
+                self.fighter.use_skill(1)
+            elif self.current_action == "skill2":
+                self.fighter.use_skill(2)
+            elif self.current_action == "ultimate":
+                self.fighter.use_skill(3)
             
         self.action_duration -= 1
         if self.action_duration <= 0:
             self.current_action = None
             self.fighter.velocity_x = 0
 
-class GameUI:
-    def __init__(self, screen_width, screen_height):
-        self.screen_width = screen_width
-        self.screen_height = screen_height
-
-    def draw_navbar(self, screen, player1, player2, round_timer, fps):
-        # Navbar style status bars
-        bar_height = 20
-        health_width = 200
-        energy_width = 150
-        ultimate_width = 100
-        padding = 10
-        
-        # Draw timer
-        minutes = round_timer // (60 * fps)
-        seconds = (round_timer % (60 * fps)) // fps
-        timer_text = f"{minutes:02d}:{seconds:02d}"
-        timer_surface = pygame.font.Font(None, 36).render(timer_text, True, WHITE)
-        timer_rect = timer_surface.get_rect(center=(self.screen_width/2, 25))
-        screen.blit(timer_surface, timer_rect)
-        
-        # Draw status bars
-        player1.draw_status_bars(screen, True)
-        player2.draw_status_bars(screen, False)
+class SearchAIController(AIController):
+    # Setiap keputusan mencoba aksi kandidat lewat rollout pada state pertandingan
+    # itu sendiri (Game.snapshot/restore), lalu memilih rata-rata nilai terbaik.
+    # Anytime: berhenti saat budget waktu habis, hasil terbaik sejauh itu dipakai.
+    # Dengan max_rollouts dan budget None hasilnya deterministik (untuk replay).
+    actions = ("chase", "attack", "skill1", "skill2", "ultimate", "jump")
+    
+    def __init__(self, fighter, target, game, budget_ms=SEARCH_BUDGET_MS, max_rollouts=None,
+                 horizon=SEARCH_HORIZON):
+        super().__init__(fighter, target)
+        self.game = game
+        self.budget_ms = budget_ms
+        self.max_rollouts = max_rollouts
+        self.horizon = horizon
+        # Pemain manusia dimodelkan sebagai bot biasa selama rollout
+        self.opponent_model = AIController(target, fighter)
+        self.decisions = 0
+        self.rollouts = 0
+        self.nodes = 0  # Tick yang disimulasikan
+        self.search_time = 0.0
+        self.last_rollouts = 0
+        self.last_choice = None  # Aksi terakhir yang dipilih pencarian
+        
+    def nodes_per_sec(self):
+        return self.nodes / self.search_time if self.search_time > 0 else 0.0
+        
+    def legal_actions(self):
+        fighter = self.fighter
+        cooldowns = fighter.skill_cooldowns
+        actions = ["chase", "jump"]
+        if fighter.attack_timer <= 0:
+            actions.append("attack")
+        if cooldowns[1] <= 0 and fighter.energy >= fighter.skill_energy_cost[1]:
+            actions.append("skill1")
+        if cooldowns[2] <= 0 and fighter.energy >= fighter.skill_energy_cost[2]:
+            actions.append("skill2")
+        if (cooldowns[3] <= 0 and fighter.energy >= fighter.skill_energy_cost[3]
+                and fighter.ultimate_gauge >= fighter.max_ultimate):
+            actions.append("ultimate")
+        return actions
+        
+    def make_decision(self):
+        # Di dalam rollout semua sisi memakai kebijakan bot biasa,
+        # termasuk SearchAIController lawan (tidak ada pencarian bersarang)
+        if self.game.searching or self.target.is_dead:
+            return super().make_decision()
+        
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000 if self.budget_ms else None
+        game = self.game
+        actions = self.legal_actions()
+        totals = [0.0] * len(actions)
+        counts = [0] * len(actions)
+        
+        root = game.snapshot()
+        controllers = game.controllers()
+        rngs = [controller.rng for controller in controllers]
+        profiler = game.profiler
+        model = None
+        if self.target is game.player1 and game.player1_ai is None:
+            model = self.opponent_model
+        start_health = self.fighter.health - self.target.health
+        
+        game.searching = True
+        game.profiler = None
+        rollouts = 0
+        try:
+            while self.max_rollouts is None or rollouts < self.max_rollouts:
+                # UCB1 di akar: setiap aksi dicoba sekali, lalu yang paling menjanjikan
+                if rollouts < len(actions):
+                    index = rollouts
+                else:
+                    log_n = math.log(rollouts)
+                    index = max(range(len(actions)),
+                                key=lambda i: totals[i] / counts[i] + 1.4 * math.sqrt(log_n / counts[i]))
+                value = self.rollout(root, actions[index], controllers, model, rollouts, start_health, deadline)
+                if value is None:
+                    break
+                totals[index] += value
+                counts[index] += 1
+                rollouts += 1
+        finally:
+            game.restore(root)
+            for controller, rng in zip(controllers, rngs):
+                controller.rng = rng
+            game.profiler = profiler
+            game.searching = False
+            
+        if rollouts == 0:
+            self.last_choice = None
+            super().make_decision()
+        else:
+            best = max((i for i in range(len(actions)) if counts[i]),
+                       key=lambda i: totals[i] / counts[i])
+            self.last_choice = actions[best]
+            self.start_action(self.last_choice)
+            
+        self.decisions += 1
+        self.rollouts += rollouts
+        self.last_rollouts = rollouts
+        self.search_time += time.perf_counter() - start
+        
+    def rollout(self, root, action, controllers, model, index, start_health, deadline):
+        # Nilai satu rollout (-1..1), None bila budget waktu habis di tengah jalan
+        game = self.game
+        game.restore(root)
+        rng = random.Random(index)  # Variasi perilaku lawan antar rollout, tetap deterministik
+        for controller in controllers:
+            controller.rng = rng
+        if model is not None:
+            model.rng = rng
+            model.difficulty = self.difficulty
+            model.current_action = None
+            model.decision_timer = 19
+        self.start_action(action)
+        self.decision_timer = 0
+        
+        for _ in range(self.horizon):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            game.update_state()
+            if model is not None:
+                model.update()
+            self.nodes += 1
+            if game.game_state != FIGHTING:
+                break
+                
+        if self.target.is_dead:
+            return 1.0
+        if self.fighter.is_dead:
+            return -1.0
+        return (self.fighter.health - self.target.health - start_health) / 100
+
+class ShadowPlanner:
+    # Planner untuk worker AI: Game headless sendiri yang diisi state pertandingan
+    # terbaru (Game.portable_snapshot), lalu SearchAIController memilih aksi di sana
+    def __init__(self, side, player1_bot, budget_ms):
+        self.game = game = Game(headless=True, player1_bot=player1_bot, seed=0)
+        game.search_budget_ms = None
+        if side == 1:
+            self.controller = game.player1_ai = SearchAIController(game.player1, game.player2, game, budget_ms)
+        else:
+            self.controller = game.ai_controller = SearchAIController(game.player2, game.player1, game, budget_ms)
+        self.controller.rng = game.match_rng
+        
+    def __call__(self, state):
+        self.game.restore_portable(state)
+        self.controller.make_decision()
+        return self.controller.last_choice, self.controller.nodes_per_sec()
+
+class AsyncAIController(AIController):
+    # Keputusan dihitung worker (thread atau proses) dari state yang dipublikasikan
+    # tiap 20 tick. Loop utama tidak pernah menunggu: hasil diambil begitu ada,
+    # bila worker terlambat aksi terakhir yang diketahui diulang.
+    def __init__(self, fighter, target, game, worker):
+        super().__init__(fighter, target)
+        self.game = game
+        self.worker = worker
+        # Worker dipakai ulang antar pertandingan, id lanjut dari yang terakhir
+        self.published = worker.request_id  # Id state terakhir yang dikirim ke worker
+        self.applied = worker.request_id  # Id state yang keputusannya terakhir dipakai
+        self.publish_times = {}
+        self.latencies = deque(maxlen=120)  # Detik dari publish state sampai aksi dipakai
+        self.last_action = None
+        self.decisions = 0
+        self.late = 0  # Keputusan yang belum siap saat keputusan berikutnya dibutuhkan
+        self.worker_nodes_per_sec = 0.0
+        
+    def update(self):
+        self.poll()
+        super().update()
+        
+    def poll(self):
+        result = self.worker.latest()
+        if result is None or result[0] <= self.applied:
+            return
+        request_id, (action, nodes_per_sec), _ = result
+        self.applied = request_id
+        published = self.publish_times.pop(request_id, None)
+        for stale in [key for key in self.publish_times if key < request_id]:
+            del self.publish_times[stale]
+        if published is not None:
+            self.latencies.append(time.perf_counter() - published)
+        self.worker_nodes_per_sec = nodes_per_sec
+        if action is not None and not self.fighter.is_dead and not self.target.is_dead:
+            self.decisions += 1
+            self.last_action = action
+            self.start_action(action)
+            
+    def make_decision(self):
+        if self.target.is_dead:
+            self.current_action = None
+            return
+        if self.applied < self.published:
+            self.late += 1
+            if self.last_action is not None:
+                self.start_action(self.last_action)
+        self.published += 1
+        self.publish_times[self.published] = time.perf_counter()
+        self.worker.publish(self.published, self.game.portable_snapshot())
+        
+    def latency_ms(self):
+        # (rata-rata, maksimum) latency state -> keputusan dalam ms
+        if not self.latencies:
+            return 0.0, 0.0
+        return sum(self.latencies) * 1000 / len(self.latencies), max(self.latencies) * 1000
+
+class DirtyRenderer:
+    # Render hanya area yang berubah lewat LayeredDirty dan display.update(rects).
+    # Saat background bergeser atau state berganti, kembali ke full flip.
+    def __init__(self, game):
+        self.game = game
+        self.scene = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.scene_valid = False
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.overlay_rects = []
+        self.last_scroll = None
+        self.last_state = None
+        
+    def set_sprites(self, fighters, weapons):
+        self.sprites.empty()
+        for fighter in fighters:
+            self.sprites.add(fighter, layer=0)
+        for weapon in weapons:
+            self.sprites.add(weapon, layer=1)
+        self.scene_valid = False
+        
+    def invalidate(self):
+        # Paksa full flip di frame berikutnya (misalnya background baru selesai di-load)
+        self.last_state = None
+        
+    def draw(self):
+        game = self.game
+        screen = game.screen
+        show_sprites = game.shows_sprites()
+        for weapon in game.weapons:
+            # Setter visible selalu menandai dirty, jadi hanya di-set saat berubah
+            if weapon.visible != weapon.active:
+                weapon.visible = int(weapon.active)
+        
+        if game.background.scroll != self.last_scroll or game.game_state != self.last_state:
+            self.last_scroll = game.background.scroll
+            self.last_state = game.game_state
+            self.scene_valid = False
+            
+            game.draw_scene(screen)
+            projectile_rects = game.draw_sprites(screen) if show_sprites else []
+            self.overlay_rects = projectile_rects + game.draw_overlay(screen)
+            if game.profiler:
+                game.profiler.lap("draw")
+            game.presenter.present()
+            return
+        
+        if not self.scene_valid:
+            # Background diam: simpan sebagai latar untuk menghapus sprite
+            game.draw_scene(self.scene)
+            self.sprites.clear(screen, self.scene)
+            self.sprites.repaint_rect(screen.get_rect())
+            self.scene_valid = True
+        
+        # Proyektil dan teks/HUD frame sebelumnya dihapus dulu, lalu digambar ulang di atas sprite
+        for rect in self.overlay_rects:
+            if show_sprites:
+                self.sprites.repaint_rect(rect)
+            else:
+                screen.blit(self.scene, rect, rect)
+        
+        dirty = self.sprites.draw(screen) if show_sprites else []
+        overlay_rects = game.projectiles.draw(screen) if show_sprites else []
+        overlay_rects += game.draw_overlay(screen)
+        if game.profiler:
+            game.profiler.lap("draw")
+        game.presenter.present(dirty + self.overlay_rects + overlay_rects)
+        self.overlay_rects = overlay_rects
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Python Fighter")
+    state_getter = attrgetter("game_state", "difficulty_selected", "ai_difficulty", "round_number",
+                           "round_timer", "round_text", "player1_wins", "player2_wins",
+                           "round_end_timer", "is_draw", "matches_played", "background.scroll")
+    
+    def __init__(self, headless=False, dirty_rects=False, player1_bot=None, seed=None, pixel_collisions=False,
+                 load_in_background=False, window_size=None, fullscreen=False, present_mode="direct",
+                 integer_scale=False, versus=False):
+        # Headless: tanpa jendela dan sprite, player 1 juga dikendalikan bot
+        # kecuali player1_bot=False (misalnya saat memutar replay)
+        self.headless = headless
+        # Versus: kedua fighter dikendalikan input (netplay), tanpa AI
+        self.versus = versus
+        if versus:
+            player1_bot = False
+        # Collision per piksel butuh sprite, headless tetap memakai hurtbox saja
+        self.pixel_collisions = pixel_collisions and not headless
+        self.player1_bot = headless if player1_bot is None else player1_bot
+        self.seed = seed  # Seed tetap untuk rng AI, None = acak tiap pertandingan
+        self.recorder = None
+        self.profiler = None  # FrameProfiler, aktif lewat --profile atau F3
+        self.first_frame_time = None  # Detik dari start proses sampai frame pertama
+        # load_in_background: title screen langsung tampil, background dan sprite
+        # di-load AssetLoader dan dipasang begitu selesai (lihat poll_assets)
+        self.loader = None
+        self.assets_ready = not headless
+        self.presenter = None
+        if headless:
+            self.screen = None
+        else:
+            # Semua draw ke surface internal SCREEN_WIDTH x SCREEN_HEIGHT, di-scale sekali saat present
+            self.presenter = Presenter((SCREEN_WIDTH, SCREEN_HEIGHT), window_size, fullscreen, present_mode,
+                                       integer_scale)
+            self.screen = self.presenter.surface
+            pygame.display.set_caption("Python Fighter")
+            if load_in_background:
+                self.installed_assets = set()
+                self.loader = AssetLoader(self.asset_jobs())
+                self.assets_ready = False
+            elif sprite_registry.bundle is None:
+                load_sprite_bundle()
         self.clock = pygame.time.Clock()
         
-        self.background = ParallaxBackground()
+        # Renderer dirty-rect opsional untuk mesin yang lambat saat flip
+        self.dirty_renderer = None
+        if dirty_rects and not headless:
+            self.dirty_renderer = DirtyRenderer(self)
+        
+        self.background = ParallaxBackground(self.assets_ready)
         self.game_state = TITLE_SCREEN
         self.difficulty_selected = False  # Tambah state untuk pilihan difficulty
         self.ai_difficulty = 0.5  # Default difficulty
+        self.player1_ai_difficulty = 0.5  # Difficulty bot player 1 (headless)
+        # Budget pencarian AI SULIT; search_rollouts tetap (budget None) untuk replay deterministik
+        self.search_budget_ms = SEARCH_BUDGET_MS
+        self.search_rollouts = None
+        self.searching = False  # True selama rollout SearchAIController
+        self.async_ai = None  # None, "thread" atau "process": AI SULIT dihitung di worker
+        self.ai_workers = {}
+        self.netplay = None  # RollbackSession saat bermain lewat jaringan
+        self.spectators = None  # SpectatorServer, state tiap tick disiarkan ke penonton
+        self.render_fps = FPS  # Batas render, 0 = tanpa batas
+        # Level kualitas render (lihat quality.py), diatur QualityGovernor bila ada
+        self.quality = 0
+        self.quality_governor = None
+        self.sim_hz = 0.0
+        self.render_hz = 0.0
+        self.matches_played = 0
+        self.input_buffer = InputBuffer()  # Tombol yang ditekan, diterapkan di tick berikutnya
+        self.held_input = 0  # Tombol yang sedang ditahan
         self.round_number = 1
         self.round_timer = 7200
         self.round_text = ""
@@ -596,18 +1471,40 @@ class Game:
         self.small_font = pygame.font.Font(None, 36)
         self.tiny_font = pygame.font.Font(None, 24)
         
+        # Broad phase dipilih per tick menurut jumlah entity (lihat SWEEP_MIN_ENTITIES)
+        self.all_pairs = AllPairs()
+        self.sweep_and_prune = SweepAndPrune()
+        self.projectiles = ProjectilePool(256, pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+        
         # UI
-        self.game_ui = GameUI(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.text_cache = TextCache()
+        self.game_ui = GameUI(SCREEN_WIDTH, SCREEN_HEIGHT, self.text_cache)
         
         # Membuat fighter
         self.reset_fighters()
         
     def reset_fighters(self):
         # Sesuaikan posisi awal fighter lebih rendah
-        self.player1 = Fighter(200, self.floor_height + 110, 1)
-        self.player2 = Fighter(200, self.floor_height + 110, 2)
-        self.ai_controller = AIController(self.player2, self.player1)
-        self.ai_controller.difficulty = self.ai_difficulty  # Set difficulty level
+        load_sprites = self.assets_ready
+        self.player1 = Fighter(200, self.floor_height + 110, 1, load_sprites, self.pixel_collisions)
+        self.player2 = Fighter(200, self.floor_height + 110, 2, load_sprites, self.pixel_collisions)
+        self.ai_controller = None
+        if not self.versus:
+            self.ai_controller = self.make_ai_controller(self.player2, self.player1, self.ai_difficulty)
+        
+        self.player1_ai = None
+        if self.player1_bot:
+            self.player1_ai = self.make_ai_controller(self.player1, self.player2, self.player1_ai_difficulty)
+            
+        self.projectiles.clear()
+        self.player1.weapon.projectiles = self.projectiles
+        self.player2.weapon.projectiles = self.projectiles
+            
+        # Seed per pertandingan supaya pertandingan bisa diulang persis
+        self.match_seed = self.seed if self.seed is not None else random.getrandbits(32)
+        self.match_rng = random.Random(self.match_seed)
+        for controller in self.controllers():
+            controller.rng = self.match_rng
         
         self.all_sprites = pygame.sprite.Group()
         self.weapons = pygame.sprite.Group()
@@ -615,6 +1512,89 @@ class Game:
         self.all_sprites.add(self.player1, self.player2)
         self.weapons.add(self.player1.weapon, self.player2.weapon)
         
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.set_sprites(self.all_sprites, self.weapons)
+        self.apply_quality()
+            
+        if self.recorder is not None:
+            self.recorder.start(self)
+        
+    def asset_jobs(self):
+        # Urutan load di latar: bundle, background (sudah terlihat di title), lalu sprite.
+        # Thread latar hanya membuka file dan membuat surface miliknya sendiri; convert(),
+        # sprite_registry dan bundle terpasang hanya disentuh thread utama (install_asset)
+        bundle = sprite_registry.bundle
+        pixel_format = native_pixel_format()
+        return [("bundle", lambda results: bundle or open_sprite_bundle()),
+                ("background", lambda results: decode_background_layers(results["bundle"])),
+                ("huntress",
+                 lambda results: decode_character_sheets("huntress", results["bundle"], pixel_format)),
+                ("evil_wizard",
+                 lambda results: decode_character_sheets("evil_wizard", results["bundle"], pixel_format))]
+    
+    def install_asset(self, name, result):
+        self.installed_assets.add(name)
+        if name == "bundle":
+            if result is not None:
+                sprite_registry.bundle = result
+        elif name == "background":
+            self.set_background(ParallaxBackground(decoded=result))
+        else:
+            scale = CHARACTER_ASSETS[name]["scale"]
+            for anim_name, sheet in result.items():
+                sprite_registry.add_sheet(name, anim_name, scale, sheet)
+    
+    def poll_assets(self):
+        # Dipanggil tiap frame selama loader jalan, tidak pernah menunggu.
+        # Hasil yang sudah jadi dipasang satu per frame
+        for name, _ in self.loader.jobs:
+            if name not in self.installed_assets:
+                if name in self.loader.results:
+                    self.install_asset(name, self.loader.results[name])
+                return
+        if self.loader.done():
+            self.finish_loading()
+            
+    def wait_for_assets(self):
+        if self.loader is not None:
+            self.finish_loading()
+            
+    def finish_loading(self):
+        results = self.loader.wait()
+        for name, _ in self.loader.jobs:
+            if name not in self.installed_assets:
+                self.install_asset(name, results[name])
+        self.loader = None
+        self.assets_ready = True
+        # Fighter yang dibuat sebelum sprite siap (headless) dipasangi frame sekarang,
+        # registry sudah terisi hasil loader jadi tidak ada decode lagi
+        for fighter in (self.player1, self.player2):
+            fighter.sprites.load_images(self.pixel_collisions)
+            fighter.update_image()
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
+        print(f"Assets ready after {(time.perf_counter() - STARTUP_TIME) * 1000:.0f} ms")
+            
+    def set_background(self, background):
+        background.scroll = self.background.scroll
+        self.background = background
+        self.apply_quality()
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
+        
+    def set_quality(self, level):
+        self.quality = level
+        self.apply_quality()
+        
+    def apply_quality(self):
+        # Dipasang ulang setiap fighter atau background diganti
+        level = self.quality
+        self.background.set_hidden_layers(QUALITY_HIDDEN_LAYERS.get(level, ()))
+        for fighter in (self.player1, self.player2):
+            fighter.blink_enabled = level < 2
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.invalidate()
+        
     def reset_game(self):
         self.game_state = TITLE_SCREEN
         self.difficulty_selected = False  # Reset difficulty selection
@@ -623,65 +1603,312 @@ class Game:
         self.player2_wins = 0
         self.reset_fighters()
 
+    def make_ai_controller(self, fighter, target, difficulty):
+        if difficulty >= SEARCH_DIFFICULTY and self.async_ai and self.search_budget_ms:
+            controller = AsyncAIController(fighter, target, self, self.ai_worker(fighter.player_num))
+        elif difficulty >= SEARCH_DIFFICULTY and (self.search_budget_ms or self.search_rollouts):
+            controller = SearchAIController(fighter, target, self, self.search_budget_ms,
+                                            self.search_rollouts)
+        else:
+            controller = AIController(fighter, target)
+        controller.difficulty = difficulty  # Set difficulty level
+        return controller
+        
+    def ai_worker(self, side):
+        # Satu worker per sisi selama Game hidup, dipakai ulang antar pertandingan
+        worker = self.ai_workers.get(side)
+        if worker is None:
+            if self.async_ai == "process":
+                worker = ProcessPlanner(partial(ShadowPlanner, side, self.player1_bot, ASYNC_SEARCH_BUDGET_MS))
+            else:
+                worker = ThreadPlanner(ShadowPlanner(side, self.player1_bot, ASYNC_SEARCH_BUDGET_MS))
+            self.ai_workers[side] = worker
+        return worker
+        
+    def close(self):
+        for worker in self.ai_workers.values():
+            worker.close()
+        self.ai_workers.clear()
+        
+    def apply_difficulty(self):
+        # Difficulty dipilih di title screen setelah fighter dibuat
+        rng = self.ai_controller.rng
+        self.ai_controller = self.make_ai_controller(self.player2, self.player1, self.ai_difficulty)
+        self.ai_controller.rng = rng
+
+    def controllers(self):
+        if self.ai_controller is None:
+            return ()
+        if self.player1_ai:
+            return (self.ai_controller, self.player1_ai)
+        return (self.ai_controller,)
+
+    def snapshot(self):
+        # Salinan seluruh state simulasi pertandingan (untuk rollback, lookahead, save state)
+        controllers = self.controllers()
+        rngs = list({id(controller.rng): controller.rng for controller in controllers}.values())
+        return (self.state_getter(self), self.player1.snapshot(), self.player2.snapshot(),
+                self.projectiles.snapshot(), tuple(controller.snapshot() for controller in controllers),
+                tuple((rng, rng.getstate()) for rng in rngs))
+    
+    def portable_snapshot(self):
+        # Seperti snapshot() tapi hanya data biasa tanpa referensi objek,
+        # bisa di-pickle dan dimuat ke Game lain lewat restore_portable()
+        return (self.state_getter(self), self.player1.snapshot(), self.player2.snapshot(),
+                tuple((projectile.owner.player_num, projectile.rect.center, projectile.velocity_x,
+                       projectile.velocity_y, projectile.age, projectile.lifetime)
+                      for projectile in self.projectiles.active),
+                tuple(controller.snapshot() for controller in self.controllers()),
+                self.match_rng.getstate())
+    
+    def restore_portable(self, state):
+        values, player1_state, player2_state, projectiles, controller_states, rng_state = state
+        self.restore((values, player1_state, player2_state, (), controller_states,
+                      ((self.match_rng, rng_state),)))
+        fighters = {1: self.player1, 2: self.player2}
+        self.projectiles.reserve(len(projectiles))
+        for player_num, center, velocity_x, velocity_y, age, lifetime in projectiles:
+            weapon = fighters[player_num].weapon
+            projectile = self.projectiles.spawn(weapon.image, center, (velocity_x, velocity_y), lifetime,
+                                                weapon.owner, weapon.hit, weapon.mask)
+            projectile.age = age
+    
+    def restore(self, state):
+        values, player1_state, player2_state, projectile_state, controller_states, rng_states = state
+        (self.game_state, self.difficulty_selected, self.ai_difficulty, self.round_number,
+         self.round_timer, self.round_text, self.player1_wins, self.player2_wins,
+         self.round_end_timer, self.is_draw, self.matches_played, self.background.scroll) = values
+        self.player1.restore(player1_state)
+        self.player2.restore(player2_state)
+        self.projectiles.restore(projectile_state)
+        for controller, controller_state in zip(self.controllers(), controller_states):
+            controller.restore(controller_state)
+        for rng, rng_state in rng_states:
+            rng.setstate(rng_state)
+
     def handle_input(self):
+        # Drain event SDL ke input buffer, efeknya diterapkan per tick di update().
+        # Dipanggil di awal frame dan lagi tepat sebelum tiap tick.
+        # pygame tidak mengekspos timestamp event SDL, jadi dipakai waktu drain;
+        # event sintetis (benchmark) membawa timestamp sendiri
+        now = time.perf_counter()
+        running = True
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                return False
-            
-            if event.type == pygame.KEYDOWN:
-                if self.game_state == TITLE_SCREEN:
-                    if not self.difficulty_selected:
-                        if event.key == pygame.K_1:  # Easy
-                            self.ai_difficulty = 0.3
-                            self.difficulty_selected = True
-                        elif event.key == pygame.K_2:  # Medium
-                            self.ai_difficulty = 0.6
-                            self.difficulty_selected = True
-                        elif event.key == pygame.K_3:  # Hard
-                            self.ai_difficulty = 0.9
-                            self.difficulty_selected = True
-                    elif event.key == pygame.K_SPACE:
-                        self.game_state = ROUND_PREP
-                        self.round_timer = 180  # 3 detik countdown
-                elif event.key == pygame.K_SPACE:
-                    if self.game_state == ROUND_OVER and self.round_end_timer <= 0:
-                        if self.player1_wins < 2 and self.player2_wins < 2:
-                            self.start_new_round()
-                    elif self.game_state == MATCH_RESULT:
-                        self.reset_game()
-                elif self.game_state == FIGHTING:
-                    if event.key == pygame.K_SPACE:
-                        self.player1.jump()
-                    if event.key == pygame.K_j:
-                        self.player1.attack()
-                    if event.key == pygame.K_k:
-                        self.player1.use_skill(1)
-                    if event.key == pygame.K_l:
-                        self.player1.use_skill(2)
-                    if event.key == pygame.K_i:
-                        self.player1.use_skill(3)
-                    
-        if self.game_state == FIGHTING:
-            keys = pygame.key.get_pressed()
+                running = False
             
-            self.player1.velocity_x = 0
-            if keys[pygame.K_a]:
-                self.player1.velocity_x = -5
-            if keys[pygame.K_d]:
-                self.player1.velocity_x = 5
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler()
+                inputs = KEY_INPUTS.get(event.key, 0) | HOLD_INPUTS.get(event.key, 0)
+                if inputs:
+                    self.input_buffer.push(inputs, event.dict.get("timestamp", now))
+                    
+        keys = pygame.key.get_pressed()
+        self.held_input = 0
+        if keys[pygame.K_a]:
+            self.held_input |= INPUT_LEFT
+        if keys[pygame.K_d]:
+            self.held_input |= INPUT_RIGHT
             
-        return True
+        return running
+
+    def toggle_profiler(self):
+        # Overlay profiler, profiler dibuat saat pertama kali dibutuhkan
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+        self.profiler.show_overlay = not self.profiler.show_overlay
+
+    def take_input(self):
+        return self.input_buffer.take() | self.held_input
+
+    def apply_input(self, inputs):
+        # Semua tombol satu tick digabung jadi bitmask, jadi setiap bit dicek sendiri
+        # di dalam cabang state-nya supaya tombol yang datang bersamaan tidak hilang
+        if self.game_state == TITLE_SCREEN:
+            if not self.difficulty_selected:
+                if inputs & INPUT_EASY:
+                    self.ai_difficulty = 0.3
+                    self.difficulty_selected = True
+                elif inputs & INPUT_MEDIUM:
+                    self.ai_difficulty = 0.6
+                    self.difficulty_selected = True
+                elif inputs & INPUT_HARD:
+                    self.ai_difficulty = 0.9
+                    self.difficulty_selected = True
+                if self.difficulty_selected:
+                    self.apply_difficulty()
+            # Difficulty dan SPACE di tick yang sama: difficulty dulu, lalu mulai
+            if self.difficulty_selected and inputs & INPUT_SPACE:
+                # Hanya menunggu asset yang belum selesai di-load
+                self.wait_for_assets()
+                self.game_state = ROUND_PREP
+                self.round_timer = 180  # 3 detik countdown
+        elif self.game_state == ROUND_OVER:
+            if inputs & INPUT_SPACE and self.round_end_timer <= 0:
+                if self.player1_wins < 2 and self.player2_wins < 2:
+                    self.start_new_round()
+        elif self.game_state == MATCH_RESULT:
+            if inputs & INPUT_SPACE:
+                self.reset_game()
+        elif self.game_state == FIGHTING:
+            self.apply_fighter_input(self.player1, inputs)
+
+    def apply_fighter_input(self, fighter, inputs):
+        if inputs & INPUT_SPACE:
+            fighter.jump()
+        if inputs & INPUT_ATTACK:
+            fighter.attack()
+        if inputs & INPUT_SKILL1:
+            fighter.use_skill(1)
+        if inputs & INPUT_SKILL2:
+            fighter.use_skill(2)
+        if inputs & INPUT_ULTIMATE:
+            fighter.use_skill(3)
+        fighter.velocity_x = 0
+        if inputs & INPUT_LEFT:
+            fighter.velocity_x = -5
+        if inputs & INPUT_RIGHT:
+            fighter.velocity_x = 5
+
+    def start_versus(self):
+        # Mulai pertandingan versus langsung dari countdown ronde pertama
+        self.wait_for_assets()
+        self.difficulty_selected = True
+        self.game_state = ROUND_PREP
+        self.round_timer = 180
+
+    def update_versus(self, player1_inputs, player2_inputs):
+        # Satu tick netplay, identik di kedua peer. Hasil akhir tetap tampil (tanpa SPACE).
+        self.update(player1_inputs, player2_inputs)
+        if self.game_state != MATCH_RESULT:
+            self.auto_advance()
+
+    def spectator_state(self):
+        # State per tick untuk penonton, hanya yang dibutuhkan untuk menggambar, semua int16.
+        # Health/energy/ultimate dikali 10 (resolusi 0.1)
+        values = []
+        for fighter in (self.player1, self.player2):
+            values += (fighter.rect.x, fighter.rect.y, round(fighter.health * 10), round(fighter.energy * 10),
+                       round(fighter.ultimate_gauge * 10), SPECTATOR_ANIMATION_CODES[fighter.current_state],
+                       SPECTATOR_ANIMATION_CODES[fighter.sprites.current_animation],
+                       int(fighter.sprites.current_frame), fighter.facing_right, fighter.weapon.active,
+                       fighter.is_dead)
+        values += (self.game_state, self.round_number, self.round_timer, self.round_end_timer,
+                   self.player1_wins, self.player2_wins, self.is_draw)
+        projectiles = [(projectile.owner.player_num, projectile.rect.centerx, projectile.rect.centery)
+                       for projectile in self.projectiles.active]
+        return values, projectiles
+    
+    def apply_spectator_state(self, values, projectiles):
+        # Kebalikan spectator_state() di sisi penonton: Game tidak disimulasikan, hanya digambar
+        fields = iter(values)
+        for fighter in (self.player1, self.player2):
+            fighter.rect.x = next(fields)
+            fighter.rect.y = next(fields)
+            fighter.health = next(fields) / 10
+            fighter.energy = next(fields) / 10
+            fighter.ultimate_gauge = next(fields) / 10
+            fighter.current_state = SPECTATOR_ANIMATIONS[next(fields)]
+            fighter.sprites.current_animation = SPECTATOR_ANIMATIONS[next(fields)]
+            fighter.sprites.current_frame = next(fields)
+            fighter.facing_right = bool(next(fields))
+            fighter.weapon.active = bool(next(fields))
+            fighter.is_dead = bool(next(fields))
+            fighter.update_hit_box()
+            fighter.weapon.follow_owner()
+            fighter.update_image()
+        (self.game_state, self.round_number, self.round_timer, self.round_end_timer,
+         self.player1_wins, self.player2_wins, is_draw) = fields
+        self.is_draw = bool(is_draw)
+        
+        self.projectiles.clear()
+        fighters = {1: self.player1, 2: self.player2}
+        for player_num, x, y in projectiles:
+            weapon = fighters[player_num].weapon
+            self.projectiles.spawn(weapon.image, (x, y), (0, 0), 1, weapon.owner, weapon.hit, weapon.mask)
+
+    def state_hash(self, state=None):
+        # Hash deterministik antar proses (hash() bawaan diacak untuk string).
+        # state: hasil snapshot() (tanpa state rng), default state sekarang.
+        # Hanya data biasa yang di-hash: repr Surface/Fighter/Mask di snapshot proyektil
+        # memuat jumlah sprite group, yang berbeda antar mode renderer
+        if state is not None:
+            values, player1_state, player2_state, projectile_state, controller_states = state[:5]
+        else:
+            values, player1_state, player2_state = (self.state_getter(self), self.player1.snapshot(),
+                                                    self.player2.snapshot())
+            projectile_state = self.projectiles.snapshot()
+            controller_states = tuple(controller.snapshot() for controller in self.controllers())
+        projectiles = tuple((owner.player_num, center, velocity_x, velocity_y, age, lifetime)
+                            for center, velocity_x, velocity_y, age, lifetime, _, owner, _, _ in projectile_state)
+        return zlib.crc32(repr((values, player1_state, player2_state, projectiles, controller_states)).encode())
 
     def check_collisions(self):
-        for weapon in self.weapons:
-            if weapon.active:
-                hits = pygame.sprite.spritecollide(weapon, self.all_sprites, False)
-                for hit in hits:
-                    if hit != weapon.owner and not hit.is_dead:
-                        hit.take_damage(10)
-                        weapon.active = False
+        weapons = [weapon for weapon in self.weapons if weapon.active]
+        if not weapons and not self.projectiles.active:
+            return
+            
+        # Broad phase: hurtbox fighter diindeks sekali per tick. Pertandingan biasa selalu
+        # di bawah SWEEP_MIN_ENTITIES dan memakai AllPairs; sweep-and-prune baru menang
+        # bila jumlah entity melewati titik impas yang diukur benchmark.py
+        count = len(self.all_sprites) + len(weapons) + len(self.projectiles.active)
+        broad_phase = self.sweep_and_prune if count >= SWEEP_MIN_ENTITIES else self.all_pairs
+        broad_phase.build((fighter, fighter.hit_box) for fighter in self.all_sprites if not fighter.is_dead)
+        
+        for weapon in weapons:
+            for hit in broad_phase.query(weapon.rect):
+                if hit != weapon.owner and not hit.is_dead and self.pixels_overlap(hit, weapon.rect, weapon.mask):
+                    hit.take_damage(weapon.damage)
+                    weapon.active = False
+                        
+        # Proyektil hilang setelah mengenai satu target, efeknya dari callback on_hit.
+        # Yang kena ditandai lalu dilepas sekaligus tanpa menyalin daftar aktif;
+        # proyektil yang di-spawn on_hit baru dicek tick berikutnya
+        projectiles = self.projectiles.active
+        spent = False
+        for index in range(len(projectiles)):
+            projectile = projectiles[index]
+            for hit in broad_phase.query(projectile.rect):
+                if hit != projectile.owner and not hit.is_dead and self.pixels_overlap(hit, projectile.rect, projectile.mask):
+                    projectile.on_hit(projectile, hit)
+                    projectile.spent = spent = True
+                    break
+        if spent:
+            self.projectiles.compact()
 
-    def update(self):
+    def pixels_overlap(self, fighter, rect, mask):
+        # Narrow phase opsional: dipanggil hanya setelah rect overlap dengan hurtbox,
+        # lalu cek piksel frame fighter saat ini terhadap mask senjata/proyektil
+        if not self.pixel_collisions or mask is None:
+            return True
+        fighter_mask = fighter.sprites.get_current_mask(not fighter.facing_right)
+        if fighter_mask is None:
+            return True
+        return fighter_mask.overlap(mask, (rect.x - fighter.rect.x, rect.y - fighter.rect.y)) is not None
+
+    def update(self, inputs=None, player2_inputs=0):
+        if inputs is None:
+            inputs = self.take_input()
+        if self.versus:
+            # Tanpa menu: alur ronde lewat auto_advance, input langsung ke fighter
+            if self.game_state == FIGHTING:
+                self.apply_fighter_input(self.player1, inputs)
+                self.apply_fighter_input(self.player2, player2_inputs)
+        elif self.player1_ai is None:
+            self.apply_input(inputs)
+            
+        self.player1.save_position()
+        self.player2.save_position()
+        
+        self.update_state()
+        
+        if self.recorder is not None:
+            self.recorder.record(inputs, self.state_hash())
+            if self.game_state == MATCH_RESULT:
+                self.recorder.finish()
+
+    def update_state(self):
         if self.game_state == TITLE_SCREEN:
             return
         elif self.game_state == ROUND_PREP:
@@ -707,10 +1934,23 @@ class Game:
                 self.game_state = ROUND_OVER
                 self.round_end_timer = 600  # 10 detik jeda
                 
+            profiler = self.profiler
+            if profiler:
+                profiler.lap("logic")
             self.all_sprites.update()
             self.weapons.update()
-            self.ai_controller.update()
+            self.projectiles.update()
+            if profiler:
+                profiler.lap("sprites")
+            if self.ai_controller:
+                self.ai_controller.update()
+            if self.player1_ai:
+                self.player1_ai.update()
+            if profiler:
+                profiler.lap("ai")
             self.check_collisions()
+            if profiler:
+                profiler.lap("collisions")
             
             self.background.update(self.player1.velocity_x)
             
@@ -752,17 +1992,67 @@ class Game:
         self.player2.invincible = False
         self.player1.attack_timer = 0
         self.player2.attack_timer = 0
+        self.projectiles.clear()
+        
+        # Jangan interpolasi dari posisi ronde sebelumnya
+        self.player1.save_position()
+        self.player2.save_position()
 
-    def draw(self):
-        self.background.draw(self.screen)
+    def draw(self, alpha=1.0):
+        # alpha: posisi render di antara langkah simulasi sebelumnya (0) dan terakhir (1)
+        if self.loader is not None:
+            self.poll_assets()
+        for fighter in self.all_sprites:
+            fighter.begin_draw(alpha)
+            
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.draw()
+        else:
+            self.draw_scene(self.screen)
+            if self.shows_sprites():
+                self.draw_sprites(self.screen)
+            self.draw_overlay(self.screen)
+            if self.profiler:
+                self.profiler.lap("draw")
+            self.presenter.present()
+        # Input yang sudah diterapkan sebelum frame ini sekarang terlihat di layar
+        self.input_buffer.presented(time.perf_counter())
+        
+        for fighter in self.all_sprites:
+            fighter.end_draw()
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - STARTUP_TIME
+        if self.profiler:
+            self.profiler.lap("flip")
+
+    def shows_sprites(self):
+        return self.game_state not in (TITLE_SCREEN, MATCH_RESULT)
+
+    def draw_scene(self, surface):
+        self.background.draw(surface)
         # Gambar tanah yang lebih tinggi dan sesuai dengan background
-        pygame.draw.rect(self.screen, (101, 67, 33), (0, self.floor_height - 20, SCREEN_WIDTH, SCREEN_HEIGHT - (self.floor_height - 20)))
+        pygame.draw.rect(surface, (101, 67, 33), (0, self.floor_height - 20, SCREEN_WIDTH, SCREEN_HEIGHT - (self.floor_height - 20)))
+
+    def draw_sprites(self, surface):
+        # Gambar semua sprite
+        self.all_sprites.draw(surface)
         
+        # Gambar senjata aktif
+        for weapon in self.weapons:
+            if weapon.active:
+                surface.blit(weapon.image, weapon.rect)
+        
+        # Proyektil, mengembalikan area yang digambar
+        return self.projectiles.draw(surface)
+
+    def draw_overlay(self, surface):
+        # Teks dan HUD di atas sprite, mengembalikan area yang digambar
+        rects = []
         if self.game_state == TITLE_SCREEN:
             # Draw title
-            title_text = self.font.render("PYTHON FIGHTER", True, WHITE)
+            title_text = self.text_cache.render(self.font, "PYTHON FIGHTER", WHITE)
             title_rect = title_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/3))
-            self.screen.blit(title_text, title_rect)
+            rects.append(surface.blit(title_text, title_rect))
             
             if not self.difficulty_selected:
                 # Draw difficulty selection
@@ -774,9 +2064,9 @@ class Game:
                 ]
                 
                 for i, text in enumerate(difficulty_text):
-                    diff_text = self.small_font.render(text, True, WHITE)
+                    diff_text = self.text_cache.render(self.small_font, text, WHITE)
                     diff_rect = diff_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + i*30))
-                    self.screen.blit(diff_text, diff_rect)
+                    rects.append(surface.blit(diff_text, diff_rect))
             else:
                 # Draw controls info after difficulty is selected
                 controls = [
@@ -790,50 +2080,42 @@ class Game:
                 ]
                 
                 for i, text in enumerate(controls):
-                    control_text = self.small_font.render(text, True, WHITE)
+                    control_text = self.text_cache.render(self.small_font, text, WHITE)
                     control_rect = control_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + i*30))
-                    self.screen.blit(control_text, control_rect)
+                    rects.append(surface.blit(control_text, control_rect))
                 
                 # Draw start instruction
-                start_text = self.tiny_font.render("Tekan SPACE untuk memulai", True, YELLOW)
+                start_text = self.text_cache.render(self.tiny_font, "Tekan SPACE untuk memulai", YELLOW)
                 start_rect = start_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT - 100))
                 # Make it blink
-                if (pygame.time.get_ticks() // 500) % 2:  # Blink every 0.5 seconds
-                    self.screen.blit(start_text, start_rect)
+                if int(time.perf_counter() * 2) % 2:  # Blink every 0.5 seconds
+                    rects.append(surface.blit(start_text, start_rect))
         elif self.game_state == MATCH_RESULT:
             # Tampilkan hasil akhir pertandingan
             winner = "Player 1" if self.player1_wins > self.player2_wins else "Player 2"
             result_text = f"{winner} Memenangkan Pertandingan!"
             score_text = f"Skor: {self.player1_wins} - {self.player2_wins}"
             
-            text = self.font.render(result_text, True, WHITE)
-            score = self.small_font.render(score_text, True, WHITE)
-            continue_text = self.tiny_font.render("Tekan SPACE untuk main lagi", True, YELLOW)
+            text = self.text_cache.render(self.font, result_text, WHITE)
+            score = self.text_cache.render(self.small_font, score_text, WHITE)
+            continue_text = self.text_cache.render(self.tiny_font, "Tekan SPACE untuk main lagi", YELLOW)
             
             text_rect = text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 50))
             score_rect = score.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 20))
             continue_rect = continue_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 100))
             
-            self.screen.blit(text, text_rect)
-            self.screen.blit(score, score_rect)
-            self.screen.blit(continue_text, continue_rect)
+            rects.append(surface.blit(text, text_rect))
+            rects.append(surface.blit(score, score_rect))
+            rects.append(surface.blit(continue_text, continue_rect))
         else:
             # Draw UI
-            self.game_ui.draw_navbar(self.screen, self.player1, self.player2, self.round_timer, FPS)
-            
-            # Gambar semua sprite
-            self.all_sprites.draw(self.screen)
-            
-            # Gambar senjata aktif
-            for weapon in self.weapons:
-                if weapon.active:
-                    self.screen.blit(weapon.image, weapon.rect)
+            rects.append(self.game_ui.draw_navbar(surface, self.player1, self.player2, self.round_timer, FPS))
             
             # Gambar teks ronde
             if self.game_state == ROUND_PREP:
-                text = self.font.render(f"Round {self.round_number}", True, WHITE)
+                text = self.text_cache.render(self.font, f"Round {self.round_number}", WHITE)
                 text_rect = text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2))
-                self.screen.blit(text, text_rect)
+                rects.append(surface.blit(text, text_rect))
             elif self.game_state == ROUND_OVER:
                 if self.is_draw:
                     result_text = "Seri!"
@@ -841,35 +2123,317 @@ class Game:
                     winner = "Player 1" if self.player2.is_dead else "Player 2"
                     result_text = f"{winner} Menang!"
                 
-                text = self.font.render(result_text, True, WHITE)
-                score = self.small_font.render(f"Skor: {self.player1_wins} - {self.player2_wins}", True, WHITE)
-                timer = self.small_font.render(f"Jeda: {self.round_end_timer//60}", True, WHITE)
+                text = self.text_cache.render(self.font, result_text, WHITE)
+                score = self.text_cache.render(self.small_font, f"Skor: {self.player1_wins} - {self.player2_wins}", WHITE)
+                timer = self.text_cache.render(self.small_font, f"Jeda: {self.round_end_timer//60}", WHITE)
                 
                 text_rect = text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 - 50))
                 score_rect = score.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 20))
                 timer_rect = timer.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 70))
                 
-                self.screen.blit(text, text_rect)
-                self.screen.blit(score, score_rect)
-                self.screen.blit(timer, timer_rect)
+                rects.append(surface.blit(text, text_rect))
+                rects.append(surface.blit(score, score_rect))
+                rects.append(surface.blit(timer, timer_rect))
                 
                 if self.round_end_timer <= 0:
-                    continue_text = self.tiny_font.render("Tekan SPACE untuk lanjut", True, YELLOW)
+                    continue_text = self.text_cache.render(self.tiny_font, "Tekan SPACE untuk lanjut", YELLOW)
                     continue_rect = continue_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 120))
-                    self.screen.blit(continue_text, continue_rect)
+                    rects.append(surface.blit(continue_text, continue_rect))
+        
+        if self.netplay is not None and self.netplay.waiting():
+            waiting_text = self.text_cache.render(self.small_font, "Menunggu lawan...", YELLOW)
+            rects.append(surface.blit(waiting_text, waiting_text.get_rect(center=(SCREEN_WIDTH/2, SCREEN_HEIGHT/2 + 60))))
         
-        pygame.display.flip()
+        if self.profiler and self.profiler.show_overlay:
+            rects.append(self.profiler.draw(surface, FPS))
+            # Simulasi tetap FPS tick/detik berapapun kecepatan render (diukur per detik di run())
+            text = f"Sim {self.sim_hz:.0f} Hz, render {self.render_hz:.0f} Hz"
+            rate_text = self.text_cache.render(self.tiny_font, text, WHITE)
+            rects.append(surface.blit(rate_text, (self.profiler.rect.right + 10,
+                                                  self.profiler.rect.bottom - 4 * rate_text.get_height())))
+            controller = self.ai_controller
+            if isinstance(controller, SearchAIController) and controller.decisions:
+                # Statistik pencarian AI, dibulatkan supaya cache teks tidak cepat penuh
+                text = (f"AI search: {controller.last_rollouts} rollouts, "
+                        f"{round(controller.nodes_per_sec(), -3):.0f} nodes/s")
+                search_text = self.text_cache.render(self.tiny_font, text, WHITE)
+                rects.append(surface.blit(search_text, (self.profiler.rect.right + 10,
+                                                        self.profiler.rect.bottom - search_text.get_height())))
+            elif isinstance(controller, AsyncAIController) and controller.latencies:
+                average, worst = controller.latency_ms()
+                text = (f"AI async: latency {average:.0f}/{worst:.0f} ms, late {controller.late}, "
+                        f"{round(controller.worker_nodes_per_sec, -3):.0f} nodes/s")
+                search_text = self.text_cache.render(self.tiny_font, text, WHITE)
+                rects.append(surface.blit(search_text, (self.profiler.rect.right + 10,
+                                                        self.profiler.rect.bottom - search_text.get_height())))
+            if self.netplay is not None:
+                net = self.netplay.stats()
+                text = (f"Net: rtt {net['rtt_ms'] or 0:.0f} ms, rollback {net['rollbacks']} "
+                        f"(max {net['max_rollback']} frames), stalls {net['stalls']}, desync {net['desyncs']}")
+                net_text = self.text_cache.render(self.tiny_font, text, WHITE)
+                rects.append(surface.blit(net_text, (self.profiler.rect.right + 10,
+                                                     self.profiler.rect.bottom - 3 * net_text.get_height())))
+            latency = self.input_buffer.percentiles()
+            if latency is not None:
+                text = f"Input latency p50 {latency[50]:.0f} / p95 {latency[95]:.0f} / p99 {latency[99]:.0f} ms"
+                latency_text = self.text_cache.render(self.tiny_font, text, WHITE)
+                rects.append(surface.blit(latency_text, (self.profiler.rect.right + 10,
+                                                         self.profiler.rect.bottom - 2 * latency_text.get_height())))
+        return rects
 
     def run(self):
+        # Fixed timestep: simulasi selalu SIM_DT per langkah, render diinterpolasi
         running = True
+        accumulator = 0.0
+        previous = time.perf_counter()
+        rate_start = previous
+        sim_steps = 0
+        frames = 0
         while running:
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
+            
+            # Profiler None = tanpa overhead selain cek if
+            if self.profiler:
+                self.profiler.begin_frame()
             running = self.handle_input()
+            if self.profiler:
+                self.profiler.lap("input")
+            
+            steps = 0
+            while accumulator >= SIM_DT and steps < MAX_SIM_STEPS:
+                # Titik terakhir yang aman: tekanan tombol selama langkah sebelumnya ikut tick ini
+                if steps:
+                    running = self.handle_input() and running
+                if self.netplay is not None:
+                    # Input lokal langsung disimulasikan, input peer diprediksi lalu di-rollback
+                    self.netplay.advance(self.take_input())
+                else:
+                    self.update()
+                if self.spectators is not None:
+                    self.spectators.publish(*self.spectator_state())
+                accumulator -= SIM_DT
+                steps += 1
+            if steps == MAX_SIM_STEPS:
+                # Terlalu tertinggal: buang sisa waktu daripada terus mengejar
+                accumulator = min(accumulator, SIM_DT)
+            sim_steps += steps
+            if self.profiler:
+                self.profiler.lap("logic")
+            
+            first_frame = self.first_frame_time is None
+            self.draw(accumulator / SIM_DT)
+            frames += 1
+            governor = self.quality_governor
+            if governor is not None and governor.update(time.perf_counter() - now):
+                self.set_quality(governor.level)
+                print(f"Quality {governor.level} ({governor.level_name}), "
+                      f"frame {governor.average * 1000:.1f} ms / budget {governor.budget * 1000:.1f} ms")
+            if first_frame:
+                print(f"First frame after {self.first_frame_time * 1000:.0f} ms")
+            
+            # Ukur kecepatan simulasi dan render per detik
+            if now - rate_start >= 1.0:
+                self.sim_hz = sim_steps / (now - rate_start)
+                self.render_hz = frames / (now - rate_start)
+                rate_start = now
+                sim_steps = 0
+                frames = 0
+            
+            self.clock.tick(self.render_fps)
+            if self.profiler:
+                self.profiler.end_frame(self.quality)
+
+    def auto_advance(self):
+        # Pengganti tombol SPACE saat tidak ada pemain
+        if self.game_state == TITLE_SCREEN:
+            self.wait_for_assets()
+            self.game_state = ROUND_PREP
+            self.round_timer = 180
+        elif self.game_state == ROUND_OVER and self.round_end_timer <= 0:
+            if self.player1_wins < 2 and self.player2_wins < 2:
+                self.start_new_round()
+        elif self.game_state == MATCH_RESULT:
+            self.matches_played += 1
+            self.reset_game()
+
+    def run_headless(self, max_ticks):
+        # Simulasi bot vs bot tanpa draw dan tanpa clock.tick
+        self.auto_advance()
+        results = []  # (tick selesai, skor player 1, skor player 2) per pertandingan
+        start = time.perf_counter()
+        for tick in range(max_ticks):
             self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            if self.game_state == MATCH_RESULT:
+                results.append((tick + 1, self.player1_wins, self.player2_wins))
+            self.auto_advance()
+        elapsed = time.perf_counter() - start
+        
+        return {
+            "ticks": max_ticks,
+            "elapsed": elapsed,
+            "ticks_per_sec": max_ticks / elapsed if elapsed > 0 else float("inf"),
+            "matches": self.matches_played,
+            "results": results
+        }
+
+def play_replay(path, repeat=1):
+    # Putar ulang replay secepat mungkin dan cek hash state di setiap tick
+    info, inputs, hashes = read_replay(path)
+    elapsed = 0.0
+    for _ in range(repeat):
+        # Replay dengan collision per piksel butuh sprite, jadi Game biasa
+        # (di bawah driver dummy) dan bukan headless
+        pixel_collisions = info.get("pixel_collisions", False)
+        game = Game(headless=not pixel_collisions, player1_bot=False, seed=info["seed"],
+                    pixel_collisions=pixel_collisions)
+        game.search_budget_ms = info.get("search_budget_ms")
+        game.search_rollouts = info.get("search_rollouts")
+        game.ai_difficulty = info["difficulty"]
+        game.reset_fighters()
+        game.restore((tuple(info["state"]),) + game.snapshot()[1:])
+        
+        start = time.perf_counter()
+        for tick, (tick_input, expected) in enumerate(zip(inputs, hashes)):
+            game.update(tick_input)
+            if game.state_hash() != expected:
+                raise RuntimeError(f"{path} desynced at tick {tick}")
+        elapsed += time.perf_counter() - start
+        
+    ticks = len(inputs) * repeat
+    return {
+        "ticks": ticks,
+        "elapsed": elapsed,
+        "ticks_per_sec": ticks / elapsed if elapsed > 0 else float("inf"),
+        "score": (game.player1_wins, game.player2_wins)
+    }
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Python Fighter")
+    parser.add_argument("--headless", action="store_true", help="simulasi bot vs bot tanpa jendela")
+    parser.add_argument("--ticks", type=int, default=100000, help="jumlah tick untuk mode headless")
+    parser.add_argument("--dirty-rects", action="store_true", help="render hanya area yang berubah")
+    parser.add_argument("--window", metavar="WxH", help="ukuran window, gambar internal tetap "
+                        f"{SCREEN_WIDTH}x{SCREEN_HEIGHT} lalu di-scale")
+    parser.add_argument("--fullscreen", action="store_true", help="layar penuh dengan letterbox")
+    parser.add_argument("--present", choices=PRESENT_MODES, default=None,
+                        help="cara scale ke window (default: software untuk --window, scaled untuk --fullscreen)")
+    parser.add_argument("--integer-scale", action="store_true", help="scale software hanya kelipatan bulat")
+    parser.add_argument("--render-fps", type=int, default=FPS, help="batas FPS render, 0 = tanpa batas")
+    parser.add_argument("--quality", choices=("auto",) + tuple(str(level) for level in range(len(QUALITY_LEVELS))),
+                        default="auto", help="level kualitas render tetap, auto = turun/naik menurut frame time")
+    parser.add_argument("--bake", action="store_true", help="bake semua sprite ke " + SPRITE_BUNDLE_PATH)
+    parser.add_argument("--compare-startup", action="store_true", help="bandingkan waktu load PNG dan bundle")
+    parser.add_argument("--record", metavar="DIR", help="rekam input setiap pertandingan ke DIR")
+    parser.add_argument("--replay", metavar="FILE", help="putar ulang replay tanpa jendela dan cek determinisme")
+    parser.add_argument("--repeat", type=int, default=1, help="jumlah pengulangan untuk --replay")
+    parser.add_argument("--seed", type=int, default=None, help="seed rng AI (default acak per pertandingan)")
+    parser.add_argument("--async-ai", choices=("thread", "process"),
+                        help="hitung keputusan AI SULIT di worker, loop utama tidak menunggu")
+    parser.add_argument("--net", type=int, choices=(1, 2), help="main berdua lewat jaringan sebagai player 1 atau 2")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port UDP lokal untuk --net")
+    parser.add_argument("--peer", metavar="HOST:PORT", help="alamat peer untuk --net")
+    parser.add_argument("--net-delay", type=float, default=0.0, help="uji: delay paket keluar (ms, satu arah)")
+    parser.add_argument("--net-jitter", type=float, default=0.0, help="uji: jitter delay paket (ms)")
+    parser.add_argument("--net-loss", type=float, default=0.0, help="uji: peluang paket keluar dibuang")
+    parser.add_argument("--spectate", type=int, metavar="PORT", help="siarkan pertandingan ke penonton di PORT")
+    parser.add_argument("--pixel-collisions", action="store_true", help="cek hit per piksel setelah hurtbox overlap")
+    parser.add_argument("--profile", metavar="FILE", help="ukur waktu per fase, simpan ke FILE (.csv/.json) saat keluar")
+    args = parser.parse_args()
+    if args.net and not args.peer:
+        parser.error("--net butuh --peer")
+    if args.net and args.record:
+        parser.error("replay belum mendukung --net")
+    
+    if args.bake:
+        size = bake_sprite_bundle()
+        print(f"Wrote {SPRITE_BUNDLE_PATH} ({size / (1024 * 1024):.1f} MB)")
+    elif args.compare_startup:
+        pygame.display.set_mode((1, 1))
+        png_time = measure_asset_startup(False)
+        bundle_time = measure_asset_startup(True)
+        print(f"PNG load: {png_time * 1000:.1f} ms")
+        if bundle_time is None:
+            print("Bundle load: no valid bundle, run main.py --bake first")
+        else:
+            print(f"Bundle load: {bundle_time * 1000:.1f} ms ({png_time / bundle_time:.1f}x)")
+    elif args.replay:
+        stats = play_replay(args.replay, args.repeat)
+        print(f"{stats['ticks']} ticks replayed in {stats['elapsed']:.2f}s "
+              f"({stats['ticks_per_sec']:.0f} ticks/sec), no desync, score {stats['score'][0]}-{stats['score'][1]}")
+    elif args.headless:
+        game = Game(headless=True, seed=args.seed)
+        stats = game.run_headless(args.ticks)
+        print(f"{stats['ticks']} ticks in {stats['elapsed']:.2f}s "
+              f"({stats['ticks_per_sec']:.0f} ticks/sec, {stats['matches']} matches)")
+    else:
+        window_size = tuple(int(value) for value in args.window.lower().split("x")) if args.window else None
+        # pygame.SCALED memilih sendiri ukuran window, jadi --window memakai scale software
+        present_mode = args.present
+        if present_mode is None:
+            present_mode = "software" if window_size else "scaled" if args.fullscreen else "direct"
+        game = Game(dirty_rects=args.dirty_rects, seed=args.seed, pixel_collisions=args.pixel_collisions,
+                    load_in_background=True, window_size=window_size, fullscreen=args.fullscreen,
+                    present_mode=present_mode, integer_scale=args.integer_scale, versus=bool(args.net))
+        game.render_fps = args.render_fps
+        if args.quality == "auto":
+            game.quality_governor = QualityGovernor(1.0 / (args.render_fps or FPS))
+        else:
+            game.set_quality(int(args.quality))
+        game.async_ai = args.async_ai
+        if args.record:
+            # AI pencarian dengan budget waktu tidak bisa diulang persis
+            game.search_budget_ms = None
+            game.search_rollouts = SEARCH_REPLAY_ROLLOUTS
+            game.async_ai = None
+            game.recorder = ReplayRecorder(args.record)
+            game.recorder.start(game)
+        link = None
+        if args.net:
+            # Opsi yang mengubah simulasi (--pixel-collisions) dicocokkan saat handshake
+            link = open_link(args.port, delay_ms=args.net_delay, jitter_ms=args.net_jitter, loss=args.net_loss)
+            peer = parse_address(args.peer)
+            print(f"Waiting for peer {peer[0]}:{peer[1]}...")
+            try:
+                seed = connect(link, peer, args.net, args.seed if args.seed is not None else random.getrandbits(32),
+                               simulation_config(game))
+            except ValueError as e:
+                print(f"Can't play with this peer: {e}")
+                sys.exit(1)
+            if seed is None:
+                print("Peer did not answer")
+                sys.exit(1)
+            game.seed = seed
+            game.reset_fighters()
+            game.start_versus()
+            game.netplay = RollbackSession(game, args.net, link, peer, INPUT_LEFT | INPUT_RIGHT)
+        if args.spectate is not None:
+            game.spectators = SpectatorServer()
+            print(f"Broadcasting to spectators on port {game.spectators.start_thread('0.0.0.0', args.spectate)}")
+        if args.profile:
+            game.profiler = FrameProfiler()
+        game.run()
+        game.close()
+        if game.spectators is not None:
+            game.spectators.close()
+        if game.netplay is not None:
+            link.close()
+            stats = game.netplay.stats()
+            print(f"Netplay: {stats['frames']} frames, {stats['rollbacks']} rollbacks "
+                  f"({stats['rollback_frames']} frames resimulated, max {stats['max_rollback']}), "
+                  f"{stats['stalls']} stalls, {stats['desyncs']} desyncs")
+        latency = game.input_buffer.percentiles()
+        if latency is not None:
+            print(f"Input latency p50 {latency[50]:.1f} ms, p95 {latency[95]:.1f} ms, p99 {latency[99]:.1f} ms "
+                  f"({game.input_buffer.latency_count} inputs)")
+        if args.profile:
+            game.profiler.dump(args.profile)
+            print(f"Saved profile {args.profile}")
+        if game.recorder is not None:
+            # Pertandingan yang belum selesai saat keluar tetap disimpan
+            game.recorder.finish()
+            for path in game.recorder.saved:
+                print(f"Saved replay {path}")
     pygame.quit()
     sys.exit() 
\ No newline at end of file
@@ -0,0 +1,401 @@
+import argparse
+import heapq
+import os
+import random
+import socket
+import struct
+import sys
+import time
+from array import array
+
+# Netplay dua pemain lewat UDP dengan rollback. Yang dikirim hanya input per tick
+# (bitmask 16 bit), kedua peer menjalankan simulasi Game yang sama persis.
+
+PACKET_HELLO = 1
+PACKET_INPUTS = 2
+# Hello: tipe, versi protokol, player_num pengirim, sudah menerima hello peer,
+# konfigurasi simulasi, seed pertandingan
+HELLO = struct.Struct("<BBBBBI")
+NET_VERSION = 1  # Naikkan bila format paket atau aturan simulasi berubah
+# Bit konfigurasi yang mengubah hasil simulasi, harus sama di kedua peer
+CONFIG_PIXEL_COLLISIONS = 1 << 0
+# Input: tipe, frame input pertama, ack (input peer terakhir yang lengkap diterima),
+# frame advantage pengirim, frame hash, hash state, jumlah input; lalu input uint16
+INPUT_HEADER = struct.Struct("<BiibiIB")
+MAX_INPUTS_PER_PACKET = 64
+MAX_ROLLBACK = 10  # Frame prediksi maksimal sebelum menunggu peer
+HASH_INTERVAL = 30  # Hash state dikirim tiap sekian frame untuk deteksi desync
+SYNC_INTERVAL = 60  # Frame antar penyesuaian frame advantage
+DEFAULT_PORT = 7777
+
+class LossyLink:
+    # Shim untuk uji di satu mesin: paket keluar ditahan delay +- jitter dan sebagian dibuang.
+    # Delay berlaku per arah, RTT = delay kedua peer dijumlahkan.
+    def __init__(self, sock, delay_ms=0.0, jitter_ms=0.0, loss=0.0, seed=None):
+        self.sock = sock
+        self.delay = delay_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.queue = []  # (waktu kirim, urutan, data, alamat)
+        self.sequence = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def sendto(self, data, address):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = max(0.0, self.delay + self.rng.uniform(-self.jitter, self.jitter))
+        if delay == 0.0 and not self.queue:
+            self.sock.sendto(data, address)
+            return
+        heapq.heappush(self.queue, (time.perf_counter() + delay, self.sequence, data, address))
+        self.sequence += 1
+        self.flush()
+
+    def flush(self):
+        now = time.perf_counter()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.queue)
+            self.sock.sendto(data, address)
+
+    def recvfrom(self, size):
+        self.flush()
+        return self.sock.recvfrom(size)
+
+    def close(self):
+        self.queue.clear()
+        self.sock.close()
+
+def open_link(port, host="0.0.0.0", delay_ms=0.0, jitter_ms=0.0, loss=0.0, seed=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return LossyLink(sock, delay_ms, jitter_ms, loss, seed)
+
+def receive_all(link):
+    # Semua paket yang sudah sampai, tanpa menunggu
+    packets = []
+    while True:
+        try:
+            packets.append(link.recvfrom(2048))
+        except BlockingIOError:
+            return packets
+        except ConnectionResetError:
+            continue  # Windows: ICMP port unreachable dari paket sebelumnya
+
+def simulation_config(game):
+    # Bit CONFIG_* dari opsi Game yang mengubah hasil simulasi
+    return CONFIG_PIXEL_COLLISIONS if game.pixel_collisions else 0
+
+def describe_config(config):
+    return f"pixel collisions {'on' if config & CONFIG_PIXEL_COLLISIONS else 'off'}"
+
+def connect(link, peer, local_player, seed, config=0, timeout=30.0):
+    # Tukar hello sampai kedua sisi saling melihat. Seed selalu milik player 1.
+    # Mengembalikan seed, atau None bila peer tidak menjawab. Versi protokol atau
+    # konfigurasi simulasi yang berbeda ditolak (ValueError) karena pasti desync.
+    deadline = time.monotonic() + timeout
+    seen = False
+    next_send = 0.0
+    while time.monotonic() < deadline:
+        now = time.monotonic()
+        if now >= next_send:
+            link.sendto(HELLO.pack(PACKET_HELLO, NET_VERSION, local_player, seen, config, seed), peer)
+            next_send = now + 0.1
+        for data, address in receive_all(link):
+            if address != peer or not data:
+                continue
+            if data[0] == PACKET_HELLO and len(data) == HELLO.size:
+                _, version, player_num, peer_seen, peer_config, peer_seed = HELLO.unpack(data)
+                if version != NET_VERSION or peer_config != config:
+                    # Hello kita dikirim sekali lagi supaya peer juga bisa menolak
+                    link.sendto(HELLO.pack(PACKET_HELLO, NET_VERSION, local_player, seen, config, seed), peer)
+                    if version != NET_VERSION:
+                        raise ValueError(f"Peer uses protocol version {version}, this build uses {NET_VERSION}")
+                    raise ValueError(f"Peer plays with {describe_config(peer_config)}, "
+                                     f"this side with {describe_config(config)}")
+                if player_num == local_player:
+                    raise ValueError(f"Both peers are player {local_player}")
+                seen = True
+                if local_player == 2:
+                    seed = peer_seed
+                if peer_seen:
+                    # Kirim sekali lagi supaya peer juga tahu hello-nya sampai
+                    link.sendto(HELLO.pack(PACKET_HELLO, NET_VERSION, local_player, True, config, seed), peer)
+                    return seed
+            elif data[0] == PACKET_INPUTS and seen:
+                # Peer sudah mulai bermain, berarti hello kita sudah sampai
+                return seed
+        time.sleep(0.005)
+    return None
+
+class RollbackSession:
+    # Satu tick = satu frame. Input remote yang belum datang diprediksi (tombol tahan
+    # diulang, tombol tekan dianggap tidak ditekan). Begitu input asli datang dan
+    # berbeda dari prediksi, state dikembalikan ke snapshot frame itu lalu
+    # disimulasikan ulang sampai frame sekarang, jadi input lokal tidak pernah ditunda.
+    def __init__(self, game, local_player, link, peer, hold_inputs=0, max_rollback=MAX_ROLLBACK):
+        self.game = game
+        self.local_player = local_player
+        self.link = link
+        self.peer = peer
+        self.hold_inputs = hold_inputs  # Bit input yang diprediksi tetap ditahan
+        self.max_rollback = max_rollback
+        self.frame = 0  # Frame berikutnya yang disimulasikan
+        self.local_inputs = {}
+        self.remote_inputs = {}  # Input remote yang sudah diterima
+        self.used_inputs = {}  # Input remote yang dipakai saat frame disimulasikan
+        self.snapshots = {}  # State sebelum frame disimulasikan
+        self.hashes = {}  # Hash state setelah frame final (kedua input asli)
+        self.hashed = -1
+        self.remote_hashes = {}
+        self.remote_confirmed = -1  # Semua input remote s/d frame ini sudah diterima
+        self.remote_ack = -1  # Semua input lokal s/d frame ini sudah diterima peer
+        self.remote_frame = -1  # Frame input terbaru dari peer
+        self.remote_advantage = 0
+        self.rollback_from = None
+        self.pending_input = 0  # Tombol yang ditekan selama menunggu peer
+        self.wait_frames = 0
+        self.send_times = {}
+
+        # Statistik
+        self.rollbacks = 0
+        self.rollback_frames = 0
+        self.max_rollback_seen = 0
+        self.stalls = 0
+        self.stalled = 0  # Stall berturut-turut
+        self.desyncs = 0
+        self.first_desync = None
+        self.rtt = None  # Rata-rata eksponensial detik
+
+    def advance(self, local_input):
+        # Dipanggil sekali per tick, False bila tick ini harus menunggu peer
+        self.receive()
+        self.rollback()
+        self.record_hashes()
+        local_input |= self.pending_input
+        if self.wait_frames > 0 or self.frame - self.remote_confirmed > self.max_rollback:
+            # Terlalu jauh di depan peer: tunggu daripada prediksi makin panjang
+            if self.wait_frames > 0:
+                self.wait_frames -= 1
+            self.pending_input = local_input
+            self.stalls += 1
+            self.stalled += 1
+            self.send()
+            return False
+        self.pending_input = 0
+        self.stalled = 0
+        frame = self.frame
+        self.local_inputs[frame] = local_input
+        self.simulate(frame)
+        self.frame += 1
+        self.record_hashes()
+        if self.frame % SYNC_INTERVAL == 0:
+            self.balance()
+        self.send()
+        self.prune()
+        return True
+
+    def simulate(self, frame):
+        game = self.game
+        self.snapshots[frame] = game.snapshot()
+        remote = self.remote_inputs.get(frame)
+        if remote is None:
+            remote = self.remote_inputs.get(self.remote_confirmed, 0) & self.hold_inputs
+        self.used_inputs[frame] = remote
+        local = self.local_inputs[frame]
+        if self.local_player == 1:
+            game.update_versus(local, remote)
+        else:
+            game.update_versus(remote, local)
+
+    def record_hashes(self):
+        # Frame dengan kedua input asli sudah final, hash state sesudahnya
+        # (= snapshot sebelum frame berikutnya) dikirim ke peer untuk dibandingkan
+        final = min(self.remote_confirmed, self.frame - 1)
+        for frame in range(self.hashed + 1, final + 1):
+            if frame % HASH_INTERVAL == 0:
+                state = self.snapshots.get(frame + 1)
+                self.hashes[frame] = self.game.state_hash(state)
+        self.hashed = max(self.hashed, final)
+
+    def rollback(self):
+        start = self.rollback_from
+        if start is None:
+            return
+        self.rollback_from = None
+        self.game.restore(self.snapshots[start])
+        for frame in range(start, self.frame):
+            self.simulate(frame)
+        self.rollbacks += 1
+        self.rollback_frames += self.frame - start
+        self.max_rollback_seen = max(self.max_rollback_seen, self.frame - start)
+
+    def balance(self):
+        # Frame advantage: seberapa jauh frame lokal di depan input terbaru peer.
+        # Latency sama untuk kedua sisi, jadi selisih advantage = selisih waktu mulai
+        local_advantage = self.frame - 1 - self.remote_frame
+        difference = local_advantage - self.remote_advantage
+        if difference >= 2:
+            self.wait_frames = difference // 2
+
+    def receive(self):
+        for data, address in receive_all(self.link):
+            if address != self.peer or len(data) < INPUT_HEADER.size or data[0] != PACKET_INPUTS:
+                continue
+            _, start, ack, advantage, hash_frame, remote_hash, count = INPUT_HEADER.unpack_from(data)
+            inputs = array("H")
+            inputs.frombytes(data[INPUT_HEADER.size:INPUT_HEADER.size + 2 * count])
+            for offset, value in enumerate(inputs):
+                frame = start + offset
+                if frame <= self.remote_confirmed or frame in self.remote_inputs:
+                    continue
+                self.remote_inputs[frame] = value
+                used = self.used_inputs.get(frame)
+                if used is not None and used != value and frame < self.frame:
+                    if self.rollback_from is None or frame < self.rollback_from:
+                        self.rollback_from = frame
+            while self.remote_confirmed + 1 in self.remote_inputs:
+                self.remote_confirmed += 1
+            if count and start + count - 1 > self.remote_frame:
+                self.remote_frame = start + count - 1
+                self.remote_advantage = advantage
+            if ack > self.remote_ack:
+                sent = self.send_times.get(ack)
+                if sent is not None:
+                    sample = time.perf_counter() - sent
+                    self.rtt = sample if self.rtt is None else self.rtt + (sample - self.rtt) * 0.1
+                self.remote_ack = ack
+            if hash_frame >= 0:
+                self.remote_hashes[hash_frame] = remote_hash
+        self.check_hashes()
+
+    def check_hashes(self):
+        for frame, remote_hash in list(self.remote_hashes.items()):
+            local_hash = self.hashes.get(frame)
+            if local_hash is None and frame >= self.frame - 2 * MAX_INPUTS_PER_PACKET:
+                continue  # Frame ini belum final di sisi lokal
+            if local_hash is not None and local_hash != remote_hash:
+                self.desyncs += 1
+                if self.first_desync is None:
+                    self.first_desync = frame
+            del self.remote_hashes[frame]
+
+    def send(self):
+        first = max(self.remote_ack + 1, self.frame - MAX_INPUTS_PER_PACKET)
+        inputs = array("H", (self.local_inputs[frame] for frame in range(first, self.frame)))
+        hash_frame = max(self.hashes) if self.hashes else -1
+        advantage = max(-128, min(127, self.frame - 1 - self.remote_frame))
+        header = INPUT_HEADER.pack(PACKET_INPUTS, first, self.remote_confirmed, advantage, hash_frame,
+                                   self.hashes.get(hash_frame, 0), len(inputs))
+        if self.frame - 1 not in self.send_times:
+            self.send_times[self.frame - 1] = time.perf_counter()
+        self.link.sendto(header + inputs.tobytes(), self.peer)
+
+    def prune(self):
+        # Frame sebelum batas ini tidak akan di-rollback lagi dan sudah diterima peer
+        keep = min(self.remote_confirmed, self.remote_ack + 1, self.frame - MAX_INPUTS_PER_PACKET)
+        for table in (self.local_inputs, self.remote_inputs, self.used_inputs, self.snapshots, self.send_times):
+            for frame in [frame for frame in table if frame < keep]:
+                del table[frame]
+        for frame in [frame for frame in self.hashes if frame < self.frame - 2 * MAX_INPUTS_PER_PACKET]:
+            del self.hashes[frame]
+
+    def waiting(self):
+        # Sudah lama menunggu peer (peer lambat atau koneksi putus)
+        return self.stalled > 30
+
+    def stats(self):
+        return {
+            "frames": self.frame,
+            "rollbacks": self.rollbacks,
+            "rollback_frames": self.rollback_frames,
+            "max_rollback": self.max_rollback_seen,
+            "stalls": self.stalls,
+            "desyncs": self.desyncs,
+            "rtt_ms": self.rtt * 1000 if self.rtt is not None else None,
+            "packets_sent": self.link.sent,
+            "packets_dropped": self.link.dropped
+        }
+
+def parse_address(text, default_host="127.0.0.1"):
+    host, _, port = text.rpartition(":")
+    return (host or default_host, int(port))
+
+def random_inputs(rng, held, press_inputs, hold_inputs):
+    # Input bot sederhana untuk uji: arah ditahan beberapa saat, sesekali menekan tombol
+    if rng.random() < 0.05:
+        held = rng.choice([0] + hold_inputs)
+    pressed = rng.choice(press_inputs) if rng.random() < 0.08 else 0
+    return held, held | pressed
+
+def run_loopback(frames, delay_ms, jitter_ms, loss, seed, port):
+    # Dua peer headless di satu proses lewat UDP loopback, di-pace real time supaya
+    # delay shim terasa seperti jaringan sungguhan. Hash state akhir kedua peer dibandingkan.
+    from main import (Game, FPS, INPUT_LEFT, INPUT_RIGHT, INPUT_SPACE, INPUT_ATTACK, INPUT_SKILL1,
+                      INPUT_SKILL2, INPUT_ULTIMATE)
+    hold_inputs = [INPUT_LEFT, INPUT_RIGHT]
+    press_inputs = [INPUT_SPACE, INPUT_ATTACK, INPUT_SKILL1, INPUT_SKILL2, INPUT_ULTIMATE]
+    links = [open_link(port + side, "127.0.0.1", delay_ms, jitter_ms, loss, seed + side) for side in (0, 1)]
+    addresses = [("127.0.0.1", port + side) for side in (0, 1)]
+    sessions = []
+    for side in (0, 1):
+        game = Game(headless=True, versus=True, seed=seed)
+        game.start_versus()
+        sessions.append(RollbackSession(game, side + 1, links[side], addresses[1 - side],
+                                        INPUT_LEFT | INPUT_RIGHT))
+    rngs = [random.Random(seed * 2 + side) for side in (0, 1)]
+    held = [0, 0]
+    frame_time = 1.0 / FPS
+    start = time.perf_counter()
+    step = 0
+    # Kedua peer jalan sampai frames, lalu sedikit lagi supaya input terakhir terkonfirmasi
+    while min(session.remote_confirmed for session in sessions) < frames:
+        for side, session in enumerate(sessions):
+            if session.frame < frames:
+                held[side], inputs = random_inputs(rngs[side], held[side], press_inputs, hold_inputs)
+            else:
+                inputs = 0
+            session.advance(inputs)
+        step += 1
+        delay = start + step * frame_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if step > frames * 4:
+            break
+
+    # Bandingkan hash state final terakhir yang dimiliki kedua peer
+    for session in sessions:
+        session.receive()
+        session.rollback()
+        session.record_hashes()
+    common = set(sessions[0].hashes) & set(sessions[1].hashes)
+    same = bool(common) and sessions[0].hashes[max(common)] == sessions[1].hashes[max(common)]
+    for link in links:
+        link.close()
+    return [session.stats() for session in sessions], same
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    parser = argparse.ArgumentParser(description="Uji netplay rollback dua peer lewat UDP loopback")
+    parser.add_argument("--frames", type=int, default=1200, help="jumlah tick yang dimainkan")
+    parser.add_argument("--delay", type=float, default=40.0, help="delay satu arah per peer (ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="jitter delay (ms)")
+    parser.add_argument("--loss", type=float, default=0.05, help="peluang paket hilang")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port peer 1, peer 2 memakai port+1")
+    args = parser.parse_args()
+
+    stats, same = run_loopback(args.frames, args.delay, args.jitter, args.loss, args.seed, args.port)
+    for side, session_stats in enumerate(stats):
+        rtt = session_stats["rtt_ms"]
+        print(f"Peer {side + 1}: {session_stats['frames']} frames, {session_stats['rollbacks']} rollbacks "
+              f"({session_stats['rollback_frames']} frames resimulated, max {session_stats['max_rollback']}), "
+              f"{session_stats['stalls']} stalls, rtt {rtt if rtt is not None else 0:.0f} ms, "
+              f"{session_stats['packets_dropped']}/{session_stats['packets_sent']} packets dropped, "
+              f"{session_stats['desyncs']} desyncs")
+    print("State in sync" if same and not any(s["desyncs"] for s in stats) else "DESYNC")
+    sys.exit(0 if same and not any(s["desyncs"] for s in stats) else 1)
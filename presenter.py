@@ -0,0 +1,74 @@
+import pygame
+
+# Mode present: "direct" = window seukuran surface internal (tanpa scale),
+# "scaled" = SDL renderer yang men-scale (pygame.SCALED, biasanya di GPU),
+# "software" = window sembarang ukuran, surface internal di-scale nearest sekali per frame
+PRESENT_MODES = ("direct", "scaled", "software")
+
+class Presenter:
+    # Game selalu menggambar ke surface internal berukuran tetap, jadi asset dan
+    # biaya draw tidak bergantung resolusi output. Hanya present() yang di-scale.
+    def __init__(self, internal_size, window_size=None, fullscreen=False, mode="direct", integer_scale=False):
+        self.internal_size = internal_size
+        self.mode = mode
+        self.integer_scale = integer_scale
+        flags = pygame.FULLSCREEN if fullscreen else 0
+        if mode == "software":
+            if window_size is None:
+                window_size = (0, 0) if fullscreen else internal_size  # (0, 0) = resolusi desktop
+            self.window = pygame.display.set_mode(window_size, flags)
+            self.surface = pygame.Surface(internal_size).convert(self.window)
+            self.layout()
+        else:
+            if mode == "scaled":
+                flags |= pygame.SCALED
+            self.window = self.surface = pygame.display.set_mode(internal_size, flags)
+            self.factor = 1
+            self.target = None
+
+    def layout(self):
+        # Scale sebesar mungkin dengan rasio aspek tetap, sisa jadi letterbox.
+        # integer_scale: hanya kelipatan bulat (piksel tetap tajam dan seragam).
+        window_width, window_height = self.window.get_size()
+        width, height = self.internal_size
+        ratio = min(window_width / width, window_height / height)
+        if self.integer_scale and ratio >= 1:
+            ratio = int(ratio)
+        # Faktor bulat memungkinkan present per dirty rect, pecahan selalu full frame
+        self.factor = int(ratio) if ratio == int(ratio) else None
+        rect = pygame.Rect((0, 0), (int(width * ratio), int(height * ratio)))
+        rect.center = self.window.get_rect().center
+        self.window.fill((0, 0, 0))
+        self.target = self.window.subsurface(rect)
+        self.target_rect = rect
+
+    def present(self, rects=None):
+        # rects: area surface internal yang berubah, None = seluruh frame
+        if self.target is None:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
+
+        if rects is None or self.factor is None:
+            if self.factor == 1:
+                self.target.blit(self.surface, (0, 0))
+            else:
+                pygame.transform.scale(self.surface, self.target_rect.size, self.target)
+            pygame.display.flip()
+            return
+
+        # Faktor integer: cukup scale area yang berubah
+        factor = self.factor
+        bounds = self.surface.get_rect()
+        offset_x, offset_y = self.target_rect.topleft
+        updated = []
+        for rect in rects:
+            rect = rect.clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            scaled = pygame.Rect(rect.x * factor, rect.y * factor, rect.width * factor, rect.height * factor)
+            pygame.transform.scale(self.surface.subsurface(rect), scaled.size, self.target.subsurface(scaled))
+            updated.append(scaled.move(offset_x, offset_y))
+        pygame.display.update(updated)
@@ -0,0 +1,130 @@
+import csv
+import json
+import time
+from array import array
+
+import pygame
+
+# Urutan fase dalam satu frame Game.run
+PHASES = ("input", "sprites", "ai", "collisions", "logic", "draw", "flip", "wait")
+PHASE_COLORS = {
+    "input": (200, 200, 200),
+    "sprites": (80, 200, 80),
+    "ai": (240, 160, 40),
+    "collisions": (240, 80, 80),
+    "logic": (160, 120, 220),
+    "draw": (80, 160, 240),
+    "flip": (40, 220, 220),
+    "wait": (70, 70, 70)
+}
+
+class FrameProfiler:
+    # Waktu per fase disimpan di ring buffer berukuran tetap (detik per frame)
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.samples = {phase: array("d", bytes(8 * capacity)) for phase in PHASES}
+        self.frame_times = array("d", bytes(8 * capacity))
+        self.quality = array("b", bytes(capacity))  # Level quality governor per frame
+        self.index = 0
+        self.count = 0
+        self.frames = 0
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = 0.0
+        self.last = 0.0
+        self.show_overlay = False
+
+        # Overlay: grafik frame time dan rincian rata-rata per fase
+        self.graph_size = (240, 80)
+        self.rect = pygame.Rect(10, 0, self.graph_size[0], self.graph_size[1] + 14 * (len(PHASES) + 1) + 8)
+        self.surface = None
+        self.font = None
+        self.begin_frame()
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        # Waktu sejak lap sebelumnya masuk ke fase ini
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self, quality=0):
+        self.lap("wait")
+        i = self.index
+        self.quality[i] = quality
+        for phase, seconds in self.current.items():
+            self.samples[phase][i] = seconds
+            self.current[phase] = 0.0
+        self.frame_times[i] = self.last - self.frame_start
+        self.index = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.frames += 1
+
+    def ordered(self, values):
+        # Isi ring buffer dari frame terlama ke terbaru
+        if self.count < self.capacity:
+            return values[:self.count]
+        return values[self.index:] + values[:self.index]
+
+    def averages(self, frames=60):
+        n = min(frames, self.count)
+        if n == 0:
+            return dict.fromkeys(PHASES, 0.0), 0.0
+        recent = {phase: self.ordered(self.samples[phase])[-n:] for phase in PHASES}
+        return ({phase: sum(values) / n for phase, values in recent.items()},
+                sum(self.ordered(self.frame_times)[-n:]) / n)
+
+    def draw(self, screen, fps):
+        if self.surface is None:
+            self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self.font = pygame.font.Font(None, 18)
+        self.rect.bottom = screen.get_height() - 10
+        self.surface.fill((0, 0, 0, 170))
+
+        # Grafik: satu kolom per frame, ditumpuk per fase, garis = budget 1/fps
+        width, height = self.graph_size
+        budget = 1.0 / fps
+        scale = height / (2 * budget)
+        frames = self.ordered(self.frame_times)[-width:]
+        phases = {phase: self.ordered(self.samples[phase])[-width:] for phase in PHASES}
+        x0 = width - len(frames)
+        for k in range(len(frames)):
+            y = height
+            for phase in PHASES:
+                bar = int(phases[phase][k] * scale)
+                if bar > 0:
+                    top = max(y - bar, 0)
+                    pygame.draw.line(self.surface, PHASE_COLORS[phase], (x0 + k, y), (x0 + k, top))
+                    y = top
+        budget_y = height - int(budget * scale)
+        pygame.draw.line(self.surface, (255, 255, 255), (0, budget_y), (width, budget_y))
+
+        averages, frame_time = self.averages()
+        y = height + 4
+        lines = [(f"frame {frame_time * 1000:6.2f} ms  q{self.quality[self.index - 1]}", (255, 255, 255))]
+        lines += [(f"{phase:<10} {averages[phase] * 1000:6.2f} ms", PHASE_COLORS[phase]) for phase in PHASES]
+        for text, color in lines:
+            self.surface.blit(self.font.render(text, True, color), (4, y))
+            y += 14
+        return screen.blit(self.surface, self.rect)
+
+    def rows(self):
+        frames = self.ordered(self.frame_times)
+        phases = [self.ordered(self.samples[phase]) for phase in PHASES]
+        quality = self.ordered(self.quality)
+        first = self.frames - self.count
+        for k in range(self.count):
+            yield [first + k, frames[k] * 1000] + [values[k] * 1000 for values in phases] + [quality[k]]
+
+    def dump(self, path):
+        # CSV atau JSON menurut ekstensi, satuan milidetik
+        header = ["frame", "frame_ms"] + [f"{phase}_ms" for phase in PHASES] + ["quality"]
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(self.rows())
+        else:
+            with open(path, "w") as f:
+                json.dump([dict(zip(header, row)) for row in self.rows()], f)
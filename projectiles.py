@@ -0,0 +1,111 @@
+import pygame
+
+class Projectile:
+    # Objek proyektil dibuat sekali oleh ProjectilePool dan dipakai ulang
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.image = None
+        self.velocity_x = 0
+        self.velocity_y = 0
+        self.age = 0
+        self.lifetime = 0
+        self.owner = None
+        self.on_hit = None  # on_hit(projectile, target), dipanggil sekali saat kena
+        self.mask = None  # pygame.mask untuk collision per piksel, opsional
+        self.spent = False  # Sudah mengenai target, dilepas di compact() berikutnya
+
+class ProjectilePool:
+    # Semua proyektil dialokasikan di awal, spawn/release hanya memindahkan
+    # objek antara free list dan daftar aktif
+    def __init__(self, capacity=256, bounds=None):
+        self.capacity = capacity
+        self.bounds = bounds  # Proyektil di luar area ini langsung dilepas
+        self.free = [Projectile() for _ in range(capacity)]
+        self.active = []
+        self.dropped = 0  # Spawn yang gagal karena pool penuh
+
+    def spawn(self, image, center, velocity, lifetime, owner=None, on_hit=None, mask=None):
+        if not self.free:
+            self.dropped += 1
+            return None
+        projectile = self.free.pop()
+        projectile.image = image
+        projectile.rect.size = image.get_size()
+        projectile.rect.center = center
+        projectile.velocity_x, projectile.velocity_y = velocity
+        projectile.age = 0
+        projectile.lifetime = lifetime
+        projectile.owner = owner
+        projectile.on_hit = on_hit
+        projectile.mask = mask
+        projectile.spent = False
+        self.active.append(projectile)
+        return projectile
+
+    def release(self, projectile):
+        # O(n), untuk melepas banyak proyektil tandai spent lalu panggil compact() sekali
+        self.active.remove(projectile)
+        self.recycle(projectile)
+
+    def recycle(self, projectile):
+        projectile.image = projectile.owner = projectile.on_hit = projectile.mask = None
+        self.free.append(projectile)
+
+    def compact(self):
+        # Lepas semua proyektil spent dalam satu lintasan, urutan sisanya tetap
+        active = self.active
+        keep = 0
+        for projectile in active:
+            if projectile.spent:
+                self.recycle(projectile)
+            else:
+                active[keep] = projectile
+                keep += 1
+        del active[keep:]
+
+    def clear(self):
+        for projectile in reversed(self.active):
+            self.recycle(projectile)
+        self.active.clear()
+
+    def update(self):
+        # Gerakkan semua proyektil, yang habis umur atau keluar area dilepas.
+        # Daftar aktif dipadatkan di tempat supaya tidak ada alokasi list baru.
+        active = self.active
+        bounds = self.bounds
+        keep = 0
+        for projectile in active:
+            projectile.rect.x += projectile.velocity_x
+            projectile.rect.y += projectile.velocity_y
+            projectile.age += 1
+            if projectile.age >= projectile.lifetime or (bounds is not None and not bounds.colliderect(projectile.rect)):
+                self.recycle(projectile)
+            else:
+                active[keep] = projectile
+                keep += 1
+        del active[keep:]
+
+    def draw(self, surface):
+        # Satu panggilan blits untuk semua proyektil, mengembalikan area yang digambar
+        if not self.active:
+            return []
+        return surface.blits([(projectile.image, projectile.rect) for projectile in self.active])
+
+    def snapshot(self):
+        return tuple((projectile.rect.center, projectile.velocity_x, projectile.velocity_y, projectile.age,
+                      projectile.lifetime, projectile.image, projectile.owner, projectile.on_hit, projectile.mask)
+                     for projectile in self.active)
+
+    def reserve(self, count):
+        # Pastikan count proyektil bisa aktif sekaligus, pool diperbesar bila perlu
+        # (misalnya snapshot dari pool lain yang lebih besar)
+        if count > self.capacity:
+            self.free.extend(Projectile() for _ in range(count - self.capacity))
+            self.capacity = count
+
+    def restore(self, state):
+        self.clear()
+        self.reserve(len(state))
+        for center, velocity_x, velocity_y, age, lifetime, image, owner, on_hit, mask in state:
+            projectile = self.spawn(image, center, (velocity_x, velocity_y), lifetime, owner, on_hit, mask)
+            projectile.age = age
@@ -0,0 +1,70 @@
+# Level kualitas render, tiap level juga memakai penghematan level sebelumnya:
+# 1 = tanpa layer parallax far trees, 2 = tanpa kedip alpha invincible,
+# 3 = hanya backdrop, semua layer pohon transparan tidak digambar
+QUALITY_LEVELS = ("full", "no-far-parallax", "no-blink", "backdrop-only")
+
+class QualityGovernor:
+    # Turunkan kualitas bila frame time rata-rata (tanpa waktu tunggu clock.tick)
+    # mendekati budget 1/fps, naikkan lagi bila ada sisa waktu.
+    # Hysteresis: ambang turun dan naik berjauhan, tiap langkah butuh beberapa frame
+    # berturut-turut, dan naik yang langsung disusul turun lagi memperlama jeda naik berikutnya.
+    def __init__(self, budget, down_ratio=0.9, up_ratio=0.6, down_frames=30, up_frames=180,
+                 smoothing=0.1, max_backoff=8):
+        self.budget = budget  # Detik per frame
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.down_frames = down_frames
+        self.up_frames = up_frames
+        self.smoothing = smoothing
+        self.max_backoff = max_backoff
+        self.backoff = 1
+        self.level = 0
+        self.average = None  # Rata-rata eksponensial frame time
+        self.over = 0
+        self.under = 0
+        self.frames = 0
+        self.last_up = None  # Frame terakhir naik level
+        self.changes = []  # (frame, level lama, level baru, rata-rata detik)
+
+    @property
+    def level_name(self):
+        return QUALITY_LEVELS[self.level]
+
+    def update(self, frame_time):
+        # Dipanggil sekali per frame, True bila level berubah
+        self.frames += 1
+        if self.average is None:
+            self.average = frame_time
+        else:
+            self.average += (frame_time - self.average) * self.smoothing
+
+        if self.average > self.budget * self.down_ratio:
+            self.over += 1
+            self.under = 0
+        elif self.average < self.budget * self.up_ratio:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= self.down_frames and self.level < len(QUALITY_LEVELS) - 1:
+            # Baru saja naik lalu langsung kelebihan lagi: tunggu lebih lama sebelum naik lagi
+            if self.last_up is not None and self.frames - self.last_up < self.up_frames * self.backoff:
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+            self.last_up = None
+            self.set_level(self.level + 1)
+            return True
+        if self.under >= self.up_frames * self.backoff and self.level > 0:
+            self.last_up = self.frames
+            self.set_level(self.level - 1)
+            return True
+        if self.last_up is not None and self.frames - self.last_up >= self.up_frames * self.backoff:
+            # Naik terakhir bertahan cukup lama, jeda naik kembali normal
+            self.last_up = None
+            self.backoff = 1
+        return False
+
+    def set_level(self, level):
+        self.changes.append((self.frames, self.level, level, self.average))
+        self.level = level
+        self.over = self.under = 0
@@ -0,0 +1,84 @@
+import json
+import os
+import struct
+import time
+import zlib
+from array import array
+
+# Format replay: header, info JSON, lalu input dan hash per tick (dikompres zlib)
+REPLAY_MAGIC = b"PFRP"
+REPLAY_VERSION = 3  # 2: hash state tanpa repr objek proyektil, 3: SPACE saat bertarung melompat
+HEADER = struct.Struct("<4sBI")  # magic, versi, panjang info
+
+def write_replay(path, info, inputs, hashes):
+    info = dict(info, ticks=len(inputs))
+    encoded = json.dumps(info).encode()
+    body = zlib.compress(array("H", inputs).tobytes() + array("I", hashes).tobytes())
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, len(encoded)))
+        f.write(encoded)
+        f.write(body)
+    os.replace(tmp_path, path)
+
+def read_replay(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, info_length = HEADER.unpack_from(data, 0)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay")
+
+    info = json.loads(data[HEADER.size:HEADER.size + info_length])
+    body = zlib.decompress(data[HEADER.size + info_length:])
+
+    inputs = array("H")
+    hashes = array("I")
+    split = info["ticks"] * inputs.itemsize
+    inputs.frombytes(body[:split])
+    hashes.frombytes(body[split:])
+    if len(inputs) != info["ticks"] or len(hashes) != info["ticks"]:
+        raise ValueError(f"{path} is truncated")
+    return info, inputs, hashes
+
+class ReplayRecorder:
+    # Satu file replay per pertandingan di dalam directory
+    def __init__(self, directory):
+        self.directory = directory
+        self.info = None
+        self.inputs = array("H")
+        self.hashes = array("I")
+        self.saved = []
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, game):
+        # Pertandingan sebelumnya yang belum selesai tetap disimpan
+        self.finish()
+        self.info = {
+            "seed": game.match_seed,
+            "difficulty": game.ai_difficulty,
+            "pixel_collisions": game.pixel_collisions,
+            "search_budget_ms": game.search_budget_ms,
+            "search_rollouts": game.search_rollouts,
+            "state": list(game.state_getter(game))
+        }
+
+    def record(self, inputs, state_hash):
+        if self.info is not None:
+            self.inputs.append(inputs)
+            self.hashes.append(state_hash)
+
+    def finish(self):
+        if self.info is None:
+            return None
+        path = None
+        if self.inputs:
+            name = time.strftime("%Y%m%d-%H%M%S") + f"-{self.info['seed']:08x}-{len(self.saved)}.replay"
+            path = os.path.join(self.directory, name)
+            write_replay(path, self.info, self.inputs, self.hashes)
+            self.saved.append(path)
+        self.info = None
+        self.inputs = array("H")
+        self.hashes = array("I")
+        return path
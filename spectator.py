@@ -0,0 +1,370 @@
+import argparse
+import asyncio
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+# Siaran pertandingan ke banyak penonton lewat TCP. Server tidak tahu isi state:
+# Game.spectator_state() memberi daftar int tetap (maksimal 31 field) plus daftar proyektil.
+# Setiap pesan diawali panjang uint16:
+#   keyframe: tipe, tick, jumlah field, semua field int16, proyektil
+#   delta:    tipe, tick, bitmask field yang berubah, field itu saja (int16),
+#             proyektil hanya bila bit 31 menyala
+# Proyektil: jumlah uint8, lalu (player_num uint8, x int16, y int16) per proyektil.
+
+MESSAGE_KEYFRAME = 1
+MESSAGE_DELTA = 2
+LENGTH = struct.Struct("<H")
+KEYFRAME_HEADER = struct.Struct("<BIB")
+DELTA_HEADER = struct.Struct("<BII")
+PROJECTILE = struct.Struct("<Bhh")
+PROJECTILES_CHANGED = 1 << 31
+KEYFRAME_INTERVAL = 300  # Keyframe berkala supaya penonton yang tertinggal cepat pulih
+MAX_BUFFER = 4096  # Byte belum terkirim per penonton (beberapa detik stream) sebelum delta dibuang
+SEND_BUFFER = 8192  # Buffer kirim kernel per penonton, kecil supaya data basi tidak menumpuk di kernel
+DEFAULT_PORT = 8765
+
+def encode_projectiles(projectiles):
+    projectiles = projectiles[:255]
+    return bytes((len(projectiles),)) + b"".join(PROJECTILE.pack(*projectile) for projectile in projectiles)
+
+def encode_keyframe(tick, values, projectiles):
+    payload = (KEYFRAME_HEADER.pack(MESSAGE_KEYFRAME, tick, len(values)) +
+               struct.pack(f"<{len(values)}h", *values) + encode_projectiles(projectiles))
+    return LENGTH.pack(len(payload)) + payload
+
+def encode_delta(tick, previous, values, previous_projectiles, projectiles):
+    mask = 0
+    changed = []
+    for index, (old, new) in enumerate(zip(previous, values)):
+        if old != new:
+            mask |= 1 << index
+            changed.append(new)
+    payload = DELTA_HEADER.pack(MESSAGE_DELTA, tick, mask | (PROJECTILES_CHANGED if projectiles != previous_projectiles else 0))
+    payload += struct.pack(f"<{len(changed)}h", *changed)
+    if projectiles != previous_projectiles:
+        payload += encode_projectiles(projectiles)
+    return LENGTH.pack(len(payload)) + payload
+
+class StreamDecoder:
+    # Membangun ulang state dari stream. Delta hanya dipakai bila tick-nya
+    # tepat setelah tick terakhir; selain itu tunggu keyframe berikutnya.
+    def __init__(self):
+        self.tick = None
+        self.values = None
+        self.projectiles = ()
+        self.keyframes = 0
+        self.deltas = 0
+        self.skipped = 0
+
+    def decode_projectiles(self, payload, offset):
+        count = payload[offset]
+        offset += 1
+        return tuple(PROJECTILE.unpack_from(payload, offset + k * PROJECTILE.size) for k in range(count))
+
+    def apply(self, payload):
+        if payload[0] == MESSAGE_KEYFRAME:
+            _, tick, count = KEYFRAME_HEADER.unpack_from(payload)
+            offset = KEYFRAME_HEADER.size
+            self.values = list(struct.unpack_from(f"<{count}h", payload, offset))
+            self.projectiles = self.decode_projectiles(payload, offset + 2 * count)
+            self.tick = tick
+            self.keyframes += 1
+            return True
+        if payload[0] == MESSAGE_DELTA:
+            _, tick, mask = DELTA_HEADER.unpack_from(payload)
+            if self.tick is None or tick != self.tick + 1:
+                self.skipped += 1
+                return False
+            offset = DELTA_HEADER.size
+            values = self.values
+            for index in range(len(values)):
+                if mask & (1 << index):
+                    values[index], = struct.unpack_from("<h", payload, offset)
+                    offset += 2
+            if mask & PROJECTILES_CHANGED:
+                self.projectiles = self.decode_projectiles(payload, offset)
+            self.tick = tick
+            self.deltas += 1
+            return True
+        return False
+
+async def read_message(reader):
+    length, = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    return await reader.readexactly(length)
+
+class Subscriber:
+    def __init__(self, writer):
+        self.writer = writer
+        self.task = asyncio.current_task()  # Handler koneksi, ditunggu saat server berhenti
+        self.synced = False  # False = butuh keyframe sebelum delta berikutnya
+        self.sent = 0
+        self.dropped = 0
+
+    def buffered(self):
+        return self.writer.transport.get_write_buffer_size()
+
+class SpectatorServer:
+    # Pesan di-encode sekali per tick lalu ditulis ke semua penonton tanpa await.
+    # Penonton lambat (buffer kirim penuh) tidak menerima delta; begitu buffer-nya
+    # kosong lagi dia langsung dikirimi keyframe state terbaru, delta basi tidak pernah antre.
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL, max_buffer=MAX_BUFFER):
+        self.keyframe_interval = keyframe_interval
+        self.max_buffer = max_buffer
+        self.subscribers = set()
+        self.tick = -1
+        self.values = None
+        self.projectiles = ()
+        self.keyframe = None  # Keyframe tick terakhir, di-encode saat dibutuhkan
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self.bytes_sent = 0
+        self.dropped = 0
+
+    async def start(self, host, port):
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_subscriber, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        # Tutup semua koneksi dan tunggu handler-nya selesai sebelum event loop berhenti
+        self.server.close()
+        tasks = [subscriber.task for subscriber in self.subscribers]
+        for subscriber in self.subscribers:
+            subscriber.writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def handle_subscriber(self, reader, writer):
+        writer.transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        subscriber = Subscriber(writer)
+        self.subscribers.add(subscriber)
+        if self.values is not None:
+            self.send_keyframe(subscriber)
+        try:
+            # Penonton tidak mengirim apa-apa, baca hanya untuk tahu kapan putus
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            writer.close()
+
+    def send_keyframe(self, subscriber):
+        if self.keyframe is None:
+            self.keyframe = encode_keyframe(self.tick, self.values, self.projectiles)
+        self.write(subscriber, self.keyframe)
+        subscriber.synced = True
+
+    def write(self, subscriber, data):
+        subscriber.writer.write(data)
+        subscriber.sent += len(data)
+        self.bytes_sent += len(data)
+
+    def broadcast(self, values, projectiles):
+        # Dipanggil di thread event loop server, sekali per tick simulasi
+        previous, previous_projectiles = self.values, self.projectiles
+        self.tick += 1
+        self.values = tuple(values)
+        self.projectiles = tuple(projectiles)
+        self.keyframe = None
+        periodic = self.tick % self.keyframe_interval == 0
+        delta = None
+        if previous is not None and not periodic:
+            delta = encode_delta(self.tick, previous, self.values, previous_projectiles, self.projectiles)
+        for subscriber in list(self.subscribers):
+            if subscriber.writer.is_closing():
+                self.subscribers.discard(subscriber)
+                continue
+            if subscriber.buffered() > self.max_buffer:
+                # Delta basi dibuang, penonton harus sinkron ulang lewat keyframe
+                subscriber.synced = False
+                subscriber.dropped += 1
+                self.dropped += 1
+            elif delta is None or not subscriber.synced:
+                self.send_keyframe(subscriber)
+            else:
+                self.write(subscriber, delta)
+
+    def start_thread(self, host, port):
+        # Untuk loop game yang sinkron (main.py --spectate): event loop di thread sendiri
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self.port = loop.run_until_complete(self.start(host, port))
+            started.set()
+            loop.run_forever()
+
+        self.thread = threading.Thread(target=run, name="spectator-server", daemon=True)
+        self.thread.start()
+        started.wait()
+        return self.port
+
+    def publish(self, values, projectiles):
+        # Aman dipanggil dari thread game
+        self.loop.call_soon_threadsafe(self.broadcast, values, projectiles)
+
+    def close(self):
+        if self.thread is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result(1.0)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(1.0)
+
+async def serve_match(port, seed, ticks):
+    # Pertandingan AI vs AI tanpa jendela disiarkan real time
+    from main import Game, FPS
+    game = Game(headless=True, seed=seed)
+    server = SpectatorServer()
+    port = await server.start("0.0.0.0", port)
+    print(f"Broadcasting on port {port}")
+    start = time.perf_counter()
+    tick = 0
+    game.auto_advance()
+    try:
+        while ticks is None or tick < ticks:
+            game.update()
+            game.auto_advance()
+            server.broadcast(*game.spectator_state())
+            tick += 1
+            if tick % (10 * FPS) == 0:
+                print(f"tick {tick}: {len(server.subscribers)} viewers, "
+                      f"{server.bytes_sent / 1024:.0f} KiB sent, {server.dropped} deltas dropped")
+            await asyncio.sleep(max(0.0, start + tick / FPS - time.perf_counter()))
+    finally:
+        await server.stop()
+
+async def watch(host, port):
+    # Penonton: state dari stream dipasang ke Game lokal (tanpa simulasi) lalu digambar
+    import pygame
+    from main import Game, FPS
+    reader, writer = await asyncio.open_connection(host, port)
+    game = Game(versus=True)
+    game.wait_for_assets()
+    decoder = StreamDecoder()
+
+    async def receive():
+        try:
+            while True:
+                decoder.apply(await read_message(reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            print("Broadcast ended")
+
+    receiver = asyncio.ensure_future(receive())
+    running = True
+    applied = None
+    try:
+        while running and not receiver.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+            if decoder.values is not None and decoder.tick != applied:
+                applied = decoder.tick
+                game.apply_spectator_state(decoder.values, decoder.projectiles)
+            game.draw()
+            await asyncio.sleep(1 / FPS)
+    finally:
+        receiver.cancel()
+        writer.close()
+    print(f"{decoder.keyframes} keyframes, {decoder.deltas} deltas, {decoder.skipped} deltas skipped")
+
+async def load_test(clients, seconds, slow_clients, seed):
+    # Server dan ratusan penonton di satu proses. Penonton lambat tidak membaca
+    # sama sekali sampai akhir; penonton lain harus berakhir di state yang sama dengan server.
+    from main import Game, FPS
+    game = Game(headless=True, seed=seed)
+    server = SpectatorServer()
+    port = await server.start("127.0.0.1", 0)
+    decoders = [StreamDecoder() for _ in range(clients)]
+    connections = [await asyncio.open_connection("127.0.0.1", port) for _ in range(clients)]
+    slow_sockets = []
+    for _ in range(slow_clients):
+        # Socket biasa tanpa transport asyncio (transport akan terus membaca ke buffer
+        # StreamReader). Buffer terima kecil di-set sebelum connect karena window TCP
+        # ditetapkan saat handshake
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2048)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, ("127.0.0.1", port))
+        slow_sockets.append(sock)
+
+    async def receive(reader, decoder):
+        try:
+            while True:
+                decoder.apply(await read_message(reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    readers = [asyncio.ensure_future(receive(reader, decoder))
+               for (reader, _), decoder in zip(connections, decoders)]
+    await asyncio.sleep(0.1)
+    game.auto_advance()
+    start = time.perf_counter()
+    broadcast_time = 0.0
+    ticks = int(seconds * FPS)
+    for tick in range(ticks):
+        game.update()
+        game.auto_advance()
+        values, projectiles = game.spectator_state()
+        begin = time.perf_counter()
+        server.broadcast(values, projectiles)
+        broadcast_time += time.perf_counter() - begin
+        await asyncio.sleep(max(0.0, start + (tick + 1) / FPS - time.perf_counter()))
+    await asyncio.sleep(0.5)
+    in_sync = sum(decoder.values == list(server.values) and decoder.projectiles == server.projectiles
+                  for decoder in decoders)
+    slow_dropped = [subscriber.dropped for subscriber in server.subscribers if subscriber.dropped]
+    fast = [subscriber.sent for subscriber in server.subscribers if not subscriber.dropped]
+
+    for task in readers:
+        task.cancel()
+    for _, writer in connections:
+        writer.close()
+    for sock in slow_sockets:
+        sock.close()
+    await server.stop()
+    return {
+        "ticks": ticks,
+        "clients": clients,
+        "in_sync": in_sync,
+        "bytes_per_client_per_sec": sum(fast) / max(1, len(fast)) / seconds,
+        "broadcast_ms": broadcast_time / ticks * 1000,
+        "slow_clients_dropping": len(slow_dropped),
+        "deltas_dropped": server.dropped
+    }
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["watch"]:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Hanya penonton yang butuh jendela
+    parser = argparse.ArgumentParser(description="Siaran pertandingan untuk penonton")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="siarkan pertandingan AI vs AI tanpa jendela")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--seed", type=int, default=None)
+    serve_parser.add_argument("--ticks", type=int, default=None, help="berhenti setelah sekian tick")
+    watch_parser = commands.add_parser("watch", help="tonton siaran di jendela")
+    watch_parser.add_argument("address", nargs="?", default=f"127.0.0.1:{DEFAULT_PORT}", help="HOST:PORT")
+    test_parser = commands.add_parser("loadtest", help="server dan banyak penonton di satu proses")
+    test_parser.add_argument("--clients", type=int, default=300)
+    test_parser.add_argument("--slow", type=int, default=5, help="penonton yang tidak pernah membaca")
+    test_parser.add_argument("--seconds", type=float, default=20.0)
+    test_parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve_match(args.port, args.seed, args.ticks))
+    elif args.command == "watch":
+        host, _, port = args.address.rpartition(":")
+        asyncio.run(watch(host or "127.0.0.1", int(port)))
+    else:
+        stats = asyncio.run(load_test(args.clients, args.seconds, args.slow, args.seed))
+        print(f"{stats['ticks']} ticks to {stats['clients']} viewers: {stats['in_sync']} in sync at the end, "
+              f"{stats['bytes_per_client_per_sec']:.0f} bytes/sec per viewer, "
+              f"broadcast {stats['broadcast_ms']:.3f} ms/tick, "
+              f"{stats['slow_clients_dropping']} slow viewers dropped {stats['deltas_dropped']} deltas")
+        sys.exit(0 if stats["in_sync"] == stats["clients"] else 1)
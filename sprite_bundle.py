@@ -0,0 +1,114 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+# Format bundle: header, index JSON, lalu piksel 32 bit mentah semua surface
+# dengan urutan byte "pixel_format" di index (format display saat bake)
+BUNDLE_MAGIC = b"PFSB"
+BUNDLE_VERSION = 2
+FROMBUFFER_FORMATS = ("RGBA", "ARGB", "BGRA")
+HEADER = struct.Struct("<4sII")  # magic, versi, panjang index
+
+def hash_sources(paths, extra=""):
+    # Hash isi file sumber untuk invalidasi bundle
+    digest = hashlib.sha256(extra.encode())
+    for path in sorted(paths):
+        digest.update(path.encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def native_pixel_format():
+    # Urutan byte piksel hasil convert_alpha() di display sekarang, None bila
+    # tidak bisa dibaca langsung oleh pygame.image.frombuffer
+    probe = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+    if probe.get_bytesize() != 4:
+        return None
+    probe.set_at((0, 0), (1, 2, 3, 4))
+    channels = {1: "R", 2: "G", 3: "B", 4: "A"}
+    pixel_format = "".join(channels.get(value, "?") for value in probe.get_buffer().raw)
+    return pixel_format if pixel_format in FROMBUFFER_FORMATS else None
+
+def write_bundle(path, surfaces, source_hash):
+    # Piksel disimpan dalam format display supaya saat load tidak perlu convert_alpha
+    pixel_format = native_pixel_format() or "RGBA"
+    entries = {}
+    blobs = []
+    offset = 0
+    for key, surface in surfaces.items():
+        data = pygame.image.tobytes(surface, pixel_format)
+        entries[key] = [offset, surface.get_width(), surface.get_height()]
+        blobs.append(data)
+        offset += len(data)
+
+    index = json.dumps({"source_hash": source_hash, "pixel_format": pixel_format, "entries": entries}).encode()
+
+    # Tulis ke file sementara dulu supaya bundle lama tidak rusak bila gagal
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index)))
+        f.write(index)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, path)
+    return HEADER.size + len(index) + offset
+
+class SpriteBundle:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = None
+        try:
+            # Copy-on-write: surface yang menunjuk ke map tetap bisa ditulis tanpa mengubah file
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+            if len(self.map) < HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, index_length = HEADER.unpack_from(self.map, 0)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                raise ValueError(f"{path} is not a version {BUNDLE_VERSION} sprite bundle")
+
+            index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        except BaseException:
+            # Gagal di tahap mana pun: map dan file tidak boleh bocor
+            if self.map is not None:
+                self.map.close()
+            self.file.close()
+            raise
+
+        self.source_hash = index["source_hash"]
+        self.entries = index["entries"]
+        self.pixel_format = index["pixel_format"]
+        self.native = None  # Format bake == format display, dicek saat surface pertama diminta
+        self.data_offset = HEADER.size + index_length
+        self.view = memoryview(self.map)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def raw_surface(self, key):
+        # Surface yang menunjuk ke memori mmap apa adanya, tanpa cek format display
+        offset, width, height = self.entries[key]
+        start = self.data_offset + offset
+        return pygame.image.frombuffer(self.view[start:start + width * height * 4], (width, height),
+                                       self.pixel_format)
+
+    def get_surface(self, key):
+        # Tanpa decode PNG. Bila format bake sama dengan format display, surface langsung
+        # menunjuk ke memori mmap tanpa salinan; kalau tidak dikonversi sekali
+        surface = self.raw_surface(key)
+        if self.native is None:
+            self.native = self.pixel_format == native_pixel_format()
+        return surface if self.native else surface.convert_alpha()
+
+    def close(self):
+        # Surface yang masih menunjuk ke map menahannya tetap hidup sampai surface itu dibuang
+        self.file.close()
+        try:
+            self.view.release()
+            self.map.close()
+        except BufferError:
+            pass
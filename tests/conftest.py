@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Test selalu tanpa jendela, asset dicari relatif terhadap root repo
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
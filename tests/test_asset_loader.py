@@ -0,0 +1,38 @@
+import threading
+import time
+
+import pygame
+
+from main import (CHARACTER_ASSETS, SCREEN_HEIGHT, SCREEN_WIDTH, Game, SpriteRegistry, decode_character_sheets,
+                  facing_sheets, native_pixel_format, sprite_registry)
+
+def test_decoded_frames_match_main_thread_load():
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))  # convert_alpha butuh display
+    registry = SpriteRegistry()
+    scale = CHARACTER_ASSETS["huntress"]["scale"]
+    decoded = decode_character_sheets("huntress", None, native_pixel_format())["attack1"]
+    loaded = facing_sheets(registry.load_frames("huntress", "attack1", scale))
+    for decoded_side, loaded_side in zip(decoded, loaded):
+        for decoded_pair, loaded_pair in zip(decoded_side, loaded_side):
+            for a, b in zip(decoded_pair, loaded_pair):
+                assert pygame.image.tobytes(a, "RGBA") == pygame.image.tobytes(b, "RGBA")
+                assert a.get_alpha() == b.get_alpha()
+
+def test_background_loading_touches_registry_only_on_main_thread(monkeypatch):
+    # Worker hanya decode; bundle dan sprite_registry dipasang saat poll_assets
+    store_threads = set()
+    store = sprite_registry.store
+    monkeypatch.setattr(sprite_registry, "store",
+                        lambda key, frames: (store_threads.add(threading.current_thread()), store(key, frames)))
+    sprite_registry.clear()
+
+    game = Game(load_in_background=True, present_mode="software")
+    deadline = time.perf_counter() + 30
+    while game.loader is not None and time.perf_counter() < deadline:
+        game.draw()
+    assert game.assets_ready
+    assert store_threads == {threading.main_thread()}
+    for character_type, data in CHARACTER_ASSETS.items():
+        for anim_name in data["animations"]:
+            assert (character_type, anim_name, data["scale"], True) in sprite_registry.entries
+    assert game.player1.image is not None
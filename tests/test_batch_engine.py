@@ -0,0 +1,13 @@
+import pytest
+
+from batch_engine import compare_headless, cross_check
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("levels", [(0.3, 0.6), (0.6, 0.9)], ids=["easy", "hard"])
+def test_results_match_run_headless(seed, levels):
+    # Semua pasangan difficulty (player 1, player 2) dari levels, tick selesai dan skor per pertandingan
+    assert compare_headless(matches=8, seed=seed, levels=levels) == []
+
+def test_state_matches_every_tick():
+    ticks, finished = cross_check(matches=6, seed=5)
+    assert finished == 6
@@ -0,0 +1,38 @@
+import pygame
+import pytest
+
+from main import Game, FIGHTING, TITLE_SCREEN, INPUT_ATTACK, INPUT_MEDIUM, INPUT_RIGHT, INPUT_SPACE
+
+def scripted_inputs(ticks):
+    # Pilih difficulty, mulai, player 1 melewati lawan lalu diam dan sesekali menyerang,
+    # jadi background tidak bergeser dan renderer dirty-rect tidak jatuh ke full flip
+    yield INPUT_MEDIUM
+    yield INPUT_SPACE
+    for tick in range(ticks - 2):
+        if 180 <= tick < 260:
+            yield INPUT_RIGHT
+        else:
+            yield INPUT_ATTACK if tick % 40 == 0 else 0
+
+def render_match(game, ticks, quality):
+    # Setiap tick digambar lalu pikselnya disalin
+    game.set_quality(quality)
+    for inputs in scripted_inputs(ticks):
+        game.update(inputs)
+        game.draw(0.5)
+        yield game.game_state, game.state_hash(), pygame.image.tobytes(game.screen, "RGB")
+
+@pytest.mark.parametrize("quality", [0, 3])
+def test_dirty_rects_match_full_redraw(quality):
+    # Surface internal terpisah (present software) supaya kedua Game tidak berbagi layar
+    full = Game(seed=3, present_mode="software")
+    dirty = Game(seed=3, present_mode="software", dirty_rects=True)
+    fighting = 0
+    for tick, (expected, actual) in enumerate(zip(render_match(full, 600, quality),
+                                                  render_match(dirty, 600, quality))):
+        assert expected[:2] == actual[:2], f"state differs at tick {tick}"
+        # Teks SPACE di title screen berkedip menurut jam dinding, bukan tick
+        if expected[0] != TITLE_SCREEN:
+            assert expected[2] == actual[2], f"pixels differ at tick {tick}"
+        fighting += expected[0] == FIGHTING
+    assert fighting
@@ -0,0 +1,50 @@
+from main import (Game, play_replay, FIGHTING, ROUND_PREP, INPUT_ATTACK, INPUT_HARD, INPUT_MEDIUM,
+                  INPUT_SKILL1, INPUT_SPACE)
+from replay import ReplayRecorder
+
+def fighting_game():
+    # Player 1 dikendalikan input, ronde pertama sudah berjalan
+    game = Game(headless=True, player1_bot=False, seed=4)
+    start_fight(game)
+    return game
+
+def start_fight(game):
+    # Tick pertama FIGHTING menurunkan fighter dari posisi spawn ke tanah
+    game.update(INPUT_MEDIUM)
+    game.update(INPUT_SPACE)
+    while game.game_state != FIGHTING:
+        game.update(0)
+    game.update(0)
+
+def test_space_and_attack_in_one_tick():
+    game = fighting_game()
+    game.apply_input(INPUT_SPACE | INPUT_ATTACK)
+    assert game.player1.attacking
+    assert game.player1.velocity_y < 0
+
+def test_every_fighting_bit_applies():
+    game = fighting_game()
+    energy = game.player1.energy
+    game.apply_input(INPUT_SPACE | INPUT_SKILL1)
+    assert game.player1.jumping
+    assert game.player1.energy < energy
+
+def test_difficulty_and_space_in_one_tick():
+    game = Game(headless=True, player1_bot=False, seed=4)
+    game.update(INPUT_HARD | INPUT_SPACE)
+    assert game.ai_difficulty == 0.9
+    assert game.game_state == ROUND_PREP
+
+def test_replay_reproduces_combined_input(tmp_path):
+    game = Game(headless=True, player1_bot=False, seed=4)
+    game.recorder = ReplayRecorder(str(tmp_path))
+    game.recorder.start(game)
+    start_fight(game)
+    game.update(INPUT_SPACE | INPUT_ATTACK)
+    assert game.player1.attacking and game.player1.jumping
+    for _ in range(120):
+        game.update(0)
+    path = game.recorder.finish()
+    # play_replay gagal dengan RuntimeError bila hash state berbeda di tick manapun
+    stats = play_replay(path)
+    assert stats["ticks"] > 120
@@ -0,0 +1,13 @@
+import pygame
+
+from projectiles import ProjectilePool
+
+def test_restore_into_smaller_pool():
+    image = pygame.Surface((10, 10))
+    large = ProjectilePool(8)
+    for i in range(8):
+        large.spawn(image, (i * 20, 50), (3, 0), 45).age = i
+    small = ProjectilePool(2)
+    small.restore(large.snapshot())
+    assert [(p.rect.center, p.age) for p in small.active] == [(p.rect.center, p.age) for p in large.active]
+    assert small.capacity == 8 and small.dropped == 0
@@ -0,0 +1,25 @@
+import pygame
+
+from main import CHARACTER_ASSETS, SCREEN_HEIGHT, SCREEN_WIDTH, SpriteRegistry, sprite_registry
+
+def test_masks_count_towards_budget_and_are_evicted():
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))  # convert_alpha butuh display
+    registry = SpriteRegistry()
+    registry.bundle = sprite_registry.bundle
+    scale = CHARACTER_ASSETS["huntress"]["scale"]
+    registry.get("huntress", "idle", scale, False)
+    frame_bytes = registry.used_bytes
+    registry.get_masks("huntress", "idle", scale, False)
+    assert registry.used_bytes > frame_bytes
+
+    # Batas pas untuk satu animasi (kedua arah) beserta mask-nya: animasi lain
+    # membuang entry lama, frame dan mask sekaligus
+    registry.max_bytes = registry.used_bytes
+    registry.get_masks("huntress", "run", scale, False)
+    assert ("huntress", "idle", scale, False) not in registry.entries
+    assert registry.used_bytes <= registry.max_bytes or len(registry.entries) == 1
+    assert registry.used_bytes == sum(size for _, size, _ in registry.entries.values())
+
+    registry.clear_masks()
+    assert registry.used_bytes == sum(size for _, size, _ in registry.entries.values())
+    assert all(masks is None for _, _, masks in registry.entries.values())
@@ -0,0 +1,143 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+# Turnamen selalu tanpa jendela
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from main import Game, FIGHTING, MATCH_RESULT, SIM_DT
+
+DEFAULT_OUTPUT = "tournament.jsonl"
+DEFAULT_LEVELS = (0.3, 0.6, 0.9)  # Sama dengan pilihan 1/2/3 di title screen
+MAX_MATCH_TICKS = 200000  # Pertandingan yang terus seri dihentikan
+
+worker_game = None  # Satu Game per proses worker, dipakai ulang antar pertandingan
+worker_search_rollouts = None
+
+def init_worker(search_rollouts):
+    global worker_search_rollouts
+    worker_search_rollouts = search_rollouts
+
+def play_match(spec):
+    # spec: (index, seed, difficulty player 1, difficulty player 2)
+    global worker_game
+    index, seed, player1_difficulty, player2_difficulty = spec
+    if worker_game is None:
+        worker_game = Game(headless=True)
+        # AI SULIT memakai pencarian hanya bila jumlah rollout ditentukan (deterministik)
+        worker_game.search_budget_ms = None
+        worker_game.search_rollouts = worker_search_rollouts
+    game = worker_game
+    game.seed = seed
+    game.player1_ai_difficulty = player1_difficulty
+    game.ai_difficulty = player2_difficulty
+    game.reset_game()
+
+    # Alur ronde sama dengan Game.run_headless: update lalu auto_advance
+    start = time.perf_counter()
+    round_lengths = []
+    fighting_ticks = 0
+    ticks = 0
+    game.auto_advance()
+    while game.game_state != MATCH_RESULT and ticks < MAX_MATCH_TICKS:
+        was_fighting = game.game_state == FIGHTING
+        game.update()
+        ticks += 1
+        if was_fighting:
+            fighting_ticks += 1
+            if game.game_state != FIGHTING:
+                round_lengths.append(fighting_ticks)
+                fighting_ticks = 0
+        if game.game_state != MATCH_RESULT:
+            game.auto_advance()
+
+    finished = game.game_state == MATCH_RESULT
+    winner = 0
+    if finished:
+        winner = 1 if game.player1_wins > game.player2_wins else 2
+    return {
+        "match": index,
+        "seed": seed,
+        "player1_difficulty": player1_difficulty,
+        "player2_difficulty": player2_difficulty,
+        "winner": winner,
+        "score": [game.player1_wins, game.player2_wins],
+        "rounds": len(round_lengths),
+        "round_ticks": round_lengths,
+        "ticks": ticks,
+        "finished": finished,
+        "elapsed": time.perf_counter() - start
+    }
+
+def match_specs(matches, levels, seed):
+    # Semua pasangan difficulty bergiliran, seed per pertandingan tetap
+    # sehingga hasil tidak bergantung pada pembagian ke worker
+    pairings = list(itertools.product(levels, repeat=2))
+    for index in range(matches):
+        player1_difficulty, player2_difficulty = pairings[index % len(pairings)]
+        yield index, seed + index, player1_difficulty, player2_difficulty
+
+def run_tournament(matches, levels, seed, workers, output, search_rollouts=None):
+    results = []
+    start = time.perf_counter()
+    with open(output, "w") as f, multiprocessing.Pool(workers, init_worker, (search_rollouts,)) as pool:
+        for result in pool.imap_unordered(play_match, match_specs(matches, levels, seed), chunksize=4):
+            # Hasil ditulis begitu selesai supaya turnamen panjang bisa dipantau
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            results.append(result)
+        # Worker berhenti sendiri: Pool.__exit__ memakai terminate() dan SIGTERM-nya
+        # ditelan handler sinyal SDL di worker, parent lalu menunggu selamanya
+        pool.close()
+        pool.join()
+    return results, time.perf_counter() - start
+
+def summarize(results):
+    # Agregat per pasangan (difficulty player 1, difficulty player 2)
+    table = {}
+    for result in results:
+        key = (result["player1_difficulty"], result["player2_difficulty"])
+        row = table.setdefault(key, {"matches": 0, "player1_wins": 0, "player2_wins": 0,
+                                     "unfinished": 0, "rounds": 0, "round_ticks": 0})
+        row["matches"] += 1
+        row["player1_wins"] += result["winner"] == 1
+        row["player2_wins"] += result["winner"] == 2
+        row["unfinished"] += not result["finished"]
+        row["rounds"] += result["rounds"]
+        row["round_ticks"] += sum(result["round_ticks"])
+    return dict(sorted(table.items()))
+
+def print_summary(table, elapsed):
+    print(f"{'P1 diff':>7} {'P2 diff':>7} {'matches':>8} {'P1 win':>7} {'P2 win':>7} "
+          f"{'unfin':>6} {'rounds':>7} {'round s':>8}")
+    total = 0
+    for (player1_difficulty, player2_difficulty), row in table.items():
+        n = row["matches"]
+        total += n
+        round_seconds = row["round_ticks"] / row["rounds"] * SIM_DT if row["rounds"] else 0.0
+        print(f"{player1_difficulty:7.1f} {player2_difficulty:7.1f} {n:8d} "
+              f"{row['player1_wins'] / n:7.1%} {row['player2_wins'] / n:7.1%} {row['unfinished']:6d} "
+              f"{row['rounds'] / n:7.2f} {round_seconds:8.1f}")
+    print(f"{total} matches in {elapsed:.1f}s ({total / elapsed if elapsed > 0 else 0:.1f} matches/sec)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turnamen AI vs AI tanpa jendela (best of 3)")
+    parser.add_argument("--matches", type=int, default=900, help="jumlah pertandingan")
+    parser.add_argument("--levels", type=float, nargs="+", default=list(DEFAULT_LEVELS),
+                        help="difficulty yang diadu, semua pasangan player 1 x player 2")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="jumlah proses")
+    parser.add_argument("--seed", type=int, default=0, help="seed pertandingan pertama")
+    parser.add_argument("--search-rollouts", type=int, default=None,
+                        help="AI SULIT memakai pencarian dengan jumlah rollout ini (default aturan biasa)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="file hasil JSONL, satu baris per pertandingan")
+    args = parser.parse_args()
+
+    results, elapsed = run_tournament(args.matches, args.levels, args.seed, args.workers, args.output,
+                                      args.search_rollouts)
+    print_summary(summarize(results), elapsed)
+    print(f"Wrote {args.output}")
+    sys.exit()